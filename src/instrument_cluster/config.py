@@ -18,6 +18,14 @@ class Config:
     telemetry_mode: str = field(default=TelemetryMode.DEMO.value)
     udp_host: str = field(default="127.0.0.1")
     udp_port: int = field(default=5600)
+    replay_path: Optional[str] = field(default=None)
+    replay_speed: float = field(default=1.0)
+    record_path: Optional[str] = field(default=None)
+    shm_name: str = field(default="simdash-telemetry")
+    fallback_mode: Optional[str] = field(default=None)
+    stale_after_s: float = field(default=0.5)
+    failover_after_s: float = field(default=2.0)
+    show_stats: bool = field(default=False)
 
     @classmethod
     def parse_config(cls, path: Path) -> "Config":
@@ -1,9 +1,56 @@
+import bisect
 import json
+import math
 import os
+import threading
 import time
-from collections import deque
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections.abc import Mapping
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .ecu_store import (
+    ModelStore,
+    ModelWriter,
+    SampleJournal,
+    decode_model,
+    encode_model,
+    read_model_file,
+)
+from .ecu_index import MIN_OVERLAP, CurveIndex
+from .gearing import GearRatioEstimator
+from .kinematics import ESTIMATORS
+from .logger import Logger
+
+LOGGER = Logger("ecu").get()
+
+STORE_FILE = "models.ecs"
+JOURNAL_FILE = "samples.ecj"
+# The sample journal is fsynced this often (s); it is folded into model
+# saves once it outgrows JOURNAL_COMPACT_BYTES or JOURNAL_COMPACT_S passed.
+JOURNAL_SYNC_S = 1.0
+JOURNAL_COMPACT_BYTES = 512 * 1024
+JOURNAL_COMPACT_S = 300.0
+# Upper bounds (ms) of the car-switch latency histogram; one overflow bucket follows.
+SWITCH_BOUNDS_MS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0)
+# A background model load that raised is retried after this long (s); the
+# car stays warming meanwhile.
+LOAD_RETRY_S = 1.0
+# A bin counts as covered once it has this many samples and the standard
+# error of their mean is at most MAX_REL_SE of the mean. The spread of a
+# handful of samples says little about the true one (two close samples pass
+# by luck), so the check only starts at MIN_BIN_SAMPLES.
+MIN_BIN_SAMPLES = 5
+MAX_REL_SE = 0.15
+_MAX_REL_SE2 = MAX_REL_SE * MAX_REL_SE
+# Coverage at which the shift lights switch from LEARNING to READY.
+READY_COVERAGE = 0.55
+# A car below READY is warm-started from the most similar known car when
+# their curves (and redline, gear ratios) are at most this far apart.
+SEED_MAX_DISTANCE = 0.15
 
 # ECU learns a per-car torque curve (relative scale) from WOT acceleration
 # and computes optimal shift RPMs. It also buffers recent samples per gear
@@ -11,24 +58,65 @@ from typing import Dict, List, Optional, Tuple
 # be gated.
 
 
+def _confident(counts: np.ndarray, means: np.ndarray, m2: np.ndarray) -> np.ndarray:
+    """Bins whose mean has a relative standard error of at most MAX_REL_SE.
+
+    se^2 = m2 / ((n - 1) * n), compared squared to avoid the division.
+    """
+    n = counts.astype(np.float64)
+    return (counts >= MIN_BIN_SAMPLES) & (m2 <= _MAX_REL_SE2 * (n - 1) * n * means * means)
+
+
 @dataclass
 class DynoCurve:
     rpm_min: float = 800.0
     rpm_max: float = 12000.0
     bin_size: float = 100.0
-    torque_bins: List[float] = field(default_factory=list)
-    counts: List[int] = field(default_factory=list)
+    torque_bins: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    counts: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    # Welford running mean and sum of squared deviations of the samples per
+    # bin (rejected outliers excluded)
+    means: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    m2: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    # bins filled by seed() without a sample of their own yet: they shape the
+    # curve and the shift targets but are never confident (not persisted)
+    seeded: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=bool))
     last_updated: float = field(default_factory=time.time)
+    # bumped whenever a sample changes a bin
+    version: int = field(default=0, init=False, compare=False)
+    # smoothed torque per bin; rebuilt lazily after add_sample touches a bin
+    _smooth: Optional[np.ndarray] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self) -> None:
-        if not self.torque_bins:
+        if len(self.torque_bins) == 0:
             n = int((self.rpm_max - self.rpm_min) / self.bin_size) + 1
-            self.torque_bins = [0.0] * n
-            self.counts = [0] * n
+            self.torque_bins = np.zeros(n)
+            self.counts = np.zeros(n, dtype=np.int64)
+        else:
+            # loaded models arrive as plain lists
+            self.torque_bins = np.asarray(self.torque_bins, dtype=np.float64).copy()
+            self.counts = np.asarray(self.counts, dtype=np.int64).copy()
+        if len(self.means) == len(self.torque_bins):
+            self.means = np.asarray(self.means, dtype=np.float64).copy()
+            self.m2 = np.asarray(self.m2, dtype=np.float64).copy()
+        else:
+            # models saved without variance: take the curve as the mean
+            self.means = self.torque_bins.copy()
+            self.m2 = np.zeros(len(self.torque_bins))
+        if len(self.seeded) == len(self.torque_bins):
+            self.seeded = np.asarray(self.seeded, dtype=bool).copy()
+        else:
+            self.seeded = np.zeros(len(self.torque_bins), dtype=bool)
+        self._rpm_bins = self.rpm_min + np.arange(len(self.torque_bins)) * self.bin_size
+        # confident bins and their count, kept up to date by add_sample(s)
+        self.confident = _confident(self.counts, self.means, self.m2)
+        self.covered = int(np.count_nonzero(self.confident))
 
     @property
-    def rpm_bins(self) -> List[float]:
-        return [self.rpm_min + i * self.bin_size for i in range(len(self.torque_bins))]
+    def rpm_bins(self) -> np.ndarray:
+        return self._rpm_bins
 
     def idx(self, rpm: float) -> Optional[int]:
         if rpm < self.rpm_min or rpm > self.rpm_max:
@@ -38,6 +126,13 @@ class DynoCurve:
             return i
         return None
 
+    def indices(self, rpm: np.ndarray) -> np.ndarray:
+        """Vectorized :meth:`idx`: bin index per rpm, -1 where out of range."""
+        rpm = np.asarray(rpm, dtype=np.float64)
+        i = np.floor((rpm - self.rpm_min) / self.bin_size).astype(np.int64)
+        ok = (rpm >= self.rpm_min) & (rpm <= self.rpm_max) & (i < len(self.torque_bins))
+        return np.where(ok, i, -1)
+
     # def add_sample(self, rpm: float, torque_proxy: float, alpha: float = 0.12) -> None:
     #     i = self.idx(rpm)
     #     if i is None:
@@ -61,60 +156,400 @@ class DynoCurve:
         i = self.idx(rpm)
         if i is None:
             return
-        cur = self.torque_bins[i]
+        # .item() and plain floats: numpy scalars are slow one at a time
+        cur = self.torque_bins.item(i)
+        count = self.counts.item(i)
 
         # Reject crazy-high outliers once a bin has some history
-        if self.counts[i] > 12 and torque_proxy > 3.5 * max(cur, 1e-6):
+        if count > 12 and torque_proxy > 3.5 * max(cur, 1e-6):
             return
 
         # Move up fast, down slow (drag/grade samples won’t pull the curve down)
-        alpha = alpha_up if (self.counts[i] < 6 or torque_proxy >= cur) else alpha_down
-        self.torque_bins[i] = (1.0 - alpha) * cur + alpha * max(0.0, torque_proxy)
-        self.counts[i] += 1
+        alpha = alpha_up if (count < 6 or torque_proxy >= cur) else alpha_down
+        x = max(0.0, torque_proxy)
+        self.torque_bins[i] = (1.0 - alpha) * cur + alpha * x
+        n = count + 1
+        self.counts[i] = n
+        if self.seeded.item(i):
+            self.seeded[i] = False
+
+        # Welford update and confidence
+        mean = self.means.item(i)
+        d = x - mean
+        mean += d / n
+        m2 = self.m2.item(i) + d * (x - mean)
+        self.means[i] = mean
+        self.m2[i] = m2
+        ok = n >= MIN_BIN_SAMPLES and m2 <= _MAX_REL_SE2 * (n - 1) * n * mean * mean
+        if ok != self.confident.item(i):
+            self.confident[i] = ok
+            self.covered += 1 if ok else -1
         self.last_updated = time.time()
+        self.version += 1
+        self._smooth = None
+
+    def add_samples(
+        self,
+        rpm: np.ndarray,
+        torque_proxy: np.ndarray,
+        alpha_up: float = 0.25,
+        alpha_down: float = 0.05,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """:meth:`add_sample` for each sample in order, with the same result.
 
-    def smoothed(self) -> Tuple[List[float], List[float]]:
-        y = self.torque_bins[:]
-        n = len(y)
-        if n < 3:
-            return self.rpm_bins, y
-        sm = [0.0] * n
-        for i in range(n):
-            acc = y[i]
-            k = 1
-            if i > 0:
-                acc += y[i - 1]
-                k += 1
-            if i + 1 < n:
-                acc += y[i + 1]
-                k += 1
-            sm[i] = acc / k
-        return self.rpm_bins, sm
+        Samples of one bin depend on each other, samples of different bins do
+        not, so the k-th sample of every bin is applied in one vectorized
+        round. Returns the bin per sample (-1 out of range) and that bin's
+        count right after the sample.
+        """
+        rpm = np.asarray(rpm, dtype=np.float64)
+        x = np.asarray(torque_proxy, dtype=np.float64)
+        bins = self.indices(rpm)
+        counts_after = np.zeros(len(bins), dtype=np.int64)
+        pos = np.flatnonzero(bins >= 0)
+        if not len(pos):
+            return bins, counts_after
+        # rank of each sample within its bin, then rounds by rank
+        pos = pos[np.argsort(bins[pos], kind="stable")]
+        sb = bins[pos]
+        first = np.flatnonzero(np.r_[True, sb[1:] != sb[:-1]])
+        rank = np.arange(len(pos)) - np.repeat(first, np.diff(np.r_[first, len(pos)]))
+        by_round = np.argsort(rank, kind="stable")
+        pos = pos[by_round]
+        ends = np.cumsum(np.bincount(rank))
+        tb, counts, means, m2s = self.torque_bins, self.counts, self.means, self.m2
+        confident = self.confident
+        applied = 0
+        start = 0
+        for end in ends.tolist():
+            sel = pos[start:end]
+            start = end
+            i = bins[sel]
+            xs = x[sel]
+            cur = tb[i]
+            cnt = counts[i]
+            keep = ~((cnt > 12) & (xs > 3.5 * np.maximum(cur, 1e-6)))
+            alpha = np.where((cnt < 6) | (xs >= cur), alpha_up, alpha_down)
+            xs = np.maximum(0.0, xs)
+            tb[i] = np.where(keep, (1.0 - alpha) * cur + alpha * xs, cur)
+            cnt = cnt + keep
+            counts[i] = cnt
+            counts_after[sel] = cnt
+            self.seeded[i[keep]] = False
+            # Welford, only where the sample was kept
+            mean = means[i]
+            d = xs - mean
+            new_mean = np.where(keep, mean + d / np.maximum(cnt, 1), mean)
+            m2 = np.where(keep, m2s[i] + d * (xs - new_mean), m2s[i])
+            means[i] = new_mean
+            m2s[i] = m2
+            was = confident[i]
+            now = _confident(cnt, new_mean, m2)
+            confident[i] = now
+            self.covered += int(np.count_nonzero(now & ~was)) - int(
+                np.count_nonzero(was & ~now)
+            )
+            applied += int(np.count_nonzero(keep))
+        if applied:
+            self.last_updated = time.time()
+            self.version += 1
+            self._smooth = None
+        return bins, counts_after
+
+    def checkpoint(self) -> Tuple[np.ndarray, ...]:
+        return tuple(
+            a.copy()
+            for a in (
+                self.torque_bins,
+                self.counts,
+                self.means,
+                self.m2,
+                self.confident,
+                self.seeded,
+            )
+        )
+
+    def restore(self, state: Tuple[np.ndarray, ...]) -> None:
+        for a, saved in zip(
+            (
+                self.torque_bins,
+                self.counts,
+                self.means,
+                self.m2,
+                self.confident,
+                self.seeded,
+            ),
+            state,
+        ):
+            a[:] = saved
+        self.covered = int(np.count_nonzero(self.confident))
+        self.version += 1
+        self._smooth = None
+
+    def rescale(self, factor: float) -> None:
+        """Multiply every torque value by *factor* (a change of proxy units)."""
+        self.torque_bins *= factor
+        self.means *= factor
+        self.m2 *= factor * factor
+        self.version += 1
+        self._smooth = None
+
+    def seed(self, values: np.ndarray) -> int:
+        """Fill the torque of the bins without samples from *values* (NaN:
+        leave empty). Returns the bins filled.
+
+        Seeded bins keep no samples, so they do not count towards coverage;
+        the first sample of a bin ends its seeding and starts its statistics
+        from scratch, while its torque moves on from the seeded value.
+        """
+        fill = (self.counts == 0) & ~np.isnan(values)
+        n = int(np.count_nonzero(fill))
+        if not n:
+            return 0
+        self.torque_bins[fill] = values[fill]
+        self.seeded |= fill
+        self.last_updated = time.time()
+        self.version += 1
+        self._smooth = None
+        return n
+
+    def smoothed(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Bin rpms and the 3-bin moving average of the torque (cached)."""
+        if self._smooth is None:
+            y = self.torque_bins
+            if len(y) < 3:
+                self._smooth = y.copy()
+            else:
+                sm = np.empty_like(y)
+                sm[1:-1] = (y[:-2] + y[1:-1] + y[2:]) / 3.0
+                sm[0] = (y[0] + y[1]) / 2.0
+                sm[-1] = (y[-2] + y[-1]) / 2.0
+                self._smooth = sm
+        return self._rpm_bins, self._smooth
 
     def coverage(self) -> float:
-        have = sum(1 for c in self.counts if c >= 3)
-        return have / max(1, len(self.counts))
+        return self.covered / max(1, len(self.counts))
 
-    def torque_at(self, rpm: float) -> float:
+    def torque_at(self, rpm: float | np.ndarray) -> float | np.ndarray:
+        """Interpolated smoothed torque, clamped to the end bins; accepts an
+        array of rpms."""
         xs, ys = self.smoothed()
-        if not xs:
+        if not len(xs):
             return 0.0
-        if rpm <= xs[0]:
-            return ys[0]
-        if rpm >= xs[-1]:
-            return ys[-1]
-        lo, hi = 0, len(xs) - 1
-        while lo + 1 < hi:
-            mid = (lo + hi) // 2
-            if xs[mid] <= rpm:
-                lo = mid
+        t = np.interp(rpm, xs, ys)
+        return float(t) if np.ndim(t) == 0 else t
+
+
+@dataclass(frozen=True)
+class ShiftTable:
+    """Shift targets of one car indexed by gear number, rebuilt only when the
+    curve, gear ratios or redline change. Instances are immutable, so a
+    reference is a consistent snapshot."""
+
+    up: Tuple[Optional[float], ...] = ()
+    down: Tuple[Optional[float], ...] = ()
+    # 1 / upshift target per gear (0.0 without one): progress is rpm * scale
+    progress_scale: Tuple[float, ...] = ()
+    coverage: float = 0.0
+    covered_bins: int = 0
+    redline: float = 7500.0
+
+    def targets(self, gear: int) -> Tuple[Optional[float], Optional[float]]:
+        if 0 <= gear < len(self.up):
+            return self.up[gear], self.down[gear]
+        return None, None
+
+    def progress(self, gear: int, rpm: float) -> float:
+        scale = self.progress_scale[gear] if 0 <= gear < len(self.progress_scale) else 0.0
+        return max(0.0, min(1.2, rpm * scale))
+
+
+class ShiftInfo(Mapping):
+    """Per-frame ECU readout returned by :meth:`ECU.get_shift_targets`.
+
+    Values are captured when created; the debug counter string is only
+    formatted if someone reads ``"dbg"``.
+    """
+
+    _KEYS = ("coverage", "redline", "gear", "rpm", "thr_raw", "thr", "speed", "dbg")
+
+    def __init__(self, table: ShiftTable, gear: int, rpm: float, ecu: "ECU") -> None:
+        self._values = {
+            "coverage": table.coverage,
+            "redline": table.redline,
+            "gear": float(gear),
+            "rpm": rpm,
+            "thr_raw": ecu._last_throttle_raw,
+            "thr": ecu._last_throttle,
+            "speed": ecu._last_speed,
+        }
+        self._ecu = ecu
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "dbg":
+            return self._ecu.debug_counters()
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+
+def _frozen(a: np.ndarray) -> np.ndarray:
+    a.flags.writeable = False
+    return a
+
+
+_NO_SAMPLES = _frozen(np.zeros(0))
+
+
+@dataclass(frozen=True, eq=False)
+class SampleView:
+    """Read-only copy of a :class:`RecentSamples` ring, oldest first."""
+
+    version: int = 0
+    rpm: np.ndarray = field(default_factory=lambda: _NO_SAMPLES)
+    proxy: np.ndarray = field(default_factory=lambda: _NO_SAMPLES)
+    stamp: np.ndarray = field(default_factory=lambda: _NO_SAMPLES)  # time.time()
+
+
+class RecentSamples:
+    """Ring of the newest accepted samples of one gear, one array per field.
+
+    ``version`` changes with every append; :meth:`view` copies the ring once
+    per version, so handing it to the render thread repeatedly is free.
+    """
+
+    def __init__(self, capacity: int = 500) -> None:
+        self.rpm = np.zeros(capacity)
+        self.proxy = np.zeros(capacity)
+        self.stamp = np.zeros(capacity)
+        self.version = 0
+        self._next = 0
+        self._size = 0
+        self._view = SampleView()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, rpm: float, proxy: float, stamp: float) -> None:
+        i = self._next
+        self.rpm[i] = rpm
+        self.proxy[i] = proxy
+        self.stamp[i] = stamp
+        self._next = (i + 1) % len(self.rpm)
+        self._size = min(self._size + 1, len(self.rpm))
+        self.version += 1
+
+    def extend(self, rpm: np.ndarray, proxy: np.ndarray, stamp: float) -> None:
+        cap = len(self.rpm)
+        n = len(rpm)
+        if not n:
+            return
+        # only the newest `cap` samples survive
+        idx = (self._next + np.arange(max(0, n - cap), n)) % cap
+        self.rpm[idx] = rpm[-cap:]
+        self.proxy[idx] = proxy[-cap:]
+        self.stamp[idx] = stamp
+        self._next = (self._next + n) % cap
+        self._size = min(self._size + n, cap)
+        self.version += 1
+
+    def view(self) -> SampleView:
+        if self._view.version != self.version:
+            if self._size < len(self.rpm):
+                order = slice(0, self._size)
             else:
-                hi = mid
-        x0, x1 = xs[lo], xs[hi]
-        y0 = ys[lo]
-        y1 = ys[hi]
-        t = (rpm - x0) / max(1e-6, (x1 - x0))
-        return y0 * (1 - t) + y1 * t
+                order = np.roll(np.arange(self._size), -self._next)
+            self._view = SampleView(
+                self.version,
+                _frozen(self.rpm[order].copy()),
+                _frozen(self.proxy[order].copy()),
+                _frozen(self.stamp[order].copy()),
+            )
+        return self._view
+
+
+@dataclass(frozen=True, eq=False)
+class PlotData:
+    """Scatter samples and learned curve of one gear, plus plot bounds.
+
+    ``version`` only changes when the samples or the curve do, so a plot can
+    keep its projected points until then. Arrays are read-only.
+    """
+
+    version: Tuple[int, int, int] = (0, 0, 0)  # gear, samples, curve
+    samples: SampleView = field(default_factory=SampleView)
+    curve_rpm: np.ndarray = field(default_factory=lambda: _NO_SAMPLES)
+    curve_torque: np.ndarray = field(default_factory=lambda: _NO_SAMPLES)
+    bounds: Tuple[float, float, float] = (800.0, 12000.0, 1.0)  # rpm min/max, y max
+
+
+def _plot_data(
+    gear: int,
+    samples: SampleView,
+    curve: Tuple[np.ndarray, np.ndarray],
+    curve_version: int,
+    rpm_min: float,
+    rpm_max: float,
+) -> PlotData:
+    xs, ys = curve
+    y_max = max(
+        float(ys.max()) if len(ys) else 0.0,
+        float(samples.proxy.max()) if len(samples.proxy) else 0.0,
+    )
+    if y_max <= 1e-6:
+        y_max = 1.0
+    return PlotData(
+        (gear, samples.version, curve_version),
+        samples,
+        xs,
+        ys,
+        (rpm_min, rpm_max, y_max),
+    )
+
+
+@dataclass(frozen=True)
+class ECUSnapshot:
+    """Everything the widgets read from the ECU for one car, copied at one
+    point in time so it can be handed to another thread."""
+
+    car_id: int
+    table: ShiftTable = field(default_factory=ShiftTable)
+    # smoothed curve (rpm, torque); read-only, replaced rather than mutated
+    curve: Tuple[np.ndarray, np.ndarray] = (_NO_SAMPLES, _NO_SAMPLES)
+    curve_version: int = 0
+    rpm_range: Tuple[float, float] = (800.0, 12000.0)
+    recent_by_gear: Dict[int, SampleView] = field(default_factory=dict)
+    thr_raw: float = 0.0
+    thr: float = 0.0
+    speed: float = 0.0
+    dbg: str = ""
+    created: float = field(default_factory=time.time)
+
+    def shift_targets(
+        self, gear: int, rpm: float
+    ) -> Tuple[Optional[float], Optional[float], Dict[str, Any]]:
+        up, dn = self.table.targets(gear)
+        info = {
+            "coverage": self.table.coverage,
+            "redline": self.table.redline,
+            "gear": float(gear),
+            "rpm": rpm,
+            "thr_raw": self.thr_raw,
+            "thr": self.thr,
+            "speed": self.speed,
+            "dbg": self.dbg,
+        }
+        return up, dn, info
+
+    def plot_data(self, gear: int) -> PlotData:
+        samples = self.recent_by_gear.get(int(gear)) or SampleView()
+        return _plot_data(
+            int(gear), samples, self.curve, self.curve_version, *self.rpm_range
+        )
 
 
 @dataclass
@@ -126,18 +561,60 @@ class CarModel:
     idle_rpm: float = 800.0
     shift_up_rpm: Dict[int, float] = field(default_factory=dict)
     shift_down_rpm: Dict[int, float] = field(default_factory=dict)
-    recent_by_gear: Dict[int, deque] = field(default_factory=dict)
+    recent_by_gear: Dict[int, RecentSamples] = field(default_factory=dict)
+    table: ShiftTable = field(default_factory=ShiftTable)
+    # car the curve was warm-started from (this session), see ECU._maybe_seed
+    seeded_from: Optional[int] = None
+    # covered bins at the last warm-start lookup
+    seed_checked: int = field(default=0, repr=False, compare=False)
+    # gear_ratios were inferred from rpm/speed (overall ratios, including
+    # the final drive) rather than reported by the game
+    ratios_inferred: bool = False
+    gearing: Optional[GearRatioEstimator] = field(
+        default=None, repr=False, compare=False
+    )
+    # newest sample journal block the saved model includes
+    journal_seq: int = 0
 
 
 class ECU:
-    def __init__(self, storage_dir: str | None = None) -> None:
+    def __init__(
+        self,
+        storage_dir: str | None = None,
+        max_resident: int = 16,
+        autosave: bool = True,
+        estimator: str = "kalman",
+        read_only: bool = False,
+        warm_start: bool = True,
+    ) -> None:
         self.storage_dir = os.path.expanduser(storage_dir or "~/.gt7_ecu")
         os.makedirs(self.storage_dir, exist_ok=True)
-        self.models: Dict[int, CarModel] = {}
-        self._prev_speed: Optional[float] = None
-        self._accel_lp: float = 0.0
+        # read_only: models are read from the store but never saved (a
+        # process next to the one that writes it, e.g. a trainer worker)
+        self.read_only = read_only
+        self.store = ModelStore(
+            os.path.join(self.storage_dir, STORE_FILE), readonly=read_only
+        )
+        self._writer = ModelWriter(self.store.put, self.store.flush)
+        # least recently used first; evicted models are saved
+        self.max_resident = max(1, int(max_resident))
+        self.models: "OrderedDict[int, CarModel]" = OrderedDict()
+        self.autosave = autosave and not read_only
+        # seed learning curves from similar known cars (see _maybe_seed)
+        self.warm_start = warm_start
+        # learned samples go to the journal right away, models are saved
+        # when it is compacted (see _persist); cars with samples since
+        # their last save are in _unsaved. The journal is opened on first use
+        # (see _journal), on the thread that learns or loads, and closed by
+        # close().
+        self._journal_file: Optional[SampleJournal] = None
+        self._journal_lock = threading.Lock()
+        self._unsaved: Set[int] = set()
+        self._last_sync = self._last_compact = time.time()
+        # speed/acceleration estimator, see core.kinematics
+        self._kin = ESTIMATORS[estimator]()
+        self._accel: float = 0.0
         self._last_car_id: Optional[int] = None
-        self._last_save: float = 0.0
         self._dbg = {
             "ok": 0,
             "bad_gear": 0,
@@ -147,7 +624,21 @@ class ECU:
             "clutch": 0,
             "accel": 0,
             "speed": 0,
+            "warming": 0,
         }
+        # background model loads (see prefetch)
+        self._loader: Optional[ThreadPoolExecutor] = None
+        self._loading: Dict[int, Tuple[Future, float]] = {}
+        # car -> time.monotonic() before which a failed load is not retried
+        self._load_failed: Dict[int, float] = {}
+        self._loading_lock = threading.Lock()
+        # curve signatures of stored cars, built on the loader thread on the
+        # first warm-start lookup; models saved meanwhile are added on adoption
+        self._index: Optional[CurveIndex] = None
+        self._index_build: Optional[Future] = None
+        self._index_backlog: Dict[int, CarModel] = {}
+        self._switch_hist: List[int] = [0] * (len(SWITCH_BOUNDS_MS) + 1)
+        self._switch_max_ms = 0.0
         self._last_throttle_raw: float = 0.0
         self._last_throttle: float = 0.0  # normalized 0..1
         self._last_speed: float = 0.0  # m/s
@@ -156,35 +647,39 @@ class ECU:
     # --- Public ------------------------------------------------------------
     def update(self, pkt, dt: Optional[float]) -> None:
         car_id = int(getattr(pkt, "car_id", 0) or 0)
-        model = self._get_or_load_model(car_id)
+        model = self._resident_model(car_id)
+        if model is None:
+            # warming: the model is still loading, learn nothing until it is in
+            self._dbg["warming"] += 1
+            return
 
         # Redline hint only from rpm_alert.max
         rpm_alert = getattr(pkt, "rpm_alert", None)
         if rpm_alert is not None:
             mx = getattr(rpm_alert, "max", None)
-            if isinstance(mx, (int, float)) and mx > 2000:
+            if isinstance(mx, (int, float)) and mx > 2000 and mx != model.redline_rpm:
                 model.redline_rpm = float(mx)
+                self._rebuild_table(model)
         # keep idle sane
         model.idle_rpm = max(600.0, min(model.idle_rpm, 1400.0))
 
         # Gear ratios
         gr = list(getattr(pkt, "gear_ratios", []) or [])
-        if gr and (not model.gear_ratios or len(model.gear_ratios) != len(gr)):
-            model.gear_ratios = gr
+        if gr and (
+            model.ratios_inferred
+            or not model.gear_ratios
+            or len(model.gear_ratios) != len(gr)
+        ):
+            self._set_reported_ratios(model, gr)
 
-        # Speed estimate (prefer wheel RPS, else car_speed with km/h fix)
+        # Speed and acceleration from car_speed, fused with wheel speed
         wheel_radius = self._avg_wheel_radius(pkt) or 0.31
-        v = self._estimate_speed(pkt, wheel_radius)
+        car_speed = float(getattr(pkt, "car_speed", 0.0) or 0.0)
+        v, self._accel = self._kin.step(
+            car_speed, self._wheel_speed(pkt, wheel_radius), dt
+        )
         self._last_speed = v
 
-        a_raw = 0.0
-        if dt and dt > 1e-3 and self._prev_speed is not None:
-            a_raw = (v - self._prev_speed) / dt
-        self._prev_speed = v
-        tau = 0.20
-        alpha = (dt / (tau + dt)) if dt else 0.15
-        self._accel_lp = (1 - alpha) * self._accel_lp + alpha * a_raw
-
         rpm = float(getattr(pkt, "engine_rpm", 0.0) or 0.0)
         gear = int(getattr(pkt, "current_gear", 0) or 0)
         thr_raw = float(getattr(pkt, "throttle", 0.0) or 0.0)
@@ -195,10 +690,18 @@ class ECU:
         self._last_throttle_raw = thr_raw
         self._last_throttle = throttle
 
+        # No gear ratios from the game: infer them from rpm over speed
+        if (model.ratios_inferred or not model.gear_ratios) and clutch <= 0.05:
+            if self._gearing(model).add_one(rpm, v, gear, wheel_radius):
+                self._apply_inferred_ratios(model)
+
         # GT7 gear numbers are 1..N; map to ratios idx 0..N-1
         ratio_idx = gear - 1
         valid_gear = (
-            (gear >= 1) and (ratio_idx >= 0) and (ratio_idx < len(model.gear_ratios))
+            (gear >= 1)
+            and (ratio_idx >= 0)
+            and (ratio_idx < len(model.gear_ratios))
+            and model.gear_ratios[ratio_idx] > 0.0
         )
         if not valid_gear:
             self._dbg["bad_gear"] += 1
@@ -219,90 +722,273 @@ class ECU:
         if v < 1.0:
             self._dbg["speed"] += 1
             return
-        if self._accel_lp <= 0.0:
+        if self._accel <= 0.0:
             self._dbg["accel"] += 1
             return
 
         # Accept sample: torque proxy ~ a * R / G
         gear_ratio = model.gear_ratios[ratio_idx]
-        torque_proxy = self._accel_lp * wheel_radius / max(1e-6, gear_ratio)
+        torque_proxy = self._accel * wheel_radius / max(1e-6, gear_ratio)
         torque_proxy = max(0.0, min(torque_proxy, 50.0))
         model.curve.add_sample(rpm, torque_proxy)
         self._push_recent(model, gear, rpm, torque_proxy)
         self._dbg["ok"] += 1
+        if self._journal is not None:
+            self._journal.append(car_id, rpm, torque_proxy)
+            self._unsaved.add(car_id)
+        seeded = self._maybe_seed(model)
 
         # Recompute targets occasionally
         i = model.curve.idx(rpm) or 0
-        if (model.curve.counts[i] % 8) == 0:
+        if seeded or (model.curve.counts[i] % 8) == 0:
             self._recompute_targets(model)
+            self._rebuild_table(model)
+        elif model.curve.covered != model.table.covered_bins:
+            self._rebuild_table(model)
+
+        if self._journal is not None:
+            self._persist(time.time())
+
+    def update_batch(
+        self,
+        car_id: int,
+        rpm: np.ndarray,
+        gear: np.ndarray,
+        throttle: np.ndarray,
+        brake: np.ndarray,
+        speed: np.ndarray,
+        dt: np.ndarray,
+        clutch: Optional[np.ndarray] = None,
+        wheel_radius: float = 0.31,
+    ) -> None:
+        """:meth:`update` for consecutive frames of one car, as columns.
+
+        *speed* is in m/s and *dt* in seconds, NaN where a frame has no dt.
+        Gear ratios and the redline hint are not columns: frames that carry
+        them still go through :meth:`update` first. Counters, curve, targets
+        and filter state end up as after calling :meth:`update` per frame (up
+        to float rounding in the acceleration filter), except that a warm
+        start is looked up and inferred gear ratios are refreshed once per
+        batch (the latter before gating) rather than per frame.
+        """
+        n = len(rpm)
+        model = self._resident_model(car_id)
+        if model is None:
+            self._dbg["warming"] += n
+            return
+        if not n:
+            return
+        model.idle_rpm = max(600.0, min(model.idle_rpm, 1400.0))
+        rpm = np.asarray(rpm, dtype=np.float64)
+        gear = np.asarray(gear, dtype=np.int64)
+        thr_raw = np.asarray(throttle, dtype=np.float64)
+        brake = np.asarray(brake, dtype=np.float64)
+        v = np.asarray(speed, dtype=np.float64)
+        dt = np.asarray(dt, dtype=np.float64)
+
+        # speed and acceleration, as update() estimates them frame by frame
+        v, accel = self._kin.run(v, dt)
+        self._accel = float(accel[-1])
+        self._last_speed = float(v[-1])
+
+        thr = self._normalize_throttles(thr_raw)
+        self._last_throttle_raw = float(thr_raw[-1])
+        self._last_throttle = float(thr[-1])
+
+        if model.ratios_inferred or not model.gear_ratios:
+            if self._gearing(model).add(rpm, v, gear, wheel_radius, clutch):
+                self._apply_inferred_ratios(model)
+
+        # gates in update() order; a frame counts against the first it fails
+        all_ratios = np.asarray(model.gear_ratios, dtype=np.float64)
+        in_box = (gear >= 1) & (gear <= len(all_ratios))
+        bad_gear = ~in_box
+        if len(all_ratios):
+            bad_gear |= all_ratios[np.where(in_box, gear - 1, 0)] <= 0.0
+        passed = np.ones(n, dtype=bool)
+        for key, failed in (
+            ("bad_gear", bad_gear),
+            ("rpm_gate", rpm < 1200.0),
+            ("throttle", thr < 0.85),
+            ("brake", brake > 0.02),
+            ("clutch", None if clutch is None else np.asarray(clutch) > 0.05),
+            ("speed", v < 1.0),
+            ("accel", accel <= 0.0),
+        ):
+            if failed is None:
+                continue
+            self._dbg[key] += int(np.count_nonzero(passed & failed))
+            passed &= ~failed
+        ok = np.flatnonzero(passed)
+        if not len(ok):
+            return
+        self._dbg["ok"] += len(ok)
+
+        ratios = all_ratios[gear[ok] - 1]
+        proxy = np.clip(
+            accel[ok] * wheel_radius / np.maximum(1e-6, ratios), 0.0, 50.0
+        )
+        rpm_ok = rpm[ok]
+        if self._journal is not None:
+            self._journal.extend(car_id, rpm_ok, proxy)
+            self._unsaved.add(car_id)
+        curve = model.curve
+        state = curve.checkpoint()
+        count0 = int(curve.counts[0]) if len(curve.counts) else 0
+        bins, counts_after = curve.add_samples(rpm_ok, proxy)
+
+        # update() recomputes when the sample's bin count hits a multiple of
+        # 8 (bin 0 for out-of-range rpm); only the last such recompute shows
+        out = np.flatnonzero(bins < 0)
+        if len(out):
+            zero = np.flatnonzero(bins == 0)
+            if len(zero):
+                j = np.searchsorted(zero, out) - 1
+                counts_after[out] = np.where(
+                    j >= 0, counts_after[zero[np.maximum(j, 0)]], count0
+                )
+            else:
+                counts_after[out] = count0
+        due = np.flatnonzero(counts_after % 8 == 0)
+        if len(due):
+            k = int(due[-1]) + 1
+            if k < len(ok):
+                curve.restore(state)
+                curve.add_samples(rpm_ok[:k], proxy[:k])
+                self._recompute_targets(model)
+                curve.add_samples(rpm_ok[k:], proxy[k:])
+            else:
+                self._recompute_targets(model)
+        if self._maybe_seed(model):
+            self._recompute_targets(model)
+        self._rebuild_table(model)
 
-        # Autosave
         now = time.time()
-        if now - self._last_save > 7.0:
-            self.save_if_needed()
-            self._last_save = now
+        gear_ok = gear[ok]
+        for g in np.unique(gear_ok).tolist():
+            sel = gear_ok == g
+            recent = model.recent_by_gear.get(g)
+            if recent is None:
+                recent = model.recent_by_gear[g] = RecentSamples()
+            recent.extend(rpm_ok[sel], proxy[sel], now)
+
+        if self._journal is not None:
+            self._persist(now)
 
     def get_shift_targets(
         self, pkt
-    ) -> Tuple[Optional[float], Optional[float], Dict[str, float]]:
+    ) -> Tuple[Optional[float], Optional[float], ShiftInfo]:
         car_id = int(getattr(pkt, "car_id", 0) or 0)
-        model = self._get_or_load_model(car_id)
+        table = self.shift_table(car_id)
         gear = int(getattr(pkt, "current_gear", 0) or 0)
         rpm = float(getattr(pkt, "engine_rpm", 0.0) or 0.0)
-        up = model.shift_up_rpm.get(gear)
-        dn = model.shift_down_rpm.get(gear)
-        info = {
-            "coverage": model.curve.coverage(),
-            "redline": model.redline_rpm,
-            "gear": float(gear),
-            "rpm": rpm,
-            "thr_raw": self._last_throttle_raw,
-            "thr": self._last_throttle,
-            "speed": self._last_speed,
-            "dbg": (
-                f"ok:{self._dbg['ok']} badg:{self._dbg['bad_gear']} rpm:{self._dbg['rpm_gate']} "
-                f"Th:{self._dbg['throttle']} Br:{self._dbg['brake']} Cl:{self._dbg['clutch']} "
-                f"a:{self._dbg['accel']} v:{self._dbg['speed']}"
+        up, dn = table.targets(gear)
+        return up, dn, ShiftInfo(table, gear, rpm, self)
+
+    def shift_table(self, car_id: int) -> ShiftTable:
+        """Current shift table of *car_id* (an immutable snapshot); empty
+        while the model is warming."""
+        model = self._resident_model(car_id)
+        return model.table if model is not None else ShiftTable()
+
+    def debug_counters(self) -> str:
+        """Why samples were accepted or gated, as a compact string."""
+        d = self._dbg
+        return (
+            f"ok:{d['ok']} badg:{d['bad_gear']} rpm:{d['rpm_gate']} "
+            f"Th:{d['throttle']} Br:{d['brake']} Cl:{d['clutch']} "
+            f"a:{d['accel']} v:{d['speed']} w:{d['warming']}"
+        )
+
+    def prefetch(self, car_id: int) -> None:
+        """Start loading *car_id* in the background. Thread-safe; call it as
+        soon as a car change is seen, :meth:`update` skips that car's frames
+        until the model is in."""
+        if car_id in self.models:
+            return
+        with self._loading_lock:
+            if car_id in self._loading:
+                return
+            future = self._loader_pool().submit(self._load_model, car_id)
+            self._loading[car_id] = (future, time.perf_counter())
+
+    def _loader_pool(self) -> ThreadPoolExecutor:
+        # callers hold _loading_lock
+        if self._loader is None:
+            self._loader = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="ecu-load"
+            )
+        return self._loader
+
+    def warming(self, car_id: int) -> bool:
+        """True while *car_id* has no resident model yet."""
+        return car_id not in self.models
+
+    def switch_latency(self) -> Dict[str, Any]:
+        """Histogram of car-switch handling: prefetch request to model resident."""
+        return {
+            "switches": sum(self._switch_hist),
+            "max_ms": self._switch_max_ms,
+            "hist_ms": dict(
+                zip([*map(str, SWITCH_BOUNDS_MS), "inf"], self._switch_hist)
             ),
         }
-        return up, dn, info
 
     def progress_fraction(self, rpm: float, target_up_rpm: Optional[float]) -> float:
         if target_up_rpm and target_up_rpm > 0:
             return max(0.0, min(1.2, rpm / target_up_rpm))
         return 0.0
 
-    def get_plot_data(
-        self, pkt, gear: int
-    ) -> Tuple[
-        List[Tuple[float, float, float]],
-        Tuple[float, float, float],
-        List[Tuple[float, float]],
-    ]:
+    def get_plot_data(self, pkt, gear: int) -> PlotData:
         car_id = int(getattr(pkt, "car_id", 0) or 0)
-        model = self._get_or_load_model(car_id)
-        dq = model.recent_by_gear.get(int(gear))
-        now = time.time()
-        pts: List[Tuple[float, float, float]] = []
-        if dq is not None:
-            pts = [(r, p, max(0.0, now - ts)) for (r, p, ts) in list(dq)]
-        xs, ys = model.curve.smoothed()
-        y_max = 0.0
-        if ys:
-            y_max = max(y_max, max(ys))
-        if pts:
-            y_max = max(y_max, max(p for _, p, _ in pts))
-        if y_max <= 1e-6:
-            y_max = 1.0
-        curve = list(zip(xs, ys)) if xs and ys else []
-        return pts, (model.curve.rpm_min, model.curve.rpm_max, y_max), curve
+        model = self._resident_model(car_id)
+        if model is None:
+            return ECUSnapshot(car_id).plot_data(gear)
+        recent = model.recent_by_gear.get(int(gear))
+        return _plot_data(
+            int(gear),
+            recent.view() if recent is not None else SampleView(),
+            self._curve_view(model.curve),
+            model.curve.version,
+            model.curve.rpm_min,
+            model.curve.rpm_max,
+        )
+
+    def snapshot(self, car_id: int) -> ECUSnapshot:
+        """Copy of what the widgets need for *car_id* (see :class:`ECUSnapshot`);
+        empty while the model is warming."""
+        model = self._resident_model(car_id)
+        if model is None:
+            return ECUSnapshot(car_id)
+        return ECUSnapshot(
+            car_id=car_id,
+            table=model.table,
+            curve=self._curve_view(model.curve),
+            curve_version=model.curve.version,
+            rpm_range=(model.curve.rpm_min, model.curve.rpm_max),
+            recent_by_gear={g: r.view() for g, r in model.recent_by_gear.items()},
+            thr_raw=self._last_throttle_raw,
+            thr=self._last_throttle,
+            speed=self._last_speed,
+            dbg=self.debug_counters(),
+        )
+
+    def tick(self, now: Optional[float] = None) -> None:
+        """Periodic housekeeping, whether or not samples were accepted: the
+        journal is synced every JOURNAL_SYNC_S, so a sample never waits for
+        the next accepted one to reach the disk. Call it at least that often."""
+        if self._journal_file is not None:
+            self._persist(time.time() if now is None else now)
 
     def save_if_needed(self) -> None:
         for cm in self.models.values():
-            # save every 15 seconds
-            if time.time() - cm.curve.last_updated < 15.0:
+            if self._recently_updated(cm):
                 self._save_model(cm)
 
+    def known_cars(self) -> List[int]:
+        """Every car with a stored model, resident or not."""
+        return sorted(set(self.store.car_ids()) | set(self.models))
+
     # --- Internals ---------------------------------------------------------
     def _normalize_throttle(self, t: float) -> float:
         # Normalize throttle from common telemetry ranges to [0,1].
@@ -319,11 +1005,206 @@ class ECU:
         return max(0.0, min(1.0, t / max(1.0, self._thr_seen_max)))
 
     def _get_or_load_model(self, car_id: int) -> CarModel:
-        if car_id not in self.models:
-            cm = self._load_model(car_id)
-            self.models[car_id] = cm
-            self._last_car_id = car_id
-        return self.models[car_id]
+        """The model of *car_id*, loading it on this thread if need be."""
+        cm = self._resident_model(car_id)
+        if cm is not None:
+            return cm
+        with self._loading_lock:
+            pending = self._loading.pop(car_id, None)
+        if pending is not None:
+            try:
+                cm = pending[0].result()
+            except Exception:
+                cm = None
+            self._record_switch(pending[1])
+        return self._install(cm or self._load_model(car_id))
+
+    def _resident_model(self, car_id: int) -> Optional[CarModel]:
+        """The model of *car_id* if resident (or just loaded), else None;
+        never blocks, a missing model is prefetched."""
+        models = self.models
+        cm = models.get(car_id)
+        if cm is not None:
+            if car_id != self._last_car_id:
+                models.move_to_end(car_id)
+                self._last_car_id = car_id
+                if self._loading:
+                    # a prefetch that raced the install would be stale later
+                    with self._loading_lock:
+                        self._loading.pop(car_id, None)
+            return cm
+        with self._loading_lock:
+            pending = self._loading.get(car_id)
+            if pending is not None and pending[0].done():
+                del self._loading[car_id]
+        if pending is None:
+            retry_at = self._load_failed.get(car_id)
+            if retry_at is None or time.monotonic() >= retry_at:
+                self.prefetch(car_id)
+            return None
+        if not pending[0].done():
+            return None
+        try:
+            cm = pending[0].result()
+        except Exception as e:
+            # an empty model in its place would be learned into and saved
+            # over the stored one: keep warming and load again later
+            LOGGER.error(f"loading the model of car {car_id} failed: {e}")
+            self._load_failed[car_id] = time.monotonic() + LOAD_RETRY_S
+            return None
+        self._load_failed.pop(car_id, None)
+        self._record_switch(pending[1])
+        return self._install(cm)
+
+    def _record_switch(self, requested_at: float) -> None:
+        ms = (time.perf_counter() - requested_at) * 1e3
+        self._switch_hist[bisect.bisect_left(SWITCH_BOUNDS_MS, ms)] += 1
+        self._switch_max_ms = max(self._switch_max_ms, ms)
+
+    def _install(self, cm: CarModel) -> CarModel:
+        with self._loading_lock:
+            self._loading.pop(cm.car_id, None)
+        self._load_failed.pop(cm.car_id, None)
+        models = self.models
+        self._rebuild_table(cm)
+        models[cm.car_id] = cm
+        self._last_car_id = cm.car_id
+        while len(models) > self.max_resident:
+            _, evicted = models.popitem(last=False)
+            if self.autosave and (
+                evicted.car_id in self._unsaved or self._recently_updated(evicted)
+            ):
+                self._save_model(evicted)
+        return cm
+
+    def _gearing(self, model: CarModel) -> GearRatioEstimator:
+        if model.gearing is None:
+            model.gearing = GearRatioEstimator()
+        return model.gearing
+
+    def _apply_inferred_ratios(self, model: CarModel) -> None:
+        ratios = model.gearing.merged(model.gear_ratios)
+        if ratios == model.gear_ratios:
+            return
+        model.gear_ratios = ratios
+        model.ratios_inferred = True
+        self._recompute_targets(model)
+        self._rebuild_table(model)
+
+    def _set_reported_ratios(self, model: CarModel, gr: List[float]) -> None:
+        if model.ratios_inferred and model.gear_ratios:
+            # the curve was learned against overall ratios; the game reports
+            # gearbox ratios, so proxies grow by the final drive (and the
+            # wheel radius error): move the curve into the new units
+            old = np.asarray(model.gear_ratios[: len(gr)], dtype=np.float64)
+            new = np.asarray(gr[: len(old)], dtype=np.float64)
+            both = (old > 0.0) & (new > 0.0)
+            if both.any():
+                model.curve.rescale(float(np.median(old[both] / new[both])))
+                if self.autosave:
+                    # journaled samples before this point are in the old units
+                    self._save_model(model)
+        model.gear_ratios = gr
+        model.ratios_inferred = False
+        model.gearing = None
+        self._rebuild_table(model)
+
+    def _maybe_seed(self, model: CarModel) -> bool:
+        """Warm-start a learning curve from the most similar known car.
+
+        Looked up whenever the covered bins of a car below READY change,
+        until one match is close enough; only bins without samples are
+        filled, scaled to the car's own curve. Skipped while the index of
+        stored cars is still being built. True if bins were seeded.
+        """
+        curve = model.curve
+        if (
+            not self.warm_start
+            or model.seeded_from is not None
+            or curve.covered < MIN_OVERLAP
+            or curve.covered == model.seed_checked
+            or curve.coverage() >= READY_COVERAGE
+        ):
+            return False
+        index = self._curve_index(len(curve.means))
+        if index is None:
+            return False
+        model.seed_checked = curve.covered
+        match = index.nearest(model)
+        if match is None or match.distance > SEED_MAX_DISTANCE:
+            return False
+        sig = index.signature(match.car_id)
+        if not curve.seed(match.scale * sig):
+            return False
+        model.seeded_from = match.car_id
+        return True
+
+    def _curve_index(self, n_bins: int) -> Optional[CurveIndex]:
+        """The index of known cars, or None while it is being built (the
+        first call starts the build on the loader thread)."""
+        if self._index is not None:
+            return self._index
+        build = self._index_build
+        if build is None:
+            with self._loading_lock:
+                self._index_build = self._loader_pool().submit(
+                    self._build_index, n_bins
+                )
+            return None
+        if not build.done():
+            return None
+        try:
+            index = build.result()
+        except Exception:
+            index = CurveIndex(n_bins)
+        # the worker's own models are newer than anything read from disk
+        for cm in self._index_backlog.values():
+            index.update(cm)
+        for cm in self.models.values():
+            index.update(cm)
+        self._index_backlog.clear()
+        self._index = index
+        return index
+
+    def _build_index(self, n_bins: int) -> CurveIndex:
+        """Decode every stored model into a :class:`CurveIndex` (loader thread)."""
+        index = CurveIndex(n_bins)
+        for car_id in self.store.car_ids():
+            blob = self._writer.pending(car_id) or self.store.get(car_id)
+            try:
+                index.update(self._model_from(car_id, decode_model(blob)))
+            except Exception:
+                pass
+        return index
+
+    def _rebuild_table(self, model: CarModel) -> None:
+        gears = [*model.shift_up_rpm, *model.shift_down_rpm, len(model.gear_ratios)]
+        n = max(gears) + 1
+        up = tuple(model.shift_up_rpm.get(g) for g in range(n))
+        model.table = ShiftTable(
+            up=up,
+            down=tuple(model.shift_down_rpm.get(g) for g in range(n)),
+            progress_scale=tuple(1.0 / u if u and u > 0 else 0.0 for u in up),
+            coverage=model.curve.coverage(),
+            covered_bins=model.curve.covered,
+            redline=model.redline_rpm,
+        )
+
+    def _normalize_throttles(self, t: np.ndarray) -> np.ndarray:
+        """Vectorized :meth:`_normalize_throttle`, including the running max."""
+        out = np.where(
+            t <= 1.2,
+            t,
+            np.where(t <= 110.0, t / 100.0, np.where(t <= 260.0, t / 255.0, np.nan)),
+        )
+        big = t > 260.0
+        if big.any():
+            seen = np.maximum(
+                np.maximum.accumulate(np.where(big, t, -np.inf)), self._thr_seen_max
+            )
+            self._thr_seen_max = float(seen[-1])
+            out = np.where(big, t / np.maximum(1.0, seen), out)
+        return np.clip(out, 0.0, 1.0)
 
     def _avg_wheel_radius(self, pkt) -> Optional[float]:
         wheels = getattr(pkt, "wheels", None)
@@ -346,52 +1227,42 @@ class ECU:
             return None
         return sum(radii) / len(radii)
 
-    def _estimate_speed(self, pkt, wheel_radius: float) -> float:
-        # """Return vehicle speed in m/s.
-        # Prefer wheel RPS; if it's tiny, fall back to wheel ground_speed; then car_speed.
-        # Convert car_speed from km/h when needed.
-        # """
-        # wheels = getattr(pkt, "wheels", None)
-        # # 1) Prefer RPS if sensible
-        # rps_vals = []
-        # try:
-        #     rps_vals = [float(getattr(w, "rps", 0.0) or 0.0) for w in (wheels or [])]
-        # except TypeError:
-        #     for name in ("front_left", "front_right", "rear_left", "rear_right"):
-        #         w = getattr(wheels, name, None)
-        #         if w is not None:
-        #             rps_vals.append(float(getattr(w, "rps", 0.0) or 0.0))
-        # if rps_vals:
-        #     avg_rps = sum(rps_vals) / len(rps_vals)
-        #     if avg_rps > 0.2:  # ~ >1.25 m/s with 0.31 m radius
-        #         return 2.0 * math.pi * avg_rps * wheel_radius
-
-        # # 2) Try wheel ground_speed (already m/s in schema)
-        # gs = []
-        # try:
-        #     gs = [float(getattr(w, "ground_speed", 0.0) or 0.0) for w in (wheels or [])]
-        # except TypeError:
-        #     for name in ("front_left", "front_right", "rear_left", "rear_right"):
-        #         w = getattr(wheels, name, None)
-        #         if w is not None:
-        #             gs.append(float(getattr(w, "ground_speed", 0.0) or 0.0))
-        # if gs:
-        #     avg_gs = sum(gs) / len(gs)
-        #     if abs(avg_gs) > 0.5:
-        #         return avg_gs
-
-        # 3) Fallback: car_speed in m/s
-        v = float(getattr(pkt, "car_speed", 0.0))
-        return v
+    def _wheel_speed(self, pkt, wheel_radius: float) -> Optional[float]:
+        """Ground speed from wheel RPS in m/s, or None without wheel data.
+
+        The slowest wheel is used: a spinning driven wheel reads fast, and
+        the estimator rejects readings that disagree with car_speed anyway.
+        """
+        wheels = getattr(pkt, "wheels", None)
+        if not wheels:
+            return None
+        try:
+            rps = [float(getattr(w, "rps", 0.0) or 0.0) for w in wheels]
+        except TypeError:
+            rps = [
+                float(getattr(w, "rps", 0.0) or 0.0)
+                for name in ("front_left", "front_right", "rear_left", "rear_right")
+                if (w := getattr(wheels, name, None)) is not None
+            ]
+        if not rps:
+            return None
+        return 2.0 * math.pi * min(abs(r) for r in rps) * wheel_radius
 
     def _push_recent(
         self, model: CarModel, gear: int, rpm: float, proxy: float
     ) -> None:
-        dq = model.recent_by_gear.get(gear)
-        if dq is None:
-            dq = deque(maxlen=500)
-            model.recent_by_gear[gear] = dq
-        dq.append((float(rpm), float(proxy), time.time()))
+        recent = model.recent_by_gear.get(gear)
+        if recent is None:
+            recent = model.recent_by_gear[gear] = RecentSamples()
+        recent.append(rpm, proxy, time.time())
+
+    @staticmethod
+    def _curve_view(curve: DynoCurve) -> Tuple[np.ndarray, np.ndarray]:
+        # smoothed() returns a fresh array after every change, never mutates
+        xs, ys = curve.smoothed()
+        xs.flags.writeable = False
+        ys.flags.writeable = False
+        return xs, ys
 
     # def _recompute_targets(self, model: CarModel) -> None:
     #     gr = model.gear_ratios
@@ -445,113 +1316,219 @@ class ECU:
         if not gr:
             return
 
-        xs, ys = model.curve.smoothed()
+        curve = model.curve
+        xs, ys = curve.smoothed()
+        # seeded bins stand in for samples until the car's own arrive
+        covered = curve.confident | curve.seeded
         # need some data overall
-        if sum(1 for c in model.curve.counts if c >= 3) < 8:
+        if np.count_nonzero(covered) < 8:
             return
 
-        def have_bin(rpm: float, min_ct: int = 3) -> bool:
-            i = model.curve.idx(rpm)
-            return (i is not None) and (model.curve.counts[i] >= min_ct)
+        # adjacent gear pairs: g (1-based) and g+1, the higher gear must be longer
+        g = np.arange(1, len(gr))
+        Gg = np.asarray(gr[:-1], dtype=np.float64)
+        Gn = np.asarray(gr[1:], dtype=np.float64)
+        keep = (Gg > 0) & (Gn > 0) & (Gn < Gg)
+        if not keep.any():
+            return
+        g, Gg, Gn = g[keep], Gg[keep], Gn[keep]
 
-        for g in range(1, len(gr)):  # current gear
-            Gg = gr[g - 1]
-            Gn = gr[g] if g < len(gr) else None
-            if Gn is None or Gg <= 0 or Gn <= 0:
-                continue
-            # next gear must be longer (Gn < Gg) for an upshift; otherwise skip
-            if not (Gn < Gg):
-                continue
+        # One evaluation serves both directions: the engine rpm after an
+        # upshift from every bin of gear g, and after a downshift from every
+        # bin of gear g+1. Rows are gear pairs, columns bins.
+        k = Gn / Gg
+        rpm_other = xs[None, None, :] * np.stack((k, 1.0 / k))[:, :, None]
+        i_other = curve.indices(rpm_other)
+        covered_other = (i_other >= 0) & covered[np.maximum(i_other, 0)]
+        wheel_other = np.interp(rpm_other, xs, ys) * np.stack((Gn, Gg))[:, :, None]
+        rpm_low = rpm_other[1]
+        in_rev = xs <= model.redline_rpm
 
-            # sensible floor for targets (prevents 1200rpm nonsense)
-            min_target = max(
-                model.idle_rpm + 800.0, (0.35 if g == 1 else 0.45) * model.redline_rpm
-            )
+        # sensible floor for targets (prevents 1200rpm nonsense)
+        min_target = np.maximum(
+            model.idle_rpm + 800.0,
+            np.where(g == 1, 0.35, 0.45) * model.redline_rpm,
+        )
+        up_ok = (
+            (xs[None, :] >= min_target[:, None])
+            & in_rev[None, :]
+            # require coverage in both bins
+            & covered[None, :]
+            & covered_other[0]
+            # torque at the wheels is at least as high after the shift
+            & (wheel_other[0] >= ys[None, :] * Gg[:, None])
+        )
+        fallback = min(model.redline_rpm, float(xs[-1]) if len(xs) else model.redline_rpm)
+        best = np.where(up_ok.any(axis=1), xs[up_ok.argmax(axis=1)], fallback)
+        # final clamp
+        best = np.maximum(min_target, np.minimum(best, model.redline_rpm))
+        for gear, rpm in zip(g.tolist(), best.tolist()):
+            model.shift_up_rpm[gear] = rpm
 
-            best_rpm = None
-            for rpm in xs:
-                if rpm < min_target:
-                    continue
-                if rpm > model.redline_rpm:
-                    break
-                rpm_next = rpm * (Gn / Gg)
-                # require coverage in both bins
-                if not (have_bin(rpm) and have_bin(rpm_next)):
-                    continue
-
-                t_curr = model.curve.torque_at(rpm) * Gg
-                t_next = model.curve.torque_at(rpm_next) * Gn
-                if t_next >= t_curr:
-                    best_rpm = rpm
-                    break
-
-            if best_rpm is None:
-                best_rpm = min(model.redline_rpm, xs[-1] if xs else model.redline_rpm)
-
-            # final clamp
-            best_rpm = max(min_target, min(best_rpm, model.redline_rpm))
-            model.shift_up_rpm[g] = best_rpm
+        # downshift from g+1: the lowest rpm at which gear g+1 pulls at least
+        # as hard as gear g would (or gear g would overrev); below it, shift down
+        stay = (
+            (xs >= 1000.0)[None, :]
+            & covered[None, :]
+            & covered_other[1]
+            & (
+                (ys[None, :] * Gn[:, None] >= wheel_other[1])
+                | (rpm_low > model.redline_rpm)
+            )
+        )
+        down = np.where(stay.any(axis=1), xs[stay.argmax(axis=1)], 1400.0)
+        down = np.minimum(down, model.redline_rpm)
+        for gear, rpm in zip((g + 1).tolist(), down.tolist()):
+            model.shift_down_rpm[gear] = rpm
 
     # --- Persistence -------------------------------------------------------
+    @staticmethod
+    def _recently_updated(cm: CarModel) -> bool:
+        # changes the journal does not carry (warm starts, ratios) are saved
+        # with the car's next save; this catches the ones still unsaved
+        return time.time() - cm.curve.last_updated < 15.0
+
+    def _persist(self, now: float) -> None:
+        """fsync the journal every JOURNAL_SYNC_S; compact it when due."""
+        if now - self._last_sync < JOURNAL_SYNC_S:
+            return
+        self._last_sync = now
+        journal = self._journal
+        journal.sync()
+        if journal.size > JOURNAL_COMPACT_BYTES or (
+            now - self._last_compact > JOURNAL_COMPACT_S and journal.car_ids()
+        ):
+            self._compact_journal()
+
+    def _compact_journal(self) -> None:
+        """Save every car with journaled samples, then empty the journal.
+
+        The journal is only emptied once every save is on disk: after a
+        failed write or sync (disk full, I/O error) it stays, and the next
+        load replays it.
+        """
+        journal = self._journal
+        self._last_compact = time.time()
+        with journal.lock:
+            errors = self._writer.errors
+            for car_id in journal.car_ids():
+                cm = self.models.get(car_id)
+                self._save_model(cm if cm is not None else self._load_model(car_id))
+            if self._writer.flush() and self._writer.errors == errors:
+                journal.reset()
+
     def _model_path(self, car_id: int) -> str:
+        return os.path.join(self.storage_dir, f"dyno_{car_id}.ecm")
+
+    def _legacy_model_path(self, car_id: int) -> str:
         return os.path.join(self.storage_dir, f"dyno_{car_id}.json")
 
     def _load_model(self, car_id: int) -> CarModel:
+        """The saved model of *car_id* plus what the journal has beyond it."""
+        journal = self._journal
+        if journal is None:
+            return self._read_model(car_id)
+        with journal.lock:
+            cm = self._read_model(car_id)
+            rpm, proxy = journal.replay(car_id, cm.journal_seq)
+        if len(rpm):
+            cm.curve.add_samples(rpm, proxy)
+            self._recompute_targets(cm)
+        return cm
+
+    def _read_model(self, car_id: int) -> CarModel:
+        # an evicted model may not have reached the store yet
+        blob = self._writer.pending(car_id)
+        if blob is None:
+            blob = self.store.get(car_id)
+        if blob is not None:
+            try:
+                return self._model_from(car_id, decode_model(blob))
+            except Exception:
+                pass
+        # one file per car, from before the store; moved into it on save
         path = self._model_path(car_id)
+        if os.path.isfile(path):
+            try:
+                return self._model_from(car_id, read_model_file(path))
+            except Exception:
+                pass
+        path = self._legacy_model_path(car_id)
         if os.path.isfile(path):
             try:
                 with open(path, "r", encoding="utf-8") as f:
                     data = json.load(f)
-                curve = DynoCurve(
-                    rpm_min=data.get("rpm_min", 800.0),
-                    rpm_max=data.get("rpm_max", 12000.0),
-                    bin_size=data.get("bin_size", 100.0),
-                    torque_bins=data.get("torque_bins", []),
-                    counts=data.get("counts", []),
-                )
-                cm = CarModel(
-                    car_id=car_id,
-                    curve=curve,
-                    gear_ratios=data.get("gear_ratios", []),
-                    redline_rpm=data.get("redline_rpm", 7500.0),
-                    idle_rpm=data.get("idle_rpm", 800.0),
-                    shift_up_rpm={
-                        int(k): float(v)
-                        for k, v in data.get("shift_up_rpm", {}).items()
-                    },
-                    shift_down_rpm={
-                        int(k): float(v)
-                        for k, v in data.get("shift_down_rpm", {}).items()
-                    },
-                )
-                return cm
+                return self._model_from(car_id, data)
             except Exception:
                 pass
         return CarModel(car_id=car_id)
 
+    def _model_from(self, car_id: int, data: Dict[str, Any]) -> CarModel:
+        curve = DynoCurve(
+            rpm_min=data.get("rpm_min", 800.0),
+            rpm_max=data.get("rpm_max", 12000.0),
+            bin_size=data.get("bin_size", 100.0),
+            torque_bins=data.get("torque_bins", []),
+            counts=data.get("counts", []),
+            means=data.get("means", []),
+            m2=data.get("m2", []),
+        )
+        return CarModel(
+            car_id=car_id,
+            curve=curve,
+            gear_ratios=data.get("gear_ratios", []),
+            ratios_inferred=data.get("ratios_inferred", False),
+            journal_seq=data.get("journal_seq", 0),
+            redline_rpm=data.get("redline_rpm", 7500.0),
+            idle_rpm=data.get("idle_rpm", 800.0),
+            shift_up_rpm={
+                int(k): float(v) for k, v in data.get("shift_up_rpm", {}).items()
+            },
+            shift_down_rpm={
+                int(k): float(v) for k, v in data.get("shift_down_rpm", {}).items()
+            },
+        )
+
     def _save_model(self, cm: CarModel) -> None:
+        # encoded here, written by the write-behind thread
+        if self.read_only:
+            return
+        if self._journal is not None:
+            cm.journal_seq = self._journal.flush()
+            self._unsaved.discard(cm.car_id)
         try:
-            path = self._model_path(cm.car_id)
-            tmp = path + ".tmp"
-            with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(
-                    {
-                        "rpm_min": cm.curve.rpm_min,
-                        "rpm_max": cm.curve.rpm_max,
-                        "bin_size": cm.curve.bin_size,
-                        "torque_bins": cm.curve.torque_bins,
-                        "counts": cm.curve.counts,
-                        "gear_ratios": cm.gear_ratios,
-                        "redline_rpm": cm.redline_rpm,
-                        "idle_rpm": cm.idle_rpm,
-                        "shift_up_rpm": cm.shift_up_rpm,
-                        "shift_down_rpm": cm.shift_down_rpm,
-                        "saved_at": time.time(),
-                    },
-                    f,
-                    indent=2,
-                )
-            os.replace(tmp, path)
-            print("ECU model updated...")
+            self._writer.submit(cm.car_id, encode_model(cm))
         except Exception:
             pass
+        if self._index is not None:
+            self._index.update(cm)
+        elif self._index_build is not None:
+            self._index_backlog[cm.car_id] = cm
+
+    def close(self) -> None:
+        """Save recently updated models and wait until they are on disk."""
+        with self._loading_lock:
+            loader, self._loader = self._loader, None
+            self._loading.clear()
+        if loader is not None:
+            loader.shutdown(wait=True)
+        if self._journal_file is not None:
+            self._compact_journal()
+        self.save_if_needed()
+        self._writer.close()
+        self.store.close()
+        with self._journal_lock:
+            journal, self._journal_file = self._journal_file, None
+        if journal is not None:
+            journal.close()
+
+    @property
+    def _journal(self) -> Optional[SampleJournal]:
+        """The sample journal (None without autosave), opened on first use."""
+        if self._journal_file is None and self.autosave:
+            with self._journal_lock:
+                if self._journal_file is None:
+                    self._journal_file = SampleJournal(
+                        os.path.join(self.storage_dir, JOURNAL_FILE)
+                    )
+        return self._journal_file
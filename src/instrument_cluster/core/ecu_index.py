@@ -0,0 +1,136 @@
+"""Nearest-neighbour lookup over the torque curves of known cars.
+
+A car's signature is its curve normalized to a peak of 1 (NaN in bins that
+are not confident), its redline and its gear ratios. :meth:`CurveIndex.nearest`
+compares a partially learned curve against every signature at once: per car,
+the least-squares scale onto the bins both have covered, the residual of
+that fit relative to the curve's mean, and penalties for redline and gear
+ratio differences. Models are duck-typed (``car_id``, ``curve.means``,
+``curve.confident``, ``redline_rpm``, ``gear_ratios``), as in ``ecu_store``.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Gear ratios compared per car (the first gears; GT7 has at most 8).
+MAX_GEARS = 10
+# Fewest bins a query and a candidate must both have covered.
+MIN_OVERLAP = 5
+# Distance per unit |log| redline and mean |log| gear ratio difference.
+REDLINE_WEIGHT = 1.0
+RATIO_WEIGHT = 0.5
+
+
+@dataclass(frozen=True)
+class CurveMatch:
+    car_id: int
+    # query curve ~ scale * candidate curve on the shared bins
+    scale: float
+    distance: float
+    overlap: int
+
+
+class CurveIndex:
+    """Signatures of known cars in NumPy rows, one per car_id."""
+
+    def __init__(self, n_bins: int) -> None:
+        self.n_bins = n_bins
+        self._rows: Dict[int, int] = {}
+        self._car_ids: List[int] = []
+        self._sig = np.full((0, n_bins), np.nan)
+        self._redline = np.zeros(0)
+        self._ratios = np.full((0, MAX_GEARS), np.nan)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, car_id: int) -> bool:
+        return car_id in self._rows
+
+    def update(self, model: Any) -> None:
+        """Add or replace the signature of *model*; curves with another bin
+        layout or nothing covered are left out."""
+        curve = model.curve
+        if len(curve.means) != self.n_bins:
+            return
+        sig = np.where(curve.confident, curve.means, np.nan)
+        peak = np.nanmax(sig) if curve.confident.any() else 0.0
+        if not peak > 0.0:
+            return
+        row = self._rows.get(model.car_id)
+        if row is None:
+            row = len(self._car_ids)
+            if row == len(self._sig):
+                self._grow(max(16, 2 * row))
+            self._rows[model.car_id] = row
+            self._car_ids.append(model.car_id)
+        self._sig[row] = sig / peak
+        self._redline[row] = model.redline_rpm
+        ratios = np.asarray(model.gear_ratios[:MAX_GEARS], dtype=np.float64)
+        self._ratios[row] = np.nan
+        self._ratios[row, : len(ratios)] = np.where(ratios > 0.0, ratios, np.nan)
+
+    def _grow(self, capacity: int) -> None:
+        n = len(self._sig)
+        sig = np.full((capacity, self.n_bins), np.nan)
+        sig[:n] = self._sig
+        redline = np.zeros(capacity)
+        redline[:n] = self._redline
+        ratios = np.full((capacity, MAX_GEARS), np.nan)
+        ratios[:n] = self._ratios
+        self._sig, self._redline, self._ratios = sig, redline, ratios
+
+    def nearest(self, model: Any) -> Optional[CurveMatch]:
+        """The known car closest to *model* (itself excluded), or None when
+        no car shares ``MIN_OVERLAP`` covered bins with it."""
+        n = len(self._car_ids)
+        curve = model.curve
+        if not n or len(curve.means) != self.n_bins:
+            return None
+        own = np.where(curve.confident, curve.means, np.nan)
+        sig = self._sig[:n]
+        both = ~np.isnan(sig) & ~np.isnan(own)[None, :]
+        overlap = both.sum(axis=1)
+        o = np.where(both, own[None, :], 0.0)
+        c = np.where(both, sig, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scale = (o * c).sum(axis=1) / (c * c).sum(axis=1)
+            resid = o - scale[:, None] * c
+            rms = np.sqrt((resid * resid).sum(axis=1) / overlap)
+            dist = rms * overlap / o.sum(axis=1)
+
+            redline = np.abs(np.log(self._redline[:n] / model.redline_rpm))
+            dist += REDLINE_WEIGHT * np.nan_to_num(redline)
+            ratios = np.full(MAX_GEARS, np.nan)
+            mine = np.asarray(model.gear_ratios[:MAX_GEARS], dtype=np.float64)
+            ratios[: len(mine)] = np.where(mine > 0.0, mine, np.nan)
+            if not np.isnan(ratios).all():
+                diff = np.abs(np.log(self._ratios[:n] / ratios[None, :]))
+                shared = ~np.isnan(diff)
+                mean = np.where(shared, diff, 0.0).sum(axis=1) / shared.sum(axis=1)
+                dist += RATIO_WEIGHT * np.nan_to_num(mean)
+
+        ok = (overlap >= MIN_OVERLAP) & (scale > 0.0) & np.isfinite(dist)
+        own_row = self._rows.get(model.car_id)
+        if own_row is not None:
+            ok[own_row] = False
+        if not ok.any():
+            return None
+        best = int(np.argmin(np.where(ok, dist, np.inf)))
+        return CurveMatch(
+            car_id=self._car_ids[best],
+            scale=float(scale[best]),
+            distance=float(dist[best]),
+            overlap=int(overlap[best]),
+        )
+
+    def signature(self, car_id: int) -> Optional[np.ndarray]:
+        """Normalized curve of *car_id* (NaN where not covered), read-only."""
+        row = self._rows.get(car_id)
+        if row is None:
+            return None
+        sig = self._sig[row].copy()
+        sig.flags.writeable = False
+        return sig
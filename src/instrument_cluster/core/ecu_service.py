@@ -0,0 +1,213 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Sequence, Tuple
+
+from ..telemetry.models import MAX_FRAME_DT_S, frame_seconds
+from .ecu import ECU, ECUSnapshot, PlotData
+from .logger import Logger
+
+# Snapshots are republished at most this often (and whenever targets change).
+SNAPSHOT_INTERVAL_S = 0.1
+# Smoothing of the lag gauge (fraction of each new measurement).
+LAG_ALPHA = 0.1
+
+
+class ECUService:
+    """Runs :class:`ECU` learning on a worker thread.
+
+    The render thread only enqueues frames (:meth:`submit_frames`,
+    :meth:`submit`) and reads the newest :class:`ECUSnapshot` per car, so
+    target recomputes, journal syncs and model saves never stall a frame. The
+    read side mirrors the ECU API the widgets use (:meth:`get_shift_targets`,
+    :meth:`progress_fraction`, :meth:`get_plot_data`).
+
+    The queue is bounded: when the worker falls ``maxsize`` frames behind,
+    the oldest queued frames are dropped and counted in :meth:`metrics`.
+    """
+
+    def __init__(self, ecu: Optional[ECU] = None, maxsize: int = 4096) -> None:
+        self.logger = Logger(__class__.__name__).get()
+        self.ecu = ecu or ECU()
+        self._queue: Deque[Tuple[Any, Optional[float], float]] = deque(maxlen=maxsize)
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        # hands closing the ECU to the worker if stop() gave up waiting for it
+        self._exit_lock = threading.Lock()
+        self._worker_done = False
+        self._close_on_exit = False
+        self._snapshots: Dict[int, ECUSnapshot] = {}
+        self._last_frame_t: Optional[float] = None
+        self._car_id: Optional[int] = None
+
+        # metrics (written by the worker, except enqueued/dropped)
+        self.enqueued = 0
+        self.dropped = 0
+        self.processed = 0
+        self.max_depth = 0
+        self.lag_s = 0.0  # smoothed enqueue-to-processed delay
+        self.max_lag_s = 0.0
+        self.busy_s = 0.0  # worker time spent in ECU.update
+
+    # --- Lifecycle ---------------------------------------------------------
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._worker_done = False
+        self._close_on_exit = False
+        self._thread = threading.Thread(target=self._run, name="ecu", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Process what is queued, save the models and stop the worker.
+
+        The ECU is closed once the worker is out of it: here if it exits
+        within the timeout, otherwise by the worker itself when it does.
+        """
+        if not self._running:
+            return
+        self._running = False
+        self._wake.set()
+        thread, self._thread = self._thread, None
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+        with self._exit_lock:
+            if thread is not None and not self._worker_done:
+                self._close_on_exit = True
+                if thread is not threading.current_thread():
+                    self.logger.warning(
+                        "ecu worker still busy after 2 s; it closes the ECU on exit"
+                    )
+                return
+        self.ecu.close()
+
+    # --- Render thread -----------------------------------------------------
+    def submit_frames(self, frames: Sequence[Any]) -> None:
+        """Queue every received frame; dt comes from the receive stamps."""
+        for frame in frames:
+            t = frame_seconds(frame.received_time)
+            dt = None
+            if self._last_frame_t is not None:
+                dt = t - self._last_frame_t
+                if not (0.0 < dt <= MAX_FRAME_DT_S):
+                    dt = None
+            self._last_frame_t = t
+            self._put(frame, dt)
+        self._wake.set()
+
+    def submit(self, frame: Any, dt: Optional[float]) -> None:
+        """Queue one frame with an explicit *dt* (render tick timing)."""
+        self._put(frame, dt)
+        self._wake.set()
+
+    def _put(self, frame: Any, dt: Optional[float]) -> None:
+        car_id = getattr(frame, "car_id", 0) or 0
+        if car_id != self._car_id:
+            # car change: load the model while the frames queue up
+            self._car_id = car_id
+            self.ecu.prefetch(int(car_id))
+        queue = self._queue
+        if len(queue) == queue.maxlen:
+            self.dropped += 1
+        queue.append((frame, dt, time.perf_counter()))
+        self.enqueued += 1
+
+    def snapshot(self, car_id: int) -> ECUSnapshot:
+        snap = self._snapshots.get(car_id)
+        return snap if snap is not None else ECUSnapshot(car_id)
+
+    def get_shift_targets(
+        self, pkt
+    ) -> Tuple[Optional[float], Optional[float], Dict[str, Any]]:
+        car_id = int(getattr(pkt, "car_id", 0) or 0)
+        gear = int(getattr(pkt, "current_gear", 0) or 0)
+        rpm = float(getattr(pkt, "engine_rpm", 0.0) or 0.0)
+        return self.snapshot(car_id).shift_targets(gear, rpm)
+
+    def progress_fraction(self, rpm: float, target_up_rpm: Optional[float]) -> float:
+        return self.ecu.progress_fraction(rpm, target_up_rpm)
+
+    def get_plot_data(self, pkt, gear: int) -> PlotData:
+        car_id = int(getattr(pkt, "car_id", 0) or 0)
+        return self.snapshot(car_id).plot_data(gear)
+
+    def metrics(self) -> Dict[str, Any]:
+        depth = len(self._queue)
+        return {
+            "depth": depth,
+            "max_depth": max(self.max_depth, depth),
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "lag_ms": self.lag_s * 1e3,
+            "max_lag_ms": self.max_lag_s * 1e3,
+            "busy_s": self.busy_s,
+            "car_switch": self.ecu.switch_latency(),
+        }
+
+    # --- Worker ------------------------------------------------------------
+    def _run(self) -> None:
+        try:
+            self._work()
+        finally:
+            with self._exit_lock:
+                self._worker_done = True
+                close = self._close_on_exit
+            if close:
+                self.ecu.close()
+
+    def _work(self) -> None:
+        queue = self._queue
+        ecu = self.ecu
+        last_publish = 0.0
+        published: Dict[int, Any] = {}
+        while self._running or queue:
+            if not queue:
+                self._wake.wait(SNAPSHOT_INTERVAL_S)
+                self._wake.clear()
+                # frames may have stopped right after an accepted sample
+                ecu.tick()
+                continue
+            self.max_depth = max(self.max_depth, len(queue))
+            car_ids = set()
+            t0 = time.perf_counter()
+            while queue:
+                try:
+                    frame, dt, queued_at = queue.popleft()
+                except IndexError:
+                    break
+                try:
+                    ecu.update(frame, dt)
+                except Exception as e:
+                    self.logger.warning({"ecu update failed": str(e)})
+                car_ids.add(int(getattr(frame, "car_id", 0) or 0))
+                self.processed += 1
+                lag = time.perf_counter() - queued_at
+                self.lag_s += LAG_ALPHA * (lag - self.lag_s)
+                if lag > self.max_lag_s:
+                    self.max_lag_s = lag
+            now = time.perf_counter()
+            self.busy_s += now - t0
+            # also when none of these frames passed the gates
+            ecu.tick()
+
+            # republish on target changes right away, otherwise rate-limited
+            due = now - last_publish >= SNAPSHOT_INTERVAL_S
+            for car_id in car_ids:
+                if ecu.warming(car_id):
+                    continue
+                table = ecu.shift_table(car_id)
+                if due or published.get(car_id) is not table:
+                    self._snapshots[car_id] = ecu.snapshot(car_id)
+                    published[car_id] = table
+            if due:
+                last_publish = now
+            if len(self._snapshots) > len(ecu.models):
+                # drop cars the ECU evicted (see ECU.max_resident)
+                resident = ecu.models
+                self._snapshots = {
+                    k: v for k, v in self._snapshots.items() if k in resident
+                }
+                published = {k: v for k, v in published.items() if k in resident}
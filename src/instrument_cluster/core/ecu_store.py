@@ -0,0 +1,609 @@
+"""Binary persistence for ECU car models.
+
+Each model is encoded as one blob, little-endian::
+
+    header  "<4sHHIIIIdddddd"  magic b"ICEM", version, flags, bin count,
+                               gear ratio count, upshift count, downshift
+                               count, rpm_min, rpm_max, bin_size, redline,
+                               idle, saved_at
+    arrays  float64 torque bins, int64 counts, float64 gear ratios,
+            float64 upshift rpm per gear, float64 downshift rpm per gear
+            (NaN where a gear has no target), float64 sample mean and
+            float64 sum of squared deviations per bin (version 2 on),
+            int64 sequence number of the newest journal block the model
+            includes (version 3)
+
+Every array element is 8 bytes, so all arrays are 8-byte aligned.
+
+All cars live in one :class:`ModelStore` file, an append-only log of
+records behind a small header::
+
+    header  "<4sHH"    magic b"ICMS", version, reserved
+    record  "<4sIqQ"   magic b"ICMR", crc32 of the blob, car_id, blob size
+            blob       (see above)
+
+The newest record per car wins; an in-memory index (car_id -> offset) is
+rebuilt on open by walking the record headers, and superseded records are
+dropped by :meth:`ModelStore.compact`. Saves are encoded on the caller's
+thread (a few array copies) and appended by :class:`ModelWriter` on its own
+thread.
+
+Samples learned since a car's last save are appended to a
+:class:`SampleJournal`, so a crash (or the ignition) loses at most the last
+unsynced second::
+
+    header  "<4sHHq"   magic b"ICSJ", version, reserved, sequence floor
+    block   "<4sIqqQ"  magic b"ICJB", crc32 of the payload, car_id,
+                       sequence number, sample count
+            payload    float64 rpm per sample, float64 torque proxy per sample
+
+Sequence numbers start above the wall clock in nanoseconds (and above every
+number issued before, which the header keeps across resets), so blocks
+written after a restart sort after every model saved before it. A model
+replays the blocks newer than the sequence number it was saved with.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .logger import Logger
+
+LOGGER = Logger("ecu_store").get()
+
+MAGIC = b"ICEM"
+VERSION = 3
+
+HEADER = struct.Struct("<4sHHIIIIdddddd")
+
+STORE_MAGIC = b"ICMS"
+STORE_VERSION = 1
+STORE_HEADER = struct.Struct("<4sHH")
+RECORD_MAGIC = b"ICMR"
+RECORD = struct.Struct("<4sIqQ")
+# Compact once superseded records outweigh the live ones and this many bytes.
+COMPACT_MIN_BYTES = 256 * 1024
+# Header flags: the gear ratios were inferred, not reported by the game.
+FLAG_RATIOS_INFERRED = 0x1
+
+JOURNAL_MAGIC = b"ICSJ"
+JOURNAL_VERSION = 1
+JOURNAL_HEADER = struct.Struct("<4sHHq")
+BLOCK_MAGIC = b"ICJB"
+BLOCK = struct.Struct("<4sIqqQ")
+
+
+def _targets_array(targets: Dict[int, float]) -> np.ndarray:
+    n = max(targets, default=-1) + 1
+    out = np.full(n, np.nan)
+    for gear, rpm in targets.items():
+        if gear >= 0:
+            out[gear] = rpm
+    return out
+
+
+def _targets_dict(arr: np.ndarray) -> Dict[int, float]:
+    return {g: v for g, v in enumerate(arr.tolist()) if v == v}  # skip NaN
+
+
+def encode_model(model: Any) -> bytes:
+    """Serialize a ``CarModel`` (curve, ratios, limits and shift targets)."""
+    curve = model.curve
+    ratios = np.asarray(model.gear_ratios, dtype="<f8")
+    up = _targets_array(model.shift_up_rpm)
+    down = _targets_array(model.shift_down_rpm)
+    flags = FLAG_RATIOS_INFERRED if getattr(model, "ratios_inferred", False) else 0
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        flags,
+        len(curve.torque_bins),
+        len(ratios),
+        len(up),
+        len(down),
+        curve.rpm_min,
+        curve.rpm_max,
+        curve.bin_size,
+        model.redline_rpm,
+        model.idle_rpm,
+        time.time(),
+    )
+    return b"".join(
+        (
+            header,
+            np.asarray(curve.torque_bins, dtype="<f8").tobytes(),
+            np.asarray(curve.counts, dtype="<i8").tobytes(),
+            ratios.tobytes(),
+            up.astype("<f8").tobytes(),
+            down.astype("<f8").tobytes(),
+            np.asarray(curve.means, dtype="<f8").tobytes(),
+            np.asarray(curve.m2, dtype="<f8").tobytes(),
+            struct.pack("<q", getattr(model, "journal_seq", 0)),
+        )
+    )
+
+
+def read_model_file(path: str) -> Dict[str, Any]:
+    """Decode a single-model file (one blob), memory-mapped."""
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    # the arrays are views into the mapping; it is unmapped once they are gone
+    return decode_model(mapping, path)
+
+
+def decode_model(data: Any, path: str = "model") -> Dict[str, Any]:
+    """Return the fields ``CarModel``/``DynoCurve`` take from one blob.
+
+    Raises ``ValueError`` for blobs that are not models of this version.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    if len(buf) < HEADER.size:
+        raise ValueError(f"{path} is too short for an ECU model")
+    (
+        magic,
+        version,
+        flags,
+        n_bins,
+        n_ratios,
+        n_up,
+        n_down,
+        rpm_min,
+        rpm_max,
+        bin_size,
+        redline,
+        idle,
+        _saved_at,
+    ) = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not an ECU model")
+    if version not in (1, 2, VERSION):
+        raise ValueError(f"unsupported ECU model version {version}")
+    n_stats = 2 * n_bins if version >= 2 else 0
+    n_seq = 1 if version >= 3 else 0
+    n_words = 2 * n_bins + n_ratios + n_up + n_down + n_stats + n_seq
+    if len(buf) < HEADER.size + 8 * n_words:
+        raise ValueError(f"{path} is truncated")
+
+    offset = HEADER.size
+
+    def take(n: int, dtype: str) -> np.ndarray:
+        nonlocal offset
+        arr = buf[offset : offset + 8 * n].view(dtype)
+        offset += 8 * n
+        return arr
+
+    torque_bins = take(n_bins, "<f8")
+    counts = take(n_bins, "<i8")
+    ratios = take(n_ratios, "<f8")
+    up = take(n_up, "<f8")
+    down = take(n_down, "<f8")
+    stats = {}
+    if n_stats:
+        stats = {"means": take(n_bins, "<f8"), "m2": take(n_bins, "<f8")}
+    if n_seq:
+        stats["journal_seq"] = int(take(1, "<i8")[0])
+    return {
+        "rpm_min": rpm_min,
+        "rpm_max": rpm_max,
+        "bin_size": bin_size,
+        # views into *data*; DynoCurve copies them
+        "torque_bins": torque_bins,
+        "counts": counts,
+        "gear_ratios": ratios.tolist(),
+        "ratios_inferred": bool(flags & FLAG_RATIOS_INFERRED),
+        "redline_rpm": redline,
+        "idle_rpm": idle,
+        "shift_up_rpm": _targets_dict(up),
+        "shift_down_rpm": _targets_dict(down),
+        **stats,
+    }
+
+
+class ModelWriter:
+    """Write-behind writer.
+
+    :meth:`submit` only records the newest payload per key; a background
+    thread hands pending payloads to *write* at most every ``interval_s``
+    and then calls *sync*. Repeated saves of the same car in between are
+    coalesced into one write.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[Any, bytes], None],
+        sync: Optional[Callable[[], None]] = None,
+        interval_s: float = 1.0,
+    ) -> None:
+        self._write_fn = write
+        self._sync = sync
+        self.interval_s = float(interval_s)
+        self._pending: Dict[Any, bytes] = {}
+        self._inflight: Dict[Any, bytes] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.writes = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def submit(self, key: Any, payload: bytes) -> None:
+        with self._lock:
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = payload
+            self._idle.clear()
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run, name="ecu-writer", daemon=True
+            )
+            self._thread.start()
+
+    def pending(self, key: Any) -> Optional[bytes]:
+        """The payload queued for *key* but not yet written, if any."""
+        with self._lock:
+            payload = self._pending.get(key)
+            return payload if payload is not None else self._inflight.get(key)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Write everything pending now; returns False on timeout."""
+        self._wake.set()
+        return self._idle.wait(timeout)
+
+    def close(self) -> None:
+        self.flush()
+        self._running = False
+        self._wake.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def _run(self) -> None:
+        while self._running:
+            self._wake.wait(self.interval_s)
+            self._wake.clear()
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+            for key, payload in batch.items():
+                self._write(key, payload)
+            if batch and self._sync is not None:
+                try:
+                    self._sync()
+                except OSError as e:
+                    self.errors += 1
+                    LOGGER.error(f"model store sync failed: {e}")
+            with self._lock:
+                self._inflight = {}
+                if not self._pending:
+                    self._idle.set()
+
+    def _write(self, key: Any, payload: bytes) -> None:
+        try:
+            self._write_fn(key, payload)
+            self.writes += 1
+        except Exception as e:
+            self.errors += 1
+            LOGGER.error(f"model write for {key!r} failed: {e}")
+
+
+class ModelStore:
+    """All car models in one indexed, append-only file (see module docs).
+
+    Thread-safe: the write-behind thread appends while the ECU reads. The
+    file is opened on first use and again after :meth:`close`. A
+    ``readonly`` store (another process' view of a store it does not write)
+    neither creates the file nor truncates a torn tail, which may be an
+    append still in progress.
+    """
+
+    def __init__(self, path: str, readonly: bool = False) -> None:
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.RLock()
+        self._f: Optional[Any] = None
+        self._map: Optional[mmap.mmap] = None
+        self._index: Dict[int, Tuple[int, int]] = {}  # car_id -> (offset, size)
+        self._end = 0
+        self.live_bytes = 0
+        self.garbage_bytes = 0
+
+    # --- Index -------------------------------------------------------------
+    def _open(self) -> None:
+        if self._f is not None:
+            return
+        fresh = not os.path.isfile(self.path) or os.path.getsize(self.path) == 0
+        if self.readonly:
+            if fresh:
+                return  # nothing stored yet; looked for again on the next call
+            self._f = open(self.path, "rb")
+            self._scan()
+            return
+        self._f = open(self.path, "w+b" if fresh else "r+b")
+        if fresh:
+            self._f.write(STORE_HEADER.pack(STORE_MAGIC, STORE_VERSION, 0))
+            self._f.flush()
+        self._scan()
+
+    def _scan(self) -> None:
+        f = self._f
+        size = os.fstat(f.fileno()).st_size
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _ = STORE_HEADER.unpack_from(mm, 0)
+            if magic != STORE_MAGIC or version != STORE_VERSION:
+                raise ValueError(f"{self.path} is not an ECU model store")
+            index: Dict[int, Tuple[int, int]] = {}
+            live = garbage = 0
+            pos = STORE_HEADER.size
+            while pos + RECORD.size <= size:
+                magic, crc, car_id, n = RECORD.unpack_from(mm, pos)
+                start = pos + RECORD.size
+                if magic != RECORD_MAGIC or not 0 < n <= size - start:
+                    break
+                if zlib.crc32(mm[start : start + n]) != crc:
+                    break
+                old = index.get(car_id)
+                if old is not None:
+                    live -= RECORD.size + old[1]
+                    garbage += RECORD.size + old[1]
+                index[car_id] = (start, n)
+                live += RECORD.size + n
+                pos = start + n
+        finally:
+            mm.close()
+        if pos < size and not self.readonly:
+            # torn tail from an interrupted append
+            f.truncate(pos)
+        self._index = index
+        self._end = pos
+        self.live_bytes = live
+        self.garbage_bytes = garbage
+
+    def car_ids(self) -> List[int]:
+        with self._lock:
+            self._open()
+            return list(self._index)
+
+    def _writable(self) -> None:
+        if self.readonly:
+            raise ValueError(f"{self.path} is open read-only")
+
+    def __contains__(self, car_id: int) -> bool:
+        with self._lock:
+            self._open()
+            return car_id in self._index
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._open()
+            return len(self._index)
+
+    # --- Records -----------------------------------------------------------
+    def get(self, car_id: int) -> Optional[bytes]:
+        """The newest blob stored for *car_id*, or None."""
+        with self._lock:
+            self._open()
+            entry = self._index.get(car_id)
+            if entry is None:
+                return None
+            start, n = entry
+            if self._map is None or len(self._map) < start + n:
+                if self._map is not None:
+                    self._map.close()
+                self._f.flush()  # appends may still sit in the file buffer
+                self._map = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._map[start : start + n]
+
+    def put(self, car_id: int, blob: bytes) -> None:
+        """Append *blob* as the newest record for *car_id*."""
+        self._writable()
+        with self._lock:
+            self._open()
+            f = self._f
+            f.seek(self._end)
+            f.write(RECORD.pack(RECORD_MAGIC, zlib.crc32(blob), car_id, len(blob)))
+            f.write(blob)
+            old = self._index.get(car_id)
+            if old is not None:
+                self.live_bytes -= RECORD.size + old[1]
+                self.garbage_bytes += RECORD.size + old[1]
+            self._index[car_id] = (self._end + RECORD.size, len(blob))
+            self._end += RECORD.size + len(blob)
+            self.live_bytes += RECORD.size + len(blob)
+            if self.garbage_bytes > max(COMPACT_MIN_BYTES, self.live_bytes):
+                self.compact()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._f is not None and not self.readonly:
+                self._f.flush()
+                os.fsync(self._f.fileno())
+
+    def compact(self) -> None:
+        """Rewrite the file with only the newest record per car."""
+        self._writable()
+        with self._lock:
+            self._open()
+            self._f.flush()
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as out:
+                out.write(STORE_HEADER.pack(STORE_MAGIC, STORE_VERSION, 0))
+                for car_id in list(self._index):
+                    blob = self.get(car_id)
+                    out.write(
+                        RECORD.pack(RECORD_MAGIC, zlib.crc32(blob), car_id, len(blob))
+                    )
+                    out.write(blob)
+                out.flush()
+                os.fsync(out.fileno())
+            self._close_files()
+            os.replace(tmp, self.path)
+            self._open()
+
+    def _close_files(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._f is not None:
+                self.flush()
+            self._close_files()
+
+
+class SampleJournal:
+    """Append-only log of learned samples (see module docs).
+
+    :meth:`append` / :meth:`extend` buffer samples per car; :meth:`flush`
+    writes the buffer as one block per car and :meth:`sync` also fsyncs, so
+    callers batch the fsyncs. Blocks found on open are kept in memory for
+    :meth:`replay` until :meth:`reset` empties the file. Hold :attr:`lock`
+    to read a model and replay into it without a reset in between.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock = threading.RLock()
+        self._buf: Dict[int, Tuple[List[float], List[float]]] = {}
+        # car_id -> [(seq, rpm, proxy)] of the blocks found on open
+        self._found: Dict[int, List[Tuple[int, np.ndarray, np.ndarray]]] = {}
+        self._cars: Set[int] = set()
+        self._seq = 0
+        self._f = None
+        self._open()
+
+    def _open(self) -> None:
+        fresh = not os.path.isfile(self.path) or os.path.getsize(self.path) == 0
+        self._f = open(self.path, "w+b" if fresh else "r+b")
+        floor = 0
+        if fresh:
+            self._f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, 0, 0))
+            self._f.flush()
+        else:
+            floor = self._scan()
+        self._seq = max(time.time_ns(), floor)
+
+    def _scan(self) -> int:
+        """Index the blocks, truncate a torn tail; returns the highest
+        sequence number seen."""
+        data = self._f.read()
+        magic, version, _, floor = JOURNAL_HEADER.unpack_from(data, 0)
+        if magic != JOURNAL_MAGIC or version != JOURNAL_VERSION:
+            raise ValueError(f"{self.path} is not an ECU sample journal")
+        pos = JOURNAL_HEADER.size
+        while pos + BLOCK.size <= len(data):
+            magic, crc, car_id, seq, n = BLOCK.unpack_from(data, pos)
+            start = pos + BLOCK.size
+            if magic != BLOCK_MAGIC or not 0 < 16 * n <= len(data) - start:
+                break
+            payload = data[start : start + 16 * n]
+            if zlib.crc32(payload) != crc:
+                break
+            arr = np.frombuffer(payload, dtype="<f8")
+            self._found.setdefault(car_id, []).append((seq, arr[:n], arr[n:]))
+            self._cars.add(car_id)
+            floor = max(floor, seq)
+            pos = start + 16 * n
+        if pos < len(data):
+            self._f.truncate(pos)
+        self._f.seek(pos)
+        return floor
+
+    @property
+    def size(self) -> int:
+        with self.lock:
+            return self._f.tell()
+
+    def car_ids(self) -> List[int]:
+        """Cars with samples in the journal (written or still buffered)."""
+        with self.lock:
+            return sorted(self._cars | set(self._buf))
+
+    def append(self, car_id: int, rpm: float, proxy: float) -> None:
+        with self.lock:
+            buf = self._buf.get(car_id)
+            if buf is None:
+                buf = self._buf[car_id] = ([], [])
+            buf[0].append(rpm)
+            buf[1].append(proxy)
+
+    def extend(self, car_id: int, rpm: np.ndarray, proxy: np.ndarray) -> None:
+        with self.lock:
+            buf = self._buf.get(car_id)
+            if buf is None:
+                buf = self._buf[car_id] = ([], [])
+            buf[0].extend(rpm.tolist())
+            buf[1].extend(proxy.tolist())
+
+    def flush(self) -> int:
+        """Write the buffered samples (no fsync); returns the sequence number
+        of the newest block, which covers every sample appended so far."""
+        with self.lock:
+            f = self._f
+            for car_id, (rpm, proxy) in self._buf.items():
+                payload = np.array(rpm + proxy, dtype="<f8").tobytes()
+                self._seq += 1
+                f.write(
+                    BLOCK.pack(
+                        BLOCK_MAGIC, zlib.crc32(payload), car_id, self._seq, len(rpm)
+                    )
+                )
+                f.write(payload)
+                self._cars.add(car_id)
+            self._buf = {}
+            return self._seq
+
+    def sync(self) -> None:
+        with self.lock:
+            self.flush()
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def replay(self, car_id: int, after_seq: int) -> Tuple[np.ndarray, np.ndarray]:
+        """rpm and proxy of the samples found on open for *car_id* in blocks
+        newer than *after_seq*, oldest first."""
+        with self.lock:
+            blocks = [b for b in self._found.get(car_id, ()) if b[0] > after_seq]
+        if not blocks:
+            return np.zeros(0), np.zeros(0)
+        return (
+            np.concatenate([b[1] for b in blocks]),
+            np.concatenate([b[2] for b in blocks]),
+        )
+
+    def reset(self) -> None:
+        """Drop every block; call once all of them are in saved models."""
+        with self.lock:
+            self.flush()
+            f = self._f
+            f.seek(0)
+            f.write(
+                JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, 0, self._seq)
+            )
+            f.truncate(JOURNAL_HEADER.size)
+            f.flush()
+            os.fsync(f.fileno())
+            f.seek(JOURNAL_HEADER.size)
+            self._found = {}
+            self._cars = set()
+
+    def close(self) -> None:
+        with self.lock:
+            if self._f is not None:
+                self.sync()
+                self._f.close()
+                self._f = None
@@ -0,0 +1,183 @@
+"""Offline ECU training over recorded sessions.
+
+``instrument-cluster ecu-train [--workers N] [--storage DIR] PATH...`` feeds
+session files (or directories of them) through :meth:`ECU.update_batch` - the same
+gating and torque proxy the dashboard uses - with one worker process per
+car_id, then writes the trained models back into the model store and prints
+coverage and shift target changes per car.
+
+Sessions record no gear ratios; cars whose stored model has none get them
+inferred from rpm and speed, as on the live JSONL feed. Run it while the
+dashboard is closed: both append to the same store file.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..telemetry.models import MAX_FRAME_DT_S
+from ..telemetry.session import Session
+from .ecu import ECU
+from .ecu_store import decode_model, encode_model
+
+SESSION_SUFFIX = ".icsn"
+# Frames per ECU.update_batch call (the result does not depend on it).
+BATCH = 4096
+
+
+@dataclass
+class CarReport:
+    car_id: int
+    sessions: int = 0
+    frames: int = 0
+    accepted: int = 0
+    coverage_before: float = 0.0
+    coverage_after: float = 0.0
+    up_before: Dict[int, float] = field(default_factory=dict)
+    up_after: Dict[int, float] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+def session_files(paths: Sequence[str]) -> List[str]:
+    """*paths* with directories expanded to the session files below them."""
+    files = []
+    for path in paths:
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(
+                    os.path.join(root, n) for n in names if n.endswith(SESSION_SUFFIX)
+                )
+        else:
+            files.append(path)
+    return sorted(files)
+
+
+def cars_by_session(files: Sequence[str]) -> Dict[int, List[str]]:
+    """car_id -> the sessions that contain frames of it."""
+    cars: Dict[int, List[str]] = {}
+    for path in files:
+        session = Session(path)
+        try:
+            ids = np.unique(np.asarray(session.columns["car_id"]))
+        finally:
+            session.close()
+        for car_id in ids.tolist():
+            cars.setdefault(int(car_id), []).append(path)
+    return cars
+
+
+def train_car(
+    car_id: int, paths: Sequence[str], blob: Optional[bytes], storage_dir: str
+) -> Tuple[CarReport, Optional[bytes]]:
+    """Learn *car_id* from *paths*, starting from the stored *blob*.
+
+    Runs in a worker process and only ever reads the store (the parent
+    appends to it meanwhile); returns the report and the encoded model (None
+    when nothing was learned). Curves are not warm-started from other cars,
+    so the result depends only on the sessions and *blob*.
+    """
+    t0 = time.perf_counter()
+    ecu = ECU(storage_dir, autosave=False, read_only=True, warm_start=False)
+    model = ecu._install(ecu._model_from(car_id, decode_model(blob) if blob else {}))
+    report = CarReport(
+        car_id,
+        sessions=len(paths),
+        coverage_before=model.curve.coverage(),
+        up_before=dict(model.shift_up_rpm),
+    )
+    for path in paths:
+        session = Session(path)
+        try:
+            cols = session.columns
+            idx = np.flatnonzero(np.asarray(cols["car_id"]) == car_id)
+
+            def take(name: str) -> np.ndarray:
+                return np.asarray(cols[name])[idx].astype(np.float64)
+
+            t = take("t")
+            speed, rpm = take("car_speed"), take("engine_rpm")
+            gear, thr, brk = take("current_gear"), take("throttle"), take("brake")
+        finally:
+            session.close()
+        # same continuity rule as ECUService: no dt across pauses and gaps
+        dt = np.diff(t, prepend=np.nan)
+        dt[~((dt > 0.0) & (dt <= MAX_FRAME_DT_S))] = np.nan
+        for s in range(0, len(t), BATCH):
+            sl = slice(s, s + BATCH)
+            ecu.update_batch(
+                car_id, rpm[sl], gear[sl], thr[sl], brk[sl], speed[sl], dt[sl]
+            )
+        report.frames += len(t)
+
+    ecu._recompute_targets(model)
+    ecu._rebuild_table(model)
+    report.accepted = ecu._dbg["ok"]
+    report.coverage_after = model.curve.coverage()
+    report.up_after = dict(model.shift_up_rpm)
+    report.seconds = time.perf_counter() - t0
+    return report, encode_model(model) if report.accepted else None
+
+
+def train(
+    paths: Sequence[str],
+    storage_dir: str | None = None,
+    workers: Optional[int] = None,
+) -> List[CarReport]:
+    """Train every car found in *paths* and merge the models into the store."""
+    ecu = ECU(storage_dir, autosave=False)
+    store = ecu.store
+    cars = cars_by_session(session_files(paths))
+    reports = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    train_car, car_id, car_paths, store.get(car_id), ecu.storage_dir
+                )
+                for car_id, car_paths in sorted(cars.items())
+            ]
+            for future in futures:
+                report, blob = future.result()
+                if blob is not None:
+                    store.put(report.car_id, blob)
+                reports.append(report)
+    finally:
+        store.close()
+    return reports
+
+
+def _targets(up: Dict[int, float]) -> str:
+    return " ".join(f"{g}:{rpm:.0f}" for g, rpm in sorted(up.items())) or "-"
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="instrument-cluster ecu-train")
+    parser.add_argument("paths", nargs="+", help="session files or directories")
+    parser.add_argument("--storage", default=None, help="model directory")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processes (default: CPUs)"
+    )
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    reports = train(args.paths, args.storage, args.workers)
+    for r in reports:
+        print(
+            f"car {r.car_id}: {r.sessions} sessions, {r.frames} frames,"
+            f" {r.accepted} accepted, coverage {r.coverage_before:.0%}"
+            f" -> {r.coverage_after:.0%} ({r.seconds:.1f} s)"
+        )
+        if r.up_after != r.up_before:
+            print(f"  upshift {_targets(r.up_before)} -> {_targets(r.up_after)}")
+    print(f"{len(reports)} cars in {time.perf_counter() - t0:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+"""Gear ratio inference from rpm, speed and gear.
+
+Frames from the JSONL proxy carry no ``gear_ratios``. With the clutch
+engaged, though, engine rpm over wheel rpm is the overall ratio of the
+engaged gear (gearbox times final drive), so every moving frame is a sample
+of it. :class:`GearRatioEstimator` bins those samples per gear on a log scale
+and takes the median: wheelspin, clutch slip and the frames around a shift
+are outliers the median ignores. Adding samples is a histogram increment;
+the medians are refreshed every ``REFRESH_SAMPLES`` samples.
+"""
+
+import math
+from typing import List, Optional
+
+import numpy as np
+
+# Overall ratios the histogram covers (engine revolutions per wheel revolution).
+RATIO_MIN = 1.0
+RATIO_MAX = 30.0
+# Histogram bin width in log ratio (0.2 %).
+LOG_BIN = 0.002
+MAX_GEARS = 10
+# Frames slower than this (m/s) or below this rpm say little about the ratio.
+MIN_SPEED = 3.0
+MIN_RPM = 1000.0
+# Samples a gear needs before its ratio is used.
+MIN_GEAR_SAMPLES = 60
+REFRESH_SAMPLES = 120
+# Ratio changes smaller than this (relative) are not reported.
+CHANGE_TOL = 0.002
+
+_N_BINS = int(math.log(RATIO_MAX / RATIO_MIN) / LOG_BIN) + 1
+_LOG_MIN = math.log(RATIO_MIN)
+
+
+class GearRatioEstimator:
+    """Per-gear median overall ratio of one car."""
+
+    __slots__ = ("hist", "ratios", "pending")
+
+    def __init__(self) -> None:
+        self.hist = np.zeros((MAX_GEARS, _N_BINS), dtype=np.int32)
+        # 0.0 for gears without enough samples
+        self.ratios = np.zeros(MAX_GEARS)
+        self.pending = 0
+
+    def add_one(
+        self, rpm: float, speed: float, gear: int, wheel_radius: float
+    ) -> bool:
+        """Add one frame; True if :attr:`ratios` changed (see :meth:`refresh`)."""
+        if not (1 <= gear <= MAX_GEARS and speed >= MIN_SPEED and rpm >= MIN_RPM):
+            return False
+        ratio = rpm * 2.0 * math.pi * wheel_radius / (60.0 * speed)
+        b = int((math.log(ratio) - _LOG_MIN) / LOG_BIN)
+        if not 0 <= b < _N_BINS:
+            return False
+        self.hist[gear - 1, b] += 1
+        self.pending += 1
+        return self.pending >= REFRESH_SAMPLES and self.refresh()
+
+    def add(
+        self,
+        rpm: np.ndarray,
+        speed: np.ndarray,
+        gear: np.ndarray,
+        wheel_radius: float,
+        clutch: Optional[np.ndarray] = None,
+    ) -> bool:
+        """:meth:`add_one` for columns (frames with the clutch pressed are
+        skipped); refreshes once at the end."""
+        ok = (gear >= 1) & (gear <= MAX_GEARS) & (speed >= MIN_SPEED)
+        ok &= rpm >= MIN_RPM
+        if clutch is not None:
+            ok &= np.asarray(clutch) <= 0.05
+        if not ok.any():
+            return False
+        ratio = rpm[ok] * (2.0 * math.pi * wheel_radius / 60.0) / speed[ok]
+        b = np.floor((np.log(ratio) - _LOG_MIN) / LOG_BIN).astype(np.int64)
+        in_range = (b >= 0) & (b < _N_BINS)
+        cells = (gear[ok][in_range] - 1) * _N_BINS + b[in_range]
+        self.hist += np.bincount(cells, minlength=self.hist.size).reshape(
+            self.hist.shape
+        ).astype(np.int32)
+        self.pending += len(cells)
+        return self.pending >= REFRESH_SAMPLES and self.refresh()
+
+    def refresh(self) -> bool:
+        """Recompute the per-gear medians; True if any moved by more than
+        ``CHANGE_TOL`` or a gear gained or lost its ratio."""
+        self.pending = 0
+        cum = np.cumsum(self.hist, axis=1)
+        total = cum[:, -1]
+        mid = np.argmax(cum >= ((total + 1) // 2)[:, None], axis=1)
+        ratios = np.exp(_LOG_MIN + (mid + 0.5) * LOG_BIN)
+        ratios = np.where(total >= MIN_GEAR_SAMPLES, ratios, 0.0)
+        old = self.ratios
+        changed = bool(
+            np.any((ratios > 0.0) != (old > 0.0))
+            or np.any(np.abs(ratios - old) > CHANGE_TOL * old)
+        )
+        self.ratios = ratios
+        return changed
+
+    def merged(self, known: List[float]) -> List[float]:
+        """Ratios for gears 1..n: inferred ones, else *known* (e.g. saved)
+        ones, 0.0 where neither has a value; trailing unknowns dropped."""
+        out = self.ratios.tolist()
+        for i, r in enumerate(known[:MAX_GEARS]):
+            if out[i] <= 0.0 and r > 0.0:
+                out[i] = float(r)
+        while out and out[-1] <= 0.0:
+            out.pop()
+        return out
@@ -0,0 +1,207 @@
+"""Speed and acceleration estimators for ECU learning.
+
+Every estimator takes one measured speed per frame (``car_speed``, m/s),
+optionally a second one from the wheels, and the frame interval, and returns
+the estimated ``(speed, acceleration)``. ``dt`` of None (or <= 0) means the
+timing is unknown, e.g. after a gap in the stream.
+
+:class:`KalmanSpeed` is the default; :class:`LowPassAccel` is the original
+finite-difference estimator, kept for comparison (``bench ecu``).
+"""
+
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Seconds; the old estimator's low-pass time constant.
+LOWPASS_TAU_S = 0.20
+# Innovations beyond this many standard deviations reject a wheel reading
+# (wheelspin, lock-up).
+WHEEL_GATE_SIGMA = 3.0
+# Weight of each frame in the running car_speed noise estimate (~1/frames).
+NOISE_ADAPT = 0.02
+
+
+def _one_pole(
+    x: np.ndarray, alpha: np.ndarray, y0: float, block: int = 32
+) -> np.ndarray:
+    """``y[k] = (1 - alpha[k]) * y[k-1] + alpha[k] * x[k]`` starting at *y0*.
+
+    Closed form per block: with ``p`` the running product of ``1 - alpha``,
+    ``y = p * (y0 + cumsum(alpha * x / p))``. Blocks keep ``p`` away from
+    underflow; a block that decays too far anyway runs the plain recursion.
+    """
+    y = np.empty(len(x))
+    for s in range(0, len(x), block):
+        a = alpha[s : s + block]
+        p = np.cumprod(1.0 - a)
+        if p[-1] > 1e-200:
+            y[s : s + block] = p * (y0 + np.cumsum(a * x[s : s + block] / p))
+        else:
+            for k in range(s, min(s + block, len(x))):
+                y0 = (1.0 - alpha[k]) * y0 + alpha[k] * x[k]
+                y[k] = y0
+        y0 = float(y[min(s + block, len(x)) - 1])
+    return y
+
+
+class LowPassAccel:
+    """Measured speed as is; acceleration is the finite difference of it
+    through a one-pole low-pass. Lags by about ``tau``."""
+
+    __slots__ = ("tau", "prev", "accel")
+
+    def __init__(self, tau: float = LOWPASS_TAU_S) -> None:
+        self.tau = tau
+        self.prev: Optional[float] = None
+        self.accel = 0.0
+
+    def reset(self) -> None:
+        self.prev = None
+        self.accel = 0.0
+
+    def step(
+        self, v: float, v_wheel: Optional[float], dt: Optional[float]
+    ) -> Tuple[float, float]:
+        a_raw = 0.0
+        if dt and dt > 1e-3 and self.prev is not None:
+            a_raw = (v - self.prev) / dt
+        self.prev = v
+        alpha = (dt / (self.tau + dt)) if dt else 0.15
+        self.accel = (1 - alpha) * self.accel + alpha * a_raw
+        return v, self.accel
+
+    def run(self, v: np.ndarray, dt: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """:meth:`step` over arrays (dt NaN where unknown), vectorized."""
+        n = len(v)
+        prev = np.empty(n)
+        prev[0] = np.nan if self.prev is None else self.prev
+        prev[1:] = v[:-1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            a_raw = np.where((dt > 1e-3) & ~np.isnan(prev), (v - prev) / dt, 0.0)
+            has_dt = (dt != 0.0) & ~np.isnan(dt)
+            alpha = np.where(has_dt, dt / (self.tau + dt), 0.15)
+        accel = _one_pole(a_raw, alpha, self.accel)
+        self.accel = float(accel[-1])
+        self.prev = float(v[-1])
+        return v, accel
+
+
+class KalmanSpeed:
+    """Constant-acceleration Kalman filter over speed measurements.
+
+    State is speed and acceleration; the acceleration is driven by white
+    jerk of spectral density ``q`` (m^2/s^5). The variance of ``car_speed``
+    is estimated from the innovations (never below ``r_car``), the wheel
+    speed has variance ``r_wheel`` and is used only if its innovation passes
+    a ``WHEEL_GATE_SIGMA`` gate. Constant cost: a few dozen float operations
+    per frame, no arrays.
+    """
+
+    __slots__ = (
+        "q", "r_car", "r_wheel", "r", "v", "a", "p00", "p01", "p11", "started"
+    )
+
+    def __init__(
+        self, q: float = 40.0, r_car: float = 0.05**2, r_wheel: float = 0.15**2
+    ) -> None:
+        self.q = q
+        self.r_car = r_car
+        self.r_wheel = r_wheel
+        self.reset()
+
+    def reset(self) -> None:
+        self.v = 0.0
+        self.a = 0.0
+        self.p00 = self.p01 = self.p11 = 0.0
+        self.r = self.r_car
+        self.started = False
+
+    def _measure(self, z: float, r: float, gate: bool) -> None:
+        p00, p01 = self.p00, self.p01
+        s = p00 + r
+        y = z - self.v
+        if gate and y * y > WHEEL_GATE_SIGMA * WHEEL_GATE_SIGMA * s:
+            return
+        k0 = p00 / s
+        k1 = p01 / s
+        self.v += k0 * y
+        self.a += k1 * y
+        self.p11 -= k1 * p01
+        self.p01 = (1.0 - k0) * p01
+        self.p00 = (1.0 - k0) * p00
+
+    def step(
+        self, v: float, v_wheel: Optional[float], dt: Optional[float]
+    ) -> Tuple[float, float]:
+        if not self.started or dt is None or not dt > 0.0:
+            # (re)start from the measurement; acceleration unknown
+            self.v = v
+            self.a = 0.0
+            self.p00 = self.r
+            self.p01 = 0.0
+            self.p11 = 25.0  # (5 m/s^2)^2
+            self.started = True
+            return self.v, self.a
+
+        # predict
+        q = self.q
+        dt2 = dt * dt
+        self.v += self.a * dt
+        self.p00 += 2.0 * dt * self.p01 + dt2 * self.p11 + q * dt2 * dt / 3.0
+        self.p01 += dt * self.p11 + q * dt2 / 2.0
+        self.p11 += q * dt
+
+        # innovation variance is p00 + r: track r from it
+        y = v - self.v
+        r = self.r + NOISE_ADAPT * (y * y - self.p00 - self.r)
+        self.r = r if r > self.r_car else self.r_car
+        self._measure(v, self.r, False)
+        if v_wheel is not None and math.isfinite(v_wheel):
+            self._measure(v_wheel, self.r_wheel, True)
+        return self.v, self.a
+
+    def run(self, v: np.ndarray, dt: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """:meth:`step` over arrays (dt NaN where unknown), without wheels.
+
+        Not vectorized: the gain depends on the noise estimate, which each
+        innovation updates, so frame k needs frame k-1. The recursion runs
+        on locals instead, with the same arithmetic as :meth:`step`.
+        """
+        n = len(v)
+        out_v = np.empty(n)
+        out_a = np.empty(n)
+        q, r_car = self.q, self.r_car
+        sv, sa, p00, p01, p11 = self.v, self.a, self.p00, self.p01, self.p11
+        r, started = self.r, self.started
+        for k, (z, d) in enumerate(zip(v.tolist(), dt.tolist())):
+            if not started or not d > 0.0:
+                sv, sa = z, 0.0
+                p00, p01, p11 = r, 0.0, 25.0
+                started = True
+            else:
+                d2 = d * d
+                sv += sa * d
+                p00 += 2.0 * d * p01 + d2 * p11 + q * d2 * d / 3.0
+                p01 += d * p11 + q * d2 / 2.0
+                p11 += q * d
+                y = z - sv
+                r += NOISE_ADAPT * (y * y - p00 - r)
+                r = r if r > r_car else r_car
+                s = p00 + r
+                k0 = p00 / s
+                k1 = p01 / s
+                sv += k0 * y
+                sa += k1 * y
+                p11 -= k1 * p01
+                p01 = (1.0 - k0) * p01
+                p00 = (1.0 - k0) * p00
+            out_v[k] = sv
+            out_a[k] = sa
+        self.v, self.a, self.p00, self.p01, self.p11 = sv, sa, p00, p01, p11
+        self.r, self.started = r, started
+        return out_v, out_a
+
+
+ESTIMATORS = {"kalman": KalmanSpeed, "lowpass": LowPassAccel}
@@ -1,4 +1,6 @@
 import datetime
+import sys
+from typing import List
 
 import pygame
 
@@ -42,7 +44,12 @@ def run(conf: Config) -> int:
     return 0
 
 
-def main() -> int:
+def main(argv: List[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "ecu-train":
+        from .core.ecu_train import main as ecu_train
+
+        return ecu_train(argv[1:])
     config = ConfigManager.get_config()
     return run(config)
 
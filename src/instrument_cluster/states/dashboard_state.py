@@ -3,17 +3,20 @@ from typing import Optional
 from ..config import ConfigManager
 from ..core.events import BACK_TO_MENU_RELEASED
 from ..core.logger import Logger
+from ..core.utils import FontFamily, load_font
 from ..states.state_manager import StateManager
+from ..telemetry.failover import Staleness
 from ..telemetry.mode import TelemetryMode
 from ..telemetry.source import TelemetrySource
 from ..widgets.base.colors import Color
+from ..widgets.base.label import Label
 from ..widgets.base.widget_group import WidgetGroup
 from ..widgets.button_bar import ButtonBar
 from ..widgets.gear import GearLabel
 from ..widgets.graphical_rpm import GraphicalRPM
 from ..widgets.lap import EstimatedLap
-from ..widgets.shift_lights import ShiftLights
 from ..widgets.speed import SpeedLabel
+from ..widgets.stats_overlay import StatsOverlay
 from .state import State
 
 
@@ -31,18 +34,29 @@ class DashboardState(State):
                 mode=mode,
                 host=cfg.udp_host,
                 port=cfg.udp_port,
+                replay_path=cfg.replay_path,
+                replay_speed=cfg.replay_speed,
+                record_path=cfg.record_path,
+                shm_name=cfg.shm_name,
+                fallback_mode=cfg.fallback_mode,
+                stale_after_s=cfg.stale_after_s,
+                failover_after_s=cfg.failover_after_s,
             )
         else:
             self.telemetry = telemetry
 
         self.packet = None
-
-        # Create ECU-side model for learning curves
-        shift_lights = ShiftLights(
-            anchor=lambda size: (size[0] // 2, size[1] // 16),
-            step_thresholds=[0.62, 0.78, 0.92, 0.985],
-            color_thresholds=(0.5, 0.8),
+        # sequence number of the last frame handed to the widgets
+        self._seq = 0
+        self._staleness = Staleness.FRESH
+        self._staleness_label = Label(
+            text="",
+            font=load_font(size=36, dir="pixeltype", name=FontFamily.PIXEL_TYPE),
+            color=Color.LIGHTEST_RED.rgb(),
+            pos=(0, 0),
+            center=True,
         )
+
         # la widget tree
         self.widgets = WidgetGroup(
             [
@@ -67,11 +81,18 @@ class DashboardState(State):
                 ),
             ]
         )
-        # self.widgets.add(shift_lights)
+        # ShiftLights (ECU learning, Blinkt LEDs) is not mounted, so it is not
+        # built either: building it creates the ECU service and its store.
+        if ConfigManager.get_config().show_stats and hasattr(self.telemetry, "stats"):
+            self.widgets.add(
+                StatsOverlay(anchor=lambda size: (12, 8), stats=self.telemetry.stats)
+            )
 
     def enter(self):
         super().enter()
         # start receive-only source (Demo by default; UDP if configured)
+        if hasattr(self.telemetry, "subscribe"):
+            self.telemetry.subscribe(self.widgets.fields())
         self.telemetry.start()
         self.widgets.enter()
 
@@ -89,15 +110,37 @@ class DashboardState(State):
     def update(self, dt):
         super().update(dt)
         try:
-            self.packet = self.telemetry.latest()
+            # all frames since the previous tick; the newest drives the display
+            frames = []
+            if hasattr(self.telemetry, "since"):
+                frames, self._seq = self.telemetry.since(self._seq)
+            if frames:
+                self.packet = frames[-1]
+                self.widgets.ingest(frames)
+            else:
+                self.packet = self.telemetry.latest()
             if self.packet:
                 self.widgets.update(self.packet, dt)
+            if hasattr(self.telemetry, "staleness"):
+                self._staleness = self.telemetry.staleness()
         except Exception as e:
             self.logger.info({"telemetry error": str(e)})
 
     def draw(self, surface):
         surface.fill(Color.BLACK.rgb())
         self.widgets.draw(surface)
+        if self._staleness is not Staleness.FRESH:
+            self._draw_staleness(surface)
+
+    def _draw_staleness(self, surface):
+        text = (
+            "FALLBACK SOURCE"
+            if self._staleness is Staleness.FAILED_OVER
+            else "NO TELEMETRY"
+        )
+        self._staleness_label.set_text(text)
+        self._staleness_label.rect.center = (surface.get_width() // 2, 24)
+        self._staleness_label.draw(surface)
 
     def on_back(self, event=None):
         from ..states.main_menu_state import MainMenuState
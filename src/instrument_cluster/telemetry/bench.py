@@ -0,0 +1,468 @@
+"""Micro-benchmarks for the telemetry ingest path.
+
+Run with ``python -m instrument_cluster.telemetry.bench decode`` for the
+per-frame decode cost, or ``... bench ingest`` to blast synthetic telemetry
+at the UDP readers over loopback (60 Hz to 10 kHz) and measure what the
+render loop would see. ``... bench ecu`` replays simulated full-throttle
+pulls through the ECU with each speed estimator and compares how fast and
+how accurately the torque curve is learned.
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import math
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+from .mode import TelemetryMode
+from .models import TelemetryFrame, frame_seconds, subscription
+from .stats import ReaderStats
+from .udp_jsonl import decode_json
+from .wire import decode_frame, encode_frame
+
+INGEST_RATES_HZ = (60, 120, 1000, 10_000)
+INGEST_MODES = ("udp", "udp_binary", "udp_async")
+# The consumer polls like the dashboard's render loop.
+TICK_HZ = 60.0
+# Time the reader gets to drain the socket after the sender stops.
+SETTLE_S = 0.25
+# Fields the stock dashboard subscribes to (see Widget.fields).
+DASHBOARD_FIELDS = ("car_speed", "engine_rpm", "current_gear", "lap_count")
+# Simulated car for bench ecu: gear ratios, final drive, wheel radius (m),
+# mass (kg), aero drag (N per (m/s)^2), rolling resistance (N) and the rpm
+# it upshifts at.
+SIM_RATIOS = (3.2, 2.1, 1.55, 1.2, 0.98, 0.82)
+SIM_FINAL_DRIVE = 3.7
+SIM_WHEEL_RADIUS = 0.33
+SIM_MASS = 1300.0
+SIM_DRAG = 0.4
+SIM_ROLLING = 200.0
+SIM_SHIFT_RPM = 8800.0
+# A pull ends (brake, start over) when acceleration drops below this (m/s^2).
+SIM_MIN_ACCEL = 1.0
+
+
+def _sample_payload(i: int) -> Dict[str, object]:
+    return {
+        "received_time": float(time.time_ns()),
+        "car_speed": 41.7 + (i % 13) * 0.1,
+        "engine_rpm": 6500 + (i % 200),
+        "current_gear": 3 + (i % 4),
+        "throttle": 0.93,
+        "brake": 0.0,
+        "steering": -0.04,
+        "lap_count": 2,
+        "packet_id": i,
+    }
+
+
+def _gt7_extras(i: int) -> Dict[str, object]:
+    """Payload the proxy forwards beyond the frame schema (full GT7 packet)."""
+    return {
+        "flags": {"paused": False, "loading_or_processing": False, "in_gear": True},
+        "position": {"x": 120.5 + i * 0.01, "y": 3.2, "z": -88.1},
+        "rpm_alert": {"min": 7000, "max": 8200},
+        "gear_ratios": [3.2, 2.3, 1.8, 1.4, 1.1, 0.9, 0.0, 0.0],
+        "wheels": [
+            {"rps": 30.1, "radius": 0.33, "suspension_height": 0.1}
+            for _ in range(4)
+        ],
+    }
+
+
+def _time_per_call(fn: Callable[[object], object], items: List[object]) -> float:
+    """Best-of-three nanoseconds per call of *fn* over *items*."""
+    best = float("inf")
+    for _ in range(3):
+        t0 = time.perf_counter_ns()
+        for item in items:
+            fn(item)
+        best = min(best, (time.perf_counter_ns() - t0) / len(items))
+    return best
+
+
+def bench_decode(n: int = 50_000) -> Dict[str, float]:
+    """Compare the JSON + pydantic path with the binary memoryview decoder.
+
+    ``json_lazy_ns`` is the JSON path validating only the fields the stock
+    dashboard widgets subscribe to.
+    """
+    payloads = [_sample_payload(i) for i in range(n)]
+    json_datagrams = [json.dumps(p).encode("utf-8") for p in payloads]
+    binary_datagrams = [memoryview(encode_frame(p, p["packet_id"])) for p in payloads]
+
+    def json_path(data):
+        return TelemetryFrame(**json.loads(data.decode("utf-8")))
+
+    json_ns = _time_per_call(json_path, json_datagrams)
+    dashboard = subscription(DASHBOARD_FIELDS)
+    json_lazy_ns = _time_per_call(
+        lambda data: decode_json(data, dashboard), json_datagrams
+    )
+    binary_ns = _time_per_call(decode_frame, binary_datagrams)
+    return {
+        "frames": float(n),
+        "json_ns": json_ns,
+        "json_lazy_ns": json_lazy_ns,
+        "binary_ns": binary_ns,
+        "ratio": binary_ns / json_ns if json_ns else 0.0,
+        "json_bytes": float(len(json_datagrams[0])),
+        "binary_bytes": float(len(binary_datagrams[0])),
+    }
+
+
+class _LatencyStats(ReaderStats):
+    """Also records send-to-decoded latency per frame (the generator stamps
+    ``received_time`` when it sends)."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.latencies_s = array("d")
+
+    def packet(self, frame: Any, arrival: float | None = None) -> None:
+        now = time.time() if arrival is None else arrival
+        self.latencies_s.append(now - frame_seconds(frame.received_time))
+        super().packet(frame, now)
+
+
+def _blast(
+    addr, binary: bool, hz: float, duration_s: float, go: Any, sent: Any
+) -> None:
+    """Sender process: paced datagrams, stamped at send time."""
+    import socket
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    payloads = [_sample_payload(i) for i in range(1000)]
+    extras = _gt7_extras(0)
+    period = 1.0 / hz
+    go.wait()
+    t0 = time.perf_counter()
+    n = 0
+    while True:
+        now = time.perf_counter()
+        if now - t0 >= duration_s:
+            break
+        # catch up in a burst if we fell behind; sleep only when well ahead
+        due = int((now - t0) / period) + 1
+        while n < due:
+            n += 1
+            p = payloads[n % len(payloads)]
+            p["received_time"] = float(time.time_ns())
+            p["packet_id"] = n
+            data = encode_frame(p, n) if binary else json.dumps({**p, **extras}).encode()
+            try:
+                sock.sendto(data, addr)
+            except OSError:
+                pass  # full socket buffer: counts as lost
+        ahead = t0 + n * period - time.perf_counter()
+        if ahead > 0.001:
+            time.sleep(ahead - 0.0005)
+    sent.value = n
+    sock.close()
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def bench_ingest(
+    mode: str = "udp",
+    hz: float = 1000.0,
+    duration_s: float = 3.0,
+    port: int = 5650,
+    subscribe: bool = False,
+) -> Dict[str, float]:
+    """Send synthetic telemetry at *hz* to a *mode* reader on loopback and
+    poll it at ``TICK_HZ`` like the dashboard does.
+
+    Latency is send stamp to decoded frame; ``age`` is how old the frame
+    :meth:`latest` returns is at each tick; ``cpu`` is this process' CPU time
+    (reader thread plus consumer) per wall second. The sender runs in its own
+    process so it does not compete for the GIL.
+    """
+    from .source import make_reader
+
+    go = mp.Event()
+    sent = mp.Value("Q", 0)
+    sender = mp.Process(
+        target=_blast,
+        args=(("127.0.0.1", port), mode == "udp_binary", hz, duration_s, go, sent),
+        daemon=True,
+    )
+    sender.start()  # before the reader thread exists
+
+    reader = make_reader(TelemetryMode(mode), port=port)
+    stats = _LatencyStats(reader._stats.name)
+    reader._stats = stats
+    if subscribe:
+        reader.subscribe(DASHBOARD_FIELDS)
+    reader.start()
+
+    ages_s: List[float] = []
+    seq = 0
+    received = 0
+    tick = 1.0 / TICK_HZ
+    try:
+        cpu0 = time.process_time()
+        wall0 = time.perf_counter()
+        go.set()
+        next_t = wall0
+        end_t = wall0 + duration_s + SETTLE_S
+        while next_t < end_t or sender.is_alive():
+            frames, seq = reader.since(seq)
+            received += len(frames)
+            stamp = reader.latest().received_time
+            # ages after the sender stopped only measure the settle wait
+            if stamp and next_t < wall0 + duration_s:
+                ages_s.append(time.time() - frame_seconds(stamp))
+            next_t += tick
+            time.sleep(max(0.0, next_t - time.perf_counter()))
+        sender.join()
+        frames, seq = reader.since(seq)
+        received += len(frames)
+        cpu = (time.process_time() - cpu0) / (time.perf_counter() - wall0)
+        ring = reader._ring.stats()
+    finally:
+        reader.stop()
+
+    lat = stats.latencies_s
+    return {
+        "hz": float(hz),
+        "sent": float(sent.value),
+        "decoded": float(stats.packets),
+        "consumed": float(received),
+        "lost": float(max(0, sent.value - stats.packets - stats.decode_errors)),
+        "decode_errors": float(stats.decode_errors),
+        "ring_dropped": float(ring["dropped"]),
+        "lat_p50_us": _percentile(lat, 0.50) * 1e6,
+        "lat_p99_us": _percentile(lat, 0.99) * 1e6,
+        "lat_max_us": max(lat, default=0.0) * 1e6,
+        "age_p50_ms": _percentile(ages_s, 0.50) * 1e3,
+        "age_p99_ms": _percentile(ages_s, 0.99) * 1e3,
+        "cpu": cpu,
+    }
+
+
+def _sim_torque(rpm: np.ndarray) -> np.ndarray:
+    """Engine torque (Nm) of the simulated car: peak at 5500 rpm."""
+    return np.maximum(80.0, 380.0 * (1.0 - ((rpm - 5500.0) / 5500.0) ** 2))
+
+
+def simulate_pulls(
+    seconds: float, noise: float, jitter: float, hz: float = 60.0, seed: int = 0
+) -> Dict[str, np.ndarray]:
+    """Full-throttle pulls through all gears, braking back down after each.
+
+    Columns as :meth:`ECU.update_batch` takes them; ``car_speed`` carries
+    Gaussian noise of *noise* m/s and ``dt`` receive-time jitter of *jitter*
+    seconds, while ``accel`` is the true acceleration.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * hz)
+    step = 1.0 / hz
+    rpm_per_ms = 60.0 * SIM_FINAL_DRIVE / (2.0 * math.pi * SIM_WHEEL_RADIUS)
+    launch_v = 1300.0 / (rpm_per_ms * SIM_RATIOS[0])
+    cols = {
+        k: np.zeros(n)
+        for k in ("rpm", "gear", "throttle", "brake", "speed", "accel")
+    }
+    v, gear, shifting = launch_v, 1, 0
+    for k in range(n):
+        if gear:
+            rpm = v * rpm_per_ms * SIM_RATIOS[gear - 1]
+            if shifting:
+                shifting -= 1
+                a, thr = -(SIM_DRAG * v * v + SIM_ROLLING) / SIM_MASS, 0.0
+            elif rpm >= SIM_SHIFT_RPM:
+                if gear == len(SIM_RATIOS):
+                    gear = 0  # brake back down for the next pull
+                else:
+                    gear, shifting = gear + 1, int(0.3 * hz)
+                a, thr = 0.0, 0.0
+            else:
+                force = (
+                    float(_sim_torque(np.float64(rpm)))
+                    * SIM_RATIOS[gear - 1]
+                    * SIM_FINAL_DRIVE
+                    / SIM_WHEEL_RADIUS
+                )
+                a = (force - SIM_DRAG * v * v - SIM_ROLLING) / SIM_MASS
+                thr = 1.0
+                if a < SIM_MIN_ACCEL:
+                    gear, a, thr = 0, 0.0, 0.0  # pull is over
+            brake = 0.0
+        else:
+            rpm, a, thr, brake = 900.0, -8.0, 0.0, 1.0
+            if v <= launch_v:
+                v, gear = launch_v, 1
+        cols["rpm"][k] = rpm
+        cols["gear"][k] = gear
+        cols["throttle"][k] = thr
+        cols["brake"][k] = brake
+        cols["speed"][k] = v
+        cols["accel"][k] = a
+        v = max(launch_v, v + a * step)
+    cols["true_speed"] = cols["speed"].copy()
+    cols["speed"] += rng.normal(0.0, noise, n)
+    cols["dt"] = np.maximum(1e-3, step + rng.normal(0.0, jitter, n))
+    cols["dt"][0] = np.nan
+    return cols
+
+
+def bench_ecu(
+    estimator: str,
+    cols: Dict[str, np.ndarray],
+    hz: float = 60.0,
+) -> Dict[str, float]:
+    """Learn the simulated car from *cols* with *estimator*.
+
+    ``ready_s`` is the simulated time until READY coverage (NaN if never);
+    ``curve_err`` the median relative error of the learned bin means
+    against the same bins learned from the true acceleration; ``step_ns``
+    the estimator's cost per frame in :meth:`ECU.update`.
+    """
+    import tempfile
+
+    from ..core.ecu import ECU, READY_COVERAGE, CarModel, DynoCurve
+    from ..core.kinematics import ESTIMATORS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ecu = ECU(tmp, autosave=False, estimator=estimator)
+        model = ecu._install(CarModel(car_id=1, gear_ratios=list(SIM_RATIOS)))
+        n = len(cols["rpm"])
+        chunk = max(1, int(hz / 10))
+        ready_s = float("nan")
+        for s in range(0, n, chunk):
+            sl = slice(s, s + chunk)
+            ecu.update_batch(
+                1,
+                cols["rpm"][sl],
+                cols["gear"][sl],
+                cols["throttle"][sl],
+                cols["brake"][sl],
+                cols["speed"][sl],
+                cols["dt"][sl],
+                wheel_radius=SIM_WHEEL_RADIUS,
+            )
+            if ready_s != ready_s and model.curve.coverage() >= READY_COVERAGE:
+                ready_s = min(n, s + chunk) / hz
+        ecu.close()
+
+    est = ESTIMATORS[estimator]()
+    frames = [
+        (v, None if dt != dt else dt)
+        for v, dt in zip(cols["speed"].tolist(), cols["dt"].tolist())
+    ]
+    step_ns = _time_per_call(lambda f: est.step(f[0], None, f[1]), frames)
+
+    # reference: the same gates, fed the true acceleration
+    gear = cols["gear"].astype(np.int64)
+    wot = (gear >= 1) & (cols["throttle"] >= 0.85) & (cols["rpm"] >= 1200.0)
+    wot &= cols["accel"] > 0.0
+    ratios = np.asarray(SIM_RATIOS)[np.maximum(gear, 1) - 1]
+    truth = DynoCurve()
+    truth.add_samples(
+        cols["rpm"][wot], cols["accel"][wot] * SIM_WHEEL_RADIUS / ratios[wot]
+    )
+    curve = model.curve
+    both = (curve.counts > 0) & (truth.counts > 0)
+    err = np.abs(curve.means[both] - truth.means[both]) / truth.means[both]
+    return {
+        "frames": float(n),
+        "accepted": float(ecu._dbg["ok"]),
+        "reference": float(np.count_nonzero(wot)),
+        "coverage": curve.coverage(),
+        "ready_s": ready_s,
+        "curve_err": float(np.median(err)) if len(err) else float("nan"),
+        "step_ns": step_ns,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="instrument_cluster.telemetry.bench")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_decode = sub.add_parser("decode", help="JSON vs binary frame decode cost")
+    p_decode.add_argument("-n", type=int, default=50_000, help="frames per run")
+    p_ingest = sub.add_parser("ingest", help="loopback UDP load against the readers")
+    p_ingest.add_argument(
+        "--modes", default=",".join(INGEST_MODES), help="comma-separated modes"
+    )
+    p_ingest.add_argument(
+        "--rates",
+        default=",".join(map(str, INGEST_RATES_HZ)),
+        help="comma-separated send rates in Hz",
+    )
+    p_ingest.add_argument("--duration", type=float, default=3.0, help="seconds per run")
+    p_ingest.add_argument("--port", type=int, default=5650)
+    p_ingest.add_argument(
+        "--subscribe",
+        action="store_true",
+        help="validate only the dashboard's fields (JSON readers)",
+    )
+    p_ecu = sub.add_parser("ecu", help="ECU curve learning per speed estimator")
+    p_ecu.add_argument(
+        "--estimators", default="kalman,lowpass", help="comma-separated estimators"
+    )
+    p_ecu.add_argument(
+        "--seconds", type=float, default=300.0, help="simulated seconds"
+    )
+    p_ecu.add_argument(
+        "--noise", type=float, default=0.05, help="car_speed noise (m/s, 1 sigma)"
+    )
+    p_ecu.add_argument(
+        "--jitter", type=float, default=0.002, help="frame dt jitter (s, 1 sigma)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.cmd == "decode":
+        r = bench_decode(args.n)
+        print(f"frames      {int(r['frames'])}")
+        print(f"json        {r['json_ns']:8.0f} ns/frame  ({int(r['json_bytes'])} B)")
+        print(f"json lazy   {r['json_lazy_ns']:8.0f} ns/frame")
+        print(
+            f"binary      {r['binary_ns']:8.0f} ns/frame  ({int(r['binary_bytes'])} B)"
+        )
+        print(f"binary/json {r['ratio']:8.2%}")
+    elif args.cmd == "ingest":
+        print(
+            f"{'mode':<11} {'Hz':>6} {'sent':>7} {'lost':>6} {'err':>4} {'drop':>5}"
+            f" {'p50 us':>8} {'p99 us':>8} {'max us':>8}"
+            f" {'age50 ms':>8} {'age99 ms':>8} {'cpu':>6}"
+        )
+        for mode in args.modes.split(","):
+            for hz in args.rates.split(","):
+                r = bench_ingest(
+                    mode, float(hz), args.duration, args.port, args.subscribe
+                )
+                print(
+                    f"{mode:<11} {r['hz']:>6.0f} {r['sent']:>7.0f} {r['lost']:>6.0f}"
+                    f" {r['decode_errors']:>4.0f} {r['ring_dropped']:>5.0f}"
+                    f" {r['lat_p50_us']:>8.0f} {r['lat_p99_us']:>8.0f}"
+                    f" {r['lat_max_us']:>8.0f} {r['age_p50_ms']:>8.2f}"
+                    f" {r['age_p99_ms']:>8.2f} {r['cpu']:>6.1%}"
+                )
+    elif args.cmd == "ecu":
+        cols = simulate_pulls(args.seconds, args.noise, args.jitter)
+        print(
+            f"{'estimator':<10} {'accepted':>9} {'of':>7} {'coverage':>8}"
+            f" {'ready s':>8} {'curve err':>9} {'step ns':>8}"
+        )
+        for name in args.estimators.split(","):
+            r = bench_ecu(name, cols)
+            print(
+                f"{name:<10} {r['accepted']:>9.0f} {r['reference']:>7.0f}"
+                f" {r['coverage']:>8.0%} {r['ready_s']:>8.1f}"
+                f" {r['curve_err']:>9.1%} {r['step_ns']:>8.0f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
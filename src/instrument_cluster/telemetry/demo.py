@@ -1,12 +1,17 @@
 import math
 import time
+from typing import Any, Dict, List, Tuple
 
 from .models import TelemetryFrame
+from .ring import FrameRing
+from .stats import ReaderStats
 
 
 class DemoReader:
     def __init__(self):
         self._t0 = time.perf_counter()
+        self._ring = FrameRing(64)
+        self._stats = ReaderStats("demo")
 
     def start(self) -> None:
         pass
@@ -27,5 +32,22 @@ class DemoReader:
             lap=1 + int(t // 90),
         )
 
+    def since(self, seq: int) -> Tuple[List[TelemetryFrame], int]:
+        # frames are synthesized on demand: one new frame per call
+        frame = self.latest()
+        self._stats.packet(frame)
+        self._ring.push(frame)
+        return self._ring.since(seq)
+
+    def head(self) -> int:
+        return self._ring.seq
+
+    def latest_received_time(self) -> float:
+        # frames are synthesized when asked for, so they are always current
+        return time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._stats.snapshot()
+
     def stop(self) -> None:
         pass
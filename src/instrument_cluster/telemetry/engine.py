@@ -0,0 +1,212 @@
+"""Asyncio telemetry engine: all network telemetry I/O on one loop thread.
+
+Instead of one hand-rolled thread and socket per concern, the engine runs a
+single event loop thread that hosts
+
+- the telemetry datagram endpoint (JSON lines or binary frames),
+- periodic heartbeat keepalives (e.g. the GT7 ``"A"`` heartbeat),
+- any further datagram sources registered with :meth:`add_source`.
+
+Decoded frames reach the render thread through a :class:`FrameRing`, so the
+engine serves the same ``start/latest/since/stop`` contract as the other
+readers.
+"""
+
+import asyncio
+import functools
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .models import Frame, TelemetryFrame, frame_seconds, subscription
+from .ring import FrameRing
+from .stats import LOGGER, ReaderStats
+from .udp_jsonl import decode_json
+from .wire import decode_frame
+
+Decoder = Callable[[bytes], Frame]
+
+DECODERS = {"json": decode_json, "binary": decode_frame}
+
+# GT7 keepalive: the console keeps streaming while it receives this.
+GT7_HEARTBEAT = b"A"
+GT7_HEARTBEAT_PORT = 33739
+GT7_HEARTBEAT_INTERVAL_S = 10.0
+
+START_TIMEOUT_S = 2.0
+
+
+class _FrameProtocol(asyncio.DatagramProtocol):
+    def __init__(self, engine: "TelemetryEngine", decoder: Decoder) -> None:
+        self._engine = engine
+        self._decoder = decoder
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        self._engine._on_datagram(data, self._decoder)
+
+    def error_received(self, exc: Exception) -> None:
+        LOGGER.warning(f"telemetry socket error: {exc}")
+
+
+class TelemetryEngine:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 5600,
+        decoder: str | Decoder = "json",
+        ring_capacity: int = 1024,
+    ) -> None:
+        self.addr: Tuple[str, int] = (host, port)
+        self._decoder: Decoder = DECODERS[decoder] if isinstance(decoder, str) else decoder
+        self._json = self._decoder is decode_json
+        self._ring = FrameRing(ring_capacity)
+        self._stats = ReaderStats("udp_async")
+        self._latest: Frame = TelemetryFrame(received_time=0, car_speed=0.0)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._transports: List[asyncio.BaseTransport] = []
+        self._tasks: List[asyncio.Task] = []
+        # registered before start(); opened on the loop thread
+        self._sources: List[Tuple[Callable[[], asyncio.DatagramProtocol], Tuple]] = []
+        self._heartbeats: List[Tuple[Tuple[str, int], bytes, float]] = []
+        self.packets = 0
+        self.heartbeats_sent = 0
+
+    # --- Registration (before start) ---------------------------------------
+    def add_heartbeat(
+        self,
+        addr: Tuple[str, int],
+        message: bytes = GT7_HEARTBEAT,
+        interval_s: float = GT7_HEARTBEAT_INTERVAL_S,
+    ) -> None:
+        """Send *message* to *addr* right away and then every *interval_s*."""
+        self._heartbeats.append((addr, message, float(interval_s)))
+
+    def add_source(
+        self,
+        protocol_factory: Callable[[], asyncio.DatagramProtocol],
+        local_addr: Tuple[str, int],
+    ) -> None:
+        """Host another datagram endpoint on the engine's loop."""
+        self._sources.append((protocol_factory, local_addr))
+
+    def subscribe(self, fields: Iterable[str]) -> None:
+        """JSON only: validate just *fields* on receipt (see :func:`decode_json`)."""
+        if self._json:
+            self._decoder = functools.partial(decode_json, fields=subscription(fields))
+
+    # --- Reader contract ---------------------------------------------------
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        self._thread = threading.Thread(target=self._run, args=(loop,), daemon=True)
+        self._thread.start()
+        # surface bind errors to the caller instead of losing them in the thread
+        try:
+            asyncio.run_coroutine_threadsafe(self._open(), loop).result(
+                START_TIMEOUT_S
+            )
+        except Exception:
+            self.stop()
+            raise
+
+    def latest(self) -> Frame:
+        return self._latest
+
+    def since(self, seq: int) -> Tuple[List[Frame], int]:
+        return self._ring.since(seq)
+
+    def head(self) -> int:
+        """Sequence number of the newest frame, without side effects."""
+        return self._ring.seq
+
+    def latest_received_time(self) -> float:
+        """Receive time (s) of the newest frame, 0.0 before the first one."""
+        return frame_seconds(self._latest.received_time)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats.snapshot(),
+            "ring": self._ring.stats(),
+            "heartbeats_sent": self.heartbeats_sent,
+        }
+
+    def stop(self) -> None:
+        loop, thread = self._loop, self._thread
+        if loop is None or thread is None:
+            return
+        if loop.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(self._close(), loop).result(
+                    START_TIMEOUT_S
+                )
+            except Exception:
+                pass
+            loop.call_soon_threadsafe(loop.stop)
+        if thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+        if not loop.is_running():
+            loop.close()
+        self._loop = None
+        self._thread = None
+
+    # --- Loop thread -------------------------------------------------------
+    def _run(self, loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    async def _open(self) -> None:
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _FrameProtocol(self, self._decoder), local_addr=self.addr
+        )
+        self._transports.append(transport)
+        for factory, local_addr in self._sources:
+            transport, _ = await loop.create_datagram_endpoint(
+                factory, local_addr=local_addr
+            )
+            self._transports.append(transport)
+        for addr, message, interval_s in self._heartbeats:
+            transport, _ = await loop.create_datagram_endpoint(
+                asyncio.DatagramProtocol, remote_addr=addr
+            )
+            self._transports.append(transport)
+            self._tasks.append(
+                loop.create_task(self._heartbeat(transport, message, interval_s))
+            )
+
+    async def _close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        for transport in self._transports:
+            transport.close()
+        self._tasks.clear()
+        self._transports.clear()
+
+    async def _heartbeat(
+        self, transport: asyncio.DatagramTransport, message: bytes, interval_s: float
+    ) -> None:
+        while True:
+            try:
+                transport.sendto(message)
+                self.heartbeats_sent += 1
+            except OSError as e:
+                LOGGER.warning(f"heartbeat failed: {e}")
+            await asyncio.sleep(interval_s)
+
+    def _on_datagram(self, data: bytes, decoder: Decoder) -> None:
+        self.packets += 1
+        try:
+            frame = decoder(data)
+        except Exception as e:
+            self._stats.error(e)
+            return
+        self._stats.packet(frame)
+        self._ring.push(frame)
+        self._latest = frame
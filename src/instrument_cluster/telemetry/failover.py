@@ -0,0 +1,128 @@
+import time
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .models import frame_seconds
+from .stats import reader_stats
+
+
+class Staleness(str, Enum):
+    FRESH = "fresh"  # primary frames are current
+    STALE = "stale"  # primary went quiet, still showing its last frame
+    FAILED_OVER = "failed_over"  # serving the secondary source
+
+
+def frame_age_s(frame: Any, now: Optional[float] = None) -> float:
+    """Seconds since *frame* was received; infinite for frames never stamped."""
+    received = getattr(frame, "received_time", 0) or 0
+    if received <= 0:
+        return float("inf")
+    return (time.time() if now is None else now) - frame_seconds(received)
+
+
+class FailoverReader:
+    """Serves a primary reader and falls back to a secondary when it goes quiet.
+
+    Frame age comes from the newest primary frame's ``received_time``, so
+    the check per call is constant time. After ``failover_after_s`` without
+    fresh primary frames the secondary takes over; as soon as the primary
+    delivers a frame younger than ``stale_after_s`` again it is switched
+    back. Consumers keep their single ``since()`` cursor across switches:
+    this reader numbers the frames it hands out itself (one consumer).
+    """
+
+    def __init__(
+        self,
+        primary: Any,
+        secondary: Optional[Any] = None,
+        stale_after_s: float = 0.5,
+        failover_after_s: float = 2.0,
+    ) -> None:
+        self.primary = primary
+        self.secondary = secondary
+        self.stale_after_s = float(stale_after_s)
+        self.failover_after_s = max(self.stale_after_s, float(failover_after_s))
+        self._active = primary
+        self._primary_t = 0.0  # receive time (s) of the newest primary frame
+        self._started_at = 0.0
+        self._cursor_p = 0
+        self._cursor_s = 0
+        self._seq = 0
+        self.failovers = 0
+
+    def start(self) -> None:
+        self.primary.start()
+        if self.secondary is not None:
+            self.secondary.start()
+        self._started_at = time.time()
+
+    @property
+    def failed_over(self) -> bool:
+        return self._active is not self.primary
+
+    def staleness(self, now: Optional[float] = None) -> Staleness:
+        if self.failed_over:
+            return Staleness.FAILED_OVER
+        now = time.time() if now is None else now
+        if now - self._primary_t <= self.stale_after_s:
+            return Staleness.FRESH
+        return Staleness.STALE
+
+    def _note_primary(self, received_s: float) -> None:
+        if received_s > 0:
+            self._primary_t = max(self._primary_t, received_s)
+
+    def _select(self, now: float) -> None:
+        # quiet since start counts from start, not from the epoch
+        age = now - max(self._primary_t, self._started_at)
+        if not self.failed_over:
+            if self.secondary is not None and age > self.failover_after_s:
+                self._active = self.secondary
+                self._cursor_s = self.secondary.head()
+                self.failovers += 1
+        elif now - self._primary_t <= self.stale_after_s:
+            self._active = self.primary
+
+    def latest(self):
+        self._note_primary(self.primary.latest_received_time())
+        self._select(time.time())
+        return self._active.latest()
+
+    def since(self, seq: int) -> Tuple[List[Any], int]:
+        frames, self._cursor_p = self.primary.since(self._cursor_p)
+        if frames:
+            self._note_primary(frame_seconds(frames[-1].received_time or 0))
+        was_failed_over = self.failed_over
+        self._select(time.time())
+        if self.failed_over:
+            frames, self._cursor_s = self.secondary.since(self._cursor_s)
+        elif was_failed_over:
+            # just recovered: only hand out fresh primary frames
+            frames = [f for f in frames if frame_age_s(f) <= self.stale_after_s]
+        self._seq += len(frames)
+        return frames, self._seq
+
+    def head(self) -> int:
+        return self._seq
+
+    def latest_received_time(self) -> float:
+        return self._active.latest_received_time()
+
+    def subscribe(self, fields: Iterable[str]) -> None:
+        fields = frozenset(fields)
+        for reader in (self.primary, self.secondary):
+            if hasattr(reader, "subscribe"):
+                reader.subscribe(fields)
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistics of the reader currently being served."""
+        return {
+            **reader_stats(self._active),
+            "active": "secondary" if self.failed_over else "primary",
+            "failovers": self.failovers,
+        }
+
+    def stop(self) -> None:
+        for reader in (self.primary, self.secondary):
+            if reader is not None and hasattr(reader, "stop"):
+                reader.stop()
@@ -4,3 +4,7 @@ from enum import Enum
 class TelemetryMode(str, Enum):
     DEMO = "demo"
     UDP = "udp"
+    UDP_BINARY = "udp_binary"
+    UDP_ASYNC = "udp_async"
+    REPLAY = "replay"
+    SHM = "shm"
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import Any, Callable, Dict, Iterable, Tuple, Union
+
+from pydantic import BaseModel, TypeAdapter
 
 
 class TelemetryFrame(BaseModel):
@@ -11,3 +13,152 @@ class TelemetryFrame(BaseModel):
     steering: float = 0.0
 
     lap_count: int | None = 0
+    packet_id: int | None = None
+    car_id: int = 0
+
+
+# Frames further apart than this (s) are not one continuous stream (pause,
+# gap): consumers do not integrate or differentiate across them.
+MAX_FRAME_DT_S = 0.5
+
+
+def frame_seconds(received_time: float) -> float:
+    """Convert a frame's ``received_time`` to seconds.
+
+    Sources stamp frames in nanoseconds (``time.time_ns()``), the proxy may
+    use milliseconds or seconds; the magnitude tells them apart.
+    """
+    t = float(received_time)
+    if t > 1e15:
+        return t * 1e-9
+    if t > 1e12:
+        return t * 1e-3
+    return t
+
+
+_FRAME_FIELDS = frozenset(TelemetryFrame.model_fields)
+_new = object.__new__
+_set = object.__setattr__
+
+
+def trusted_frame(values: Dict[str, Any]) -> TelemetryFrame:
+    """Build a frame from already-typed *values* without pydantic validation.
+
+    For decoders of fixed binary layouts only: *values* must hold every field
+    with the right type and is adopted as the instance ``__dict__``. This is
+    what ``model_construct`` does, minus its per-call default handling.
+    """
+    frame = _new(TelemetryFrame)
+    _set(frame, "__dict__", values)
+    _set(frame, "__pydantic_fields_set__", _FRAME_FIELDS)
+    _set(frame, "__pydantic_extra__", None)
+    _set(frame, "__pydantic_private__", None)
+    return frame
+
+
+# Fields every frame decodes up front: readers and wrappers rely on them.
+ALWAYS_DECODED = frozenset({"received_time", "packet_id", "car_id"})
+
+_VALIDATORS = {
+    name: TypeAdapter(info.annotation).validator.validate_python
+    for name, info in TelemetryFrame.model_fields.items()
+}
+_REQUIRED = object()
+_DEFAULTS = {
+    name: info.default
+    for name, info in TelemetryFrame.model_fields.items()
+    if not info.is_required()
+}
+
+
+def _lazy(value: Any) -> Any:
+    if isinstance(value, dict):
+        return LazyPayload(value)
+    if isinstance(value, list):
+        return [_lazy(v) for v in value]
+    return value
+
+
+class LazyPayload:
+    """Attribute view over a decoded JSON object; nested objects are wrapped
+    on first access and cached."""
+
+    __slots__ = ("_raw", "__dict__")
+
+    def __init__(self, raw: Dict[str, Any]) -> None:
+        self._raw = raw
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__") or name not in self._raw:
+            raise AttributeError(name)
+        value = self.__dict__[name] = _lazy(self._raw[name])
+        return value
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._raw!r})"
+
+
+Subscription = Tuple[Tuple[str, Callable[[Any], Any], Any], ...]
+
+
+def subscription(fields: Iterable[str]) -> Subscription:
+    """Resolve frame field names once into what :class:`LazyFrame` needs per
+    frame; names outside the frame schema are dropped."""
+    names = ALWAYS_DECODED.union(fields)
+    return tuple(
+        (name, _VALIDATORS[name], _DEFAULTS.get(name, _REQUIRED))
+        for name in sorted(names)
+        if name in _VALIDATORS
+    )
+
+
+class LazyFrame(LazyPayload):
+    """A :class:`TelemetryFrame` that validates fields on first access.
+
+    Decoders build one from the parsed payload and a :func:`subscription`:
+    the subscribed fields are validated right away, so a bad value in a field
+    someone reads still fails the decode. Every other frame field is
+    validated when first read; payload keys outside the frame schema (e.g.
+    the full GT7 packet) are exposed as attributes, unvalidated. It is not a
+    pydantic model: use :meth:`to_frame` where the model API is needed.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, raw: Dict[str, Any], fields: Subscription = ()) -> None:
+        self._raw = raw
+        values = self.__dict__
+        for name, validate, default in fields:
+            if name in raw:
+                values[name] = validate(raw[name])
+            elif default is _REQUIRED:
+                raise ValueError(f"frame has no {name}")
+            else:
+                values[name] = default
+
+    def __getattr__(self, name: str) -> Any:
+        validate = _VALIDATORS.get(name)
+        if validate is None:
+            return super().__getattr__(name)
+        raw = self._raw
+        if name in raw:
+            value = validate(raw[name])
+        elif name in _DEFAULTS:
+            value = _DEFAULTS[name]
+        else:
+            raise AttributeError(f"frame has no {name}")
+        self.__dict__[name] = value
+        return value
+
+    def to_frame(self) -> TelemetryFrame:
+        """Fully validated copy (``model_dump()`` and the rest of the model API)."""
+        return TelemetryFrame(**{name: getattr(self, name) for name in _VALIDATORS})
+
+
+# What decoders and readers hand out: frame fields read the same on both.
+Frame = Union[TelemetryFrame, LazyFrame]
+
+
+def as_model(frame: Frame) -> TelemetryFrame:
+    """*frame* as a :class:`TelemetryFrame`, validating a :class:`LazyFrame`."""
+    return frame.to_frame() if isinstance(frame, LazyFrame) else frame
@@ -0,0 +1,223 @@
+import bisect
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .models import TelemetryFrame, frame_seconds, trusted_frame
+from .session import CHANNELS, MISSING, Session, SessionWriter
+from .stats import ReaderStats, reader_stats
+
+# Frames released per call when replaying as fast as possible.
+UNTHROTTLED_BATCH = 256
+# A consumer further behind than this loses the oldest frames (like FrameRing).
+MAX_BACKLOG = 4096
+
+RECORDED_FIELDS = frozenset(name for name, _ in CHANNELS if name != "t") | {
+    "received_time"
+}
+
+
+class SessionRecorder:
+    """Tees every frame of a reader into a session file.
+
+    Wraps any reader with the ``start/latest/since/stop`` contract and is a
+    drop-in replacement for it. Frames are pulled through the wrapped reader's
+    :meth:`since` whenever the consumer asks for data, so recording costs a
+    few array appends per frame on the caller's thread; the session writer
+    streams them to the file in chunks and finishes it on :meth:`stop`.
+    """
+
+    def __init__(self, reader: Any, path: str) -> None:
+        self.reader = reader
+        self.path = path
+        self._writer = SessionWriter(path)
+        self._seq = 0
+
+    def start(self) -> None:
+        self.reader.start()
+
+    def _record(self, frames: List[Any], head: int) -> None:
+        if head < self._seq:
+            # the reader restarted its numbering: every frame is new
+            self._seq = head - len(frames)
+        new = head - self._seq
+        if new > 0 and frames:
+            self._writer.extend(frames[-new:] if new < len(frames) else frames)
+        self._seq = max(self._seq, head)
+
+    def latest(self):
+        frames, head = self.reader.since(self._seq)
+        self._record(frames, head)
+        return self.reader.latest()
+
+    def since(self, seq: int) -> Tuple[List[Any], int]:
+        # one fetch serves both the recorder's and the consumer's cursor
+        frames, head = self.reader.since(min(seq, self._seq))
+        self._record(frames, head)
+        want = head - seq if seq <= head else len(frames)
+        if want <= 0:
+            return [], head
+        return (frames[-want:] if want < len(frames) else frames), head
+
+    def head(self) -> int:
+        return self.reader.head()
+
+    def latest_received_time(self) -> float:
+        return self.reader.latest_received_time()
+
+    def subscribe(self, fields: Iterable[str]) -> None:
+        # the recorder itself reads every session channel
+        if hasattr(self.reader, "subscribe"):
+            self.reader.subscribe(RECORDED_FIELDS.union(fields))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**reader_stats(self.reader), "recorded": len(self._writer)}
+
+    def stop(self) -> None:
+        try:
+            if hasattr(self.reader, "stop"):
+                self.reader.stop()
+        finally:
+            self._writer.close()
+
+
+class ReplayReader:
+    """Plays a recorded session back through the reader contract.
+
+    ``speed`` scales playback time (1.0 = real time, 2.0 = double speed);
+    ``speed <= 0`` replays as fast as the consumer pulls, releasing
+    ``UNTHROTTLED_BATCH`` frames per call. Frames keep their recorded spacing
+    in ``received_time`` (shifted to start at :meth:`start`), so time-based
+    consumers see the original dynamics at any speed.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = False) -> None:
+        self.path = path
+        self.speed = float(speed)
+        self.loop = bool(loop)
+        self._session: Optional[Session] = None
+        self._released = 0
+        self._wall0 = 0.0
+        self._stamp0_ns = 0
+        self._t0 = 0.0
+        self._duration = 0.0
+        self._idle: TelemetryFrame = TelemetryFrame(received_time=0)
+        self.dropped = 0
+        self.overruns = 0
+        self._stats = ReaderStats("replay")
+
+    def start(self) -> None:
+        if self._session is not None:
+            return
+        self._session = Session(self.path)
+        t = self._session.columns["t"]
+        n = len(self._session)
+        self._t0 = t[0] if n else 0.0
+        # one mean frame interval past the last frame before looping
+        span = (t[n - 1] - self._t0) if n else 0.0
+        self._duration = span + (span / (n - 1) if n > 1 else 0.0)
+        self._released = 0
+        self._wall0 = time.perf_counter()
+        self._stamp0_ns = time.time_ns()
+
+    def _advance(self) -> int:
+        """Release the frames that are due; returns the newest sequence number."""
+        session = self._session
+        if session is None or not len(session):
+            return 0
+        n = len(session)
+        if self.speed <= 0:
+            if self.loop or self._released < n:
+                self._released += UNTHROTTLED_BATCH
+                if not self.loop:
+                    self._released = min(n, self._released)
+            return self._released
+        self._released = self._due()
+        return self._released
+
+    def _due(self) -> int:
+        """Frames whose playback time has come (throttled replay)."""
+        session = self._session
+        n = len(session)
+        elapsed = (time.perf_counter() - self._wall0) * self.speed
+        t = session.columns["t"]
+        if self.loop and self._duration > 0.0:
+            loops, within = divmod(elapsed, self._duration)
+            return int(loops) * n + bisect.bisect_right(t, self._t0 + within)
+        return bisect.bisect_right(t, self._t0 + elapsed)
+
+    def head(self) -> int:
+        """Newest sequence number, without releasing frames."""
+        session = self._session
+        if session is None or not len(session):
+            return 0
+        return self._released if self.speed <= 0 else self._due()
+
+    def latest_received_time(self) -> float:
+        seq = self.head()
+        return self._stamp_ns(seq) / 1e9 if seq else 0.0
+
+    def _stamp_ns(self, seq: int) -> int:
+        """``received_time`` of frame *seq*: its recorded offset from the
+        first frame, shifted to :meth:`start` and continued across loops."""
+        loops, i = divmod(seq - 1, len(self._session))
+        t = self._session.columns["t"]
+        return self._stamp0_ns + int((loops * self._duration + t[i] - self._t0) * 1e9)
+
+    def _frame(self, seq: int) -> TelemetryFrame:
+        cols = self._session.columns
+        i = (seq - 1) % len(self._session)
+        lap_count = cols["lap_count"][i]
+        packet_id = cols["packet_id"][i]
+        return trusted_frame(
+            {
+                "received_time": float(self._stamp_ns(seq)),
+                "car_speed": cols["car_speed"][i],
+                "engine_rpm": cols["engine_rpm"][i],
+                "current_gear": cols["current_gear"][i],
+                "throttle": cols["throttle"][i],
+                "brake": cols["brake"][i],
+                "steering": cols["steering"][i],
+                "lap_count": None if lap_count == MISSING else lap_count,
+                "packet_id": None if packet_id == MISSING else packet_id,
+                "car_id": cols["car_id"][i],
+            }
+        )
+
+    def latest(self) -> TelemetryFrame:
+        head = self._advance()
+        return self._frame(head) if head else self._idle
+
+    def since(self, seq: int) -> Tuple[List[TelemetryFrame], int]:
+        head = self._advance()
+        if seq >= head:
+            return [], head
+        start = max(0, seq) + 1
+        oldest = head - MAX_BACKLOG + 1
+        if start < oldest:
+            self.overruns += 1
+            self.dropped += oldest - start
+            start = oldest
+        frames = [self._frame(s) for s in range(start, head + 1)]
+        stats = self._stats
+        for frame in frames:
+            stats.packet(frame, frame_seconds(frame.received_time))
+        return frames, head
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats.snapshot(),
+            "dropped": self.dropped,
+            "overruns": self.overruns,
+        }
+
+    def finished(self) -> bool:
+        """True once a non-looping replay has released its last frame."""
+        session = self._session
+        return (
+            session is not None and not self.loop and self._released >= len(session)
+        )
+
+    def stop(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
@@ -0,0 +1,69 @@
+import threading
+from typing import Any, List, Optional, Tuple
+
+
+class FrameRing:
+    """Fixed-capacity ring of received frames with monotonic sequence numbers.
+
+    The reader thread :meth:`push`\\ es every decoded frame; the render thread
+    calls :meth:`since` once per tick with the last sequence number it saw and
+    gets every newer frame in arrival order. Sequence numbers start at 1, so
+    ``since(0)`` returns everything still buffered.
+
+    If a consumer falls more than ``capacity`` frames behind, the oldest
+    frames are gone: :attr:`overruns` counts such calls and :attr:`dropped`
+    the frames the consumer never saw.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = int(capacity)
+        self._slots: List[Any] = [None] * self.capacity
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.overruns = 0
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the newest frame (0 while empty)."""
+        return self._seq
+
+    def push(self, frame: Any) -> int:
+        """Store *frame* and return its sequence number."""
+        with self._lock:
+            seq = self._seq + 1
+            self._slots[seq % self.capacity] = frame
+            self._seq = seq
+        return seq
+
+    def latest(self) -> Optional[Any]:
+        seq = self._seq
+        return self._slots[seq % self.capacity] if seq else None
+
+    def since(self, seq: int) -> Tuple[List[Any], int]:
+        """Return ``(frames, head)``: all frames newer than *seq*, oldest first,
+        and the sequence number to pass on the next call."""
+        with self._lock:
+            head = self._seq
+            if seq >= head:
+                return [], head
+            start = max(0, seq) + 1
+            oldest = head - self.capacity + 1
+            if start < oldest:
+                self.overruns += 1
+                self.dropped += oldest - start
+                start = oldest
+            cap = self.capacity
+            slots = self._slots
+            frames = [slots[s % cap] for s in range(start, head + 1)]
+        return frames, head
+
+    def stats(self) -> dict:
+        return {
+            "seq": self._seq,
+            "capacity": self.capacity,
+            "dropped": self.dropped,
+            "overruns": self.overruns,
+        }
@@ -0,0 +1,271 @@
+"""Columnar telemetry session files.
+
+A session stores one array per channel plus a timestamp column, so a replay
+can index any frame without parsing.
+
+Layout (little-endian)::
+
+    header    "<4sHHQ"     magic b"ICSN", version, channel count, frame count
+    channels  "<16scxxxxxxxQ" per channel: name, array typecode, byte offset
+
+Version 1 (written whole on close) follows with one contiguous array per
+channel at its offset, each starting on an 8-byte boundary. Version 2 is
+written while recording, as chunks of frames::
+
+    chunk     "<4sIIxxxx"  magic b"ICSC", frame count, crc32 of the columns
+    columns   one array per channel for those frames, each 8-byte aligned
+
+Its header carries ``UNFINISHED`` as frame count until the writer is
+closed, and channel offsets are 0. A file that was never finished (crash,
+power loss) reads up to its last complete chunk.
+
+The ``t`` column holds receive times in seconds (float64).
+"""
+
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from ..core.logger import Logger
+from .models import frame_seconds
+
+LOGGER = Logger("session").get()
+
+MAGIC = b"ICSN"
+VERSION = 2
+
+HEADER = struct.Struct("<4sHHQ")
+CHANNEL = struct.Struct("<16scxxxxxxxQ")
+CHUNK_MAGIC = b"ICSC"
+CHUNK = struct.Struct("<4sIIxxxx")
+# Frame count in the header of a session still being written.
+UNFINISHED = 0xFFFFFFFFFFFFFFFF
+# A chunk is written once it holds this many frames or spans this many
+# seconds, whichever comes first; at most that much is lost in a crash.
+CHUNK_FRAMES = 1024
+CHUNK_SECONDS = 1.0
+
+# (name, array typecode); "t" is the timestamp column in seconds
+CHANNELS: Tuple[Tuple[str, str], ...] = (
+    ("t", "d"),
+    ("car_id", "i"),
+    ("car_speed", "f"),
+    ("engine_rpm", "i"),
+    ("current_gear", "h"),
+    ("throttle", "f"),
+    ("brake", "f"),
+    ("steering", "f"),
+    ("lap_count", "i"),
+    ("packet_id", "q"),
+)
+
+# Optional integer channels store this for None.
+MISSING = -1
+
+
+def _align8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class SessionWriter:
+    """Appends frames column by column and writes them out in chunks.
+
+    Chunks are encoded on the caller's thread (a few array copies) and
+    written and fsynced by a background thread, so the file is complete up
+    to the last chunk even if the process never reaches :meth:`close`. The
+    file is created with the first chunk.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._cols: Dict[str, array] = {name: array(tc) for name, tc in CHANNELS}
+        self._written = 0
+        self._chunks: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._f: Optional[BinaryIO] = None
+        self.errors = 0
+
+    def __len__(self) -> int:
+        return self._written + len(self._cols["t"])
+
+    def append(self, frame: Any) -> None:
+        cols = self._cols
+        lap_count = getattr(frame, "lap_count", None)
+        packet_id = getattr(frame, "packet_id", None)
+        t = frame_seconds(frame.received_time)
+        cols["t"].append(t)
+        cols["car_id"].append(int(getattr(frame, "car_id", 0) or 0))
+        cols["car_speed"].append(float(frame.car_speed))
+        cols["engine_rpm"].append(int(frame.engine_rpm))
+        cols["current_gear"].append(int(frame.current_gear))
+        cols["throttle"].append(float(frame.throttle))
+        cols["brake"].append(float(frame.brake))
+        cols["steering"].append(float(frame.steering))
+        cols["lap_count"].append(MISSING if lap_count is None else int(lap_count))
+        cols["packet_id"].append(MISSING if packet_id is None else int(packet_id))
+        n = len(cols["t"])
+        if n >= CHUNK_FRAMES or t - cols["t"][0] >= CHUNK_SECONDS:
+            self._cut()
+
+    def extend(self, frames: Iterable[Any]) -> None:
+        for frame in frames:
+            self.append(frame)
+
+    def _cut(self) -> None:
+        """Hand the buffered frames to the write thread as one chunk."""
+        cols = self._cols
+        n = len(cols["t"])
+        if not n:
+            return
+        payload = bytearray()
+        for name, _ in CHANNELS:
+            payload += _le(cols[name]).tobytes()
+            payload += b"\0" * (_align8(len(payload)) - len(payload))
+        self._chunks.put(
+            CHUNK.pack(CHUNK_MAGIC, n, zlib.crc32(payload)) + bytes(payload)
+        )
+        self._written += n
+        self._cols = {name: array(tc) for name, tc in CHANNELS}
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="session-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None:
+                return
+            try:
+                if self._f is None:
+                    self._f = _create(self.path)
+                self._f.write(chunk)
+                self._f.flush()
+                os.fsync(self._f.fileno())
+            except OSError as e:
+                self.errors += 1
+                LOGGER.error(f"session write to {self.path} failed: {e}")
+
+    def close(self) -> None:
+        """Write what is buffered and finish the header."""
+        self._cut()
+        if self._thread is None:
+            return
+        self._chunks.put(None)
+        self._thread.join()
+        self._thread = None
+        f, self._f = self._f, None
+        if f is None:
+            return
+        try:
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, len(CHANNELS), self._written))
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            f.close()
+
+
+def _le(col: array) -> array:
+    if sys.byteorder != "little":
+        col = array(col.typecode, col)
+        col.byteswap()
+    return col
+
+
+def _create(path: str) -> BinaryIO:
+    """A new version 2 session file holding the header and channel table."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    f = open(path, "wb")
+    f.write(HEADER.pack(MAGIC, VERSION, len(CHANNELS), UNFINISHED))
+    f.write(
+        b"".join(
+            CHANNEL.pack(name.encode("ascii"), tc.encode("ascii"), 0)
+            for name, tc in CHANNELS
+        )
+    )
+    pos = HEADER.size + CHANNEL.size * len(CHANNELS)
+    f.write(b"\0" * (_align8(pos) - pos))
+    return f
+
+
+class Session:
+    """Read-only view of a session file.
+
+    Columns are exposed as ``memoryview`` casts: straight over the mapping
+    for version 1 files, over arrays gathered from the chunks for version 2.
+    ``complete`` is False for a version 2 file whose writer never finished.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+        magic, version, n_channels, n_frames = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            buf.release()
+            self._mmap.close()
+            raise ValueError(f"{path} is not a telemetry session")
+        if version not in (1, VERSION):
+            buf.release()
+            self._mmap.close()
+            raise ValueError(f"unsupported session version {version}")
+        if sys.byteorder != "little":
+            raise ValueError("sessions can only be mapped on little-endian hosts")
+        table = []
+        for i in range(n_channels):
+            raw, tc, offset = CHANNEL.unpack_from(buf, HEADER.size + i * CHANNEL.size)
+            table.append((raw.rstrip(b"\0").decode("ascii"), tc.decode("ascii"), offset))
+        self.columns: Dict[str, memoryview] = {}
+        self.complete = version == 1 or n_frames != UNFINISHED
+        if version == 1:
+            self.frames = n_frames
+            for name, typecode, offset in table:
+                size = array(typecode).itemsize * n_frames
+                self.columns[name] = buf[offset : offset + size].cast(typecode)
+        else:
+            cols = self._read_chunks(buf, table)
+            self.frames = len(cols[table[0][0]]) if table else 0
+            self.columns = {name: memoryview(col) for name, col in cols.items()}
+        self._buf = buf
+
+    def _read_chunks(
+        self, buf: memoryview, table: List[Tuple[str, str, int]]
+    ) -> Dict[str, array]:
+        cols = {name: array(tc) for name, tc, _ in table}
+        sizes = [array(tc).itemsize for _, tc, _ in table]
+        pos = _align8(HEADER.size + CHANNEL.size * len(table))
+        while pos + CHUNK.size <= len(buf):
+            magic, n, crc = CHUNK.unpack_from(buf, pos)
+            start = pos + CHUNK.size
+            length = sum(_align8(n * size) for size in sizes)
+            if magic != CHUNK_MAGIC or not 0 < length <= len(buf) - start:
+                break
+            if zlib.crc32(buf[start : start + length]) != crc:
+                break  # torn chunk from an interrupted write
+            for (name, _, _), size in zip(table, sizes):
+                cols[name].frombytes(buf[start : start + n * size])
+                start += _align8(n * size)
+            pos = start
+        return cols
+
+    def __len__(self) -> int:
+        return self.frames
+
+    def channel_names(self) -> List[str]:
+        return list(self.columns)
+
+    def close(self) -> None:
+        for col in self.columns.values():
+            col.release()
+        self.columns = {}
+        self._buf.release()
+        self._mmap.close()
@@ -0,0 +1,387 @@
+"""Shared-memory telemetry transport for a producer on the same machine.
+
+The producer writes fixed-layout frames (see :mod:`.wire`) straight into a
+``multiprocessing.shared_memory`` segment; the cluster reads them in place.
+No serialization to text, no socket and no syscall per frame.
+
+Segment layout (little-endian, all words 8-byte aligned)::
+
+    0    control  "<4sHHIIQ" magic b"ICSH", version, reserved, frame size,
+                             ring capacity, instance
+    24   head     Q          sequence number of the newest published frame
+    32   latest   Q lock + frame
+    ..   ring     capacity x (Q lock, Q seq, frame)
+
+Every slot is guarded by a seqlock: the writer makes the lock word odd,
+writes the slot, then makes it even again. A reader copies the slot and
+retries if the lock was odd or changed meanwhile. There is one writer.
+
+The instance word is a random number per publisher. A publisher that
+closes, or takes over the segment of a crashed one, zeroes it in the old
+segment before unlinking it, which tells attached readers to re-attach to
+the new segment. A reader whose head stops moving also checks the segment
+under the name for another instance, for producers that died without a
+successor zeroing their word.
+
+Run ``python -m instrument_cluster.telemetry.shm demo`` for a reference
+producer that publishes demo frames.
+"""
+
+import argparse
+import random
+import signal
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import TelemetryFrame, frame_seconds
+from .stats import ReaderStats
+from .wire import FRAME_V2, decode_frame, encode_into
+
+MAGIC = b"ICSH"
+VERSION = 2
+DEFAULT_NAME = "simdash-telemetry"
+
+CONTROL = struct.Struct("<4sHHIIQ")
+FRAME_SIZE = (FRAME_V2.size + 7) & ~7
+INSTANCE_OFFSET = 16
+HEAD_OFFSET = 24
+LATEST_OFFSET = 32
+RING_OFFSET = LATEST_OFFSET + 8 + FRAME_SIZE
+ENTRY_SIZE = 16 + FRAME_SIZE
+
+# Attempts before a reader gives up on a slot that keeps changing under it.
+READ_RETRIES = 8
+# How often a reader retries attaching while no producer exists.
+ATTACH_INTERVAL_S = 0.5
+# A head that has not moved for this long (s) makes the reader check for a
+# restarted producer (every ATTACH_INTERVAL_S).
+STALL_S = 1.0
+
+
+# Segments created by a publisher in this process (see _attach).
+_OWNED: set = set()
+
+
+def segment_size(capacity: int) -> int:
+    return RING_OFFSET + capacity * ENTRY_SIZE
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach without letting this process' resource tracker unlink the
+    segment when the cluster exits (the producer owns it)."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if name in _OWNED:
+            return shm
+        try:
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+def _retire(shm: shared_memory.SharedMemory) -> None:
+    """Zero the instance word of a segment about to be unlinked."""
+    buf = shm.buf
+    if len(buf) >= CONTROL.size and bytes(buf[:4]) == MAGIC:
+        struct.pack_into("<Q", buf, INSTANCE_OFFSET, 0)
+
+
+class ShmPublisher:
+    """Producer side: creates the segment and publishes frames into it."""
+
+    def __init__(self, name: str = DEFAULT_NAME, capacity: int = 1024) -> None:
+        self.name = name
+        self.capacity = int(capacity)
+        try:
+            self._shm = shared_memory.SharedMemory(
+                name=name, create=True, size=segment_size(self.capacity)
+            )
+        except FileExistsError:
+            # stale segment from a crashed producer: take it over
+            stale = shared_memory.SharedMemory(name=name)
+            _retire(stale)
+            stale.unlink()
+            stale.close()
+            self._shm = shared_memory.SharedMemory(
+                name=name, create=True, size=segment_size(self.capacity)
+            )
+        _OWNED.add(name)
+        self._buf = self._shm.buf
+        self._words = self._buf.cast("Q")
+        self.instance = random.getrandbits(64) or 1
+        CONTROL.pack_into(
+            self._buf, 0, MAGIC, VERSION, 0, FRAME_SIZE, self.capacity, self.instance
+        )
+        self._seq = 0
+
+    def publish(self, frame: Any, packet_id: Optional[int] = None) -> int:
+        """Write *frame* (model or dict) into the latest slot and the ring;
+        returns its sequence number."""
+        seq = self._seq + 1
+        pid = seq if packet_id is None else packet_id
+        buf = self._buf
+        words = self._words
+
+        lock = LATEST_OFFSET // 8
+        words[lock] += 1
+        encode_into(buf, LATEST_OFFSET + 8, frame, pid)
+        words[lock] += 1
+
+        entry = RING_OFFSET + (seq % self.capacity) * ENTRY_SIZE
+        lock = entry // 8
+        words[lock] += 1
+        words[lock + 1] = seq
+        encode_into(buf, entry + 16, frame, pid)
+        words[lock] += 1
+
+        words[HEAD_OFFSET // 8] = seq
+        self._seq = seq
+        return seq
+
+    def close(self, unlink: bool = True) -> None:
+        if unlink:
+            self._words[INSTANCE_OFFSET // 8] = 0
+        self._words.release()
+        self._buf = None
+        self._shm.close()
+        _OWNED.discard(self.name)
+        if unlink:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class ShmReader:
+    """Consumer side: the ``start/latest/since/stop`` reader contract over a
+    segment published by :class:`ShmPublisher`.
+
+    The producer may start before or after the cluster; until the segment
+    exists :meth:`latest` returns an idle frame and :meth:`since` nothing.
+    When the producer restarts the reader moves to its new segment; its
+    sequence numbers start over, so a consumer cursor past the head is
+    taken as that restart and reads the new ring from its oldest frame.
+    """
+
+    def __init__(self, name: str = DEFAULT_NAME) -> None:
+        self.name = name
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._buf: Optional[memoryview] = None
+        self._words: Optional[memoryview] = None
+        self._capacity = 0
+        self._instance = 0
+        self._head = 0
+        self._head_moved = 0.0
+        self._next_attach = 0.0
+        self._latest: TelemetryFrame = TelemetryFrame(received_time=0, car_speed=0.0)
+        self._latest_lock = 0
+        self.dropped = 0
+        self.overruns = 0
+        self._stats = ReaderStats("shm")
+
+    def start(self) -> None:
+        self._try_attach()
+
+    def _try_attach(self) -> bool:
+        if self._shm is not None:
+            if self._words[INSTANCE_OFFSET // 8] == self._instance:
+                self._check_stall()
+                return self._shm is not None
+            # the producer retired this segment
+            self._detach()
+            self._next_attach = 0.0
+        now = time.monotonic()
+        if now < self._next_attach:
+            return False
+        self._next_attach = now + ATTACH_INTERVAL_S
+        shm = self._open()
+        if shm is None:
+            return False
+        self._use(shm)
+        return True
+
+    def _open(self) -> Optional[shared_memory.SharedMemory]:
+        """The live segment under our name, or None if there is none yet."""
+        try:
+            shm = _attach(self.name)
+        except FileNotFoundError:
+            return None
+        magic, version, _, frame_size, _, instance = CONTROL.unpack_from(shm.buf, 0)
+        if magic != MAGIC or version != VERSION or frame_size != FRAME_SIZE:
+            shm.close()
+            raise ValueError(f"shared memory {self.name!r} has an unknown layout")
+        if instance == 0:
+            shm.close()  # retired, its successor is not there yet
+            return None
+        return shm
+
+    def _use(self, shm: shared_memory.SharedMemory) -> None:
+        _, _, _, _, capacity, instance = CONTROL.unpack_from(shm.buf, 0)
+        self._shm = shm
+        self._buf = shm.buf
+        self._words = shm.buf.cast("Q")
+        self._capacity = capacity
+        self._instance = instance
+        self._latest_lock = 0
+        self._head = self._words[HEAD_OFFSET // 8]
+        self._head_moved = time.monotonic()
+
+    def _check_stall(self) -> None:
+        """Switch segments if the head stalled because the producer was
+        replaced without retiring this one (it crashed)."""
+        head = self._words[HEAD_OFFSET // 8]
+        now = time.monotonic()
+        if head != self._head:
+            self._head = head
+            self._head_moved = now
+            return
+        if now - self._head_moved < STALL_S or now < self._next_attach:
+            return
+        self._next_attach = now + ATTACH_INTERVAL_S
+        shm = self._open()
+        if shm is None:
+            return
+        instance = CONTROL.unpack_from(shm.buf, 0)[5]
+        if instance == self._instance:
+            shm.close()
+            return
+        self._detach()
+        self._use(shm)
+
+    def _read_slot(self, lock: int, offset: int) -> Tuple[Optional[TelemetryFrame], int]:
+        words = self._words
+        for _ in range(READ_RETRIES):
+            before = words[lock]
+            if before & 1:
+                continue
+            try:
+                frame = decode_frame(self._buf, offset)
+            except ValueError as e:
+                if words[lock] != before:
+                    continue  # torn read, not a bad frame
+                self._stats.error(e)
+                return None, 0
+            if words[lock] == before:
+                return frame, before
+        return None, 0
+
+    def latest(self) -> TelemetryFrame:
+        if not self._try_attach():
+            return self._latest
+        return self._peek_latest()
+
+    def _peek_latest(self) -> TelemetryFrame:
+        lock = LATEST_OFFSET // 8
+        version = self._words[lock]
+        if version == self._latest_lock or version == 0:
+            return self._latest
+        frame, version = self._read_slot(lock, LATEST_OFFSET + 8)
+        if frame is not None:
+            self._latest = frame
+            self._latest_lock = version
+        return self._latest
+
+    def since(self, seq: int) -> Tuple[List[TelemetryFrame], int]:
+        if not self._try_attach():
+            return [], seq
+        words = self._words
+        head = words[HEAD_OFFSET // 8]
+        if seq == head:
+            return [], head
+        if seq > head:
+            # the producer restarted: its numbering began again at 1
+            seq = max(0, head - self._capacity)
+        start = max(0, seq) + 1
+        oldest = head - self._capacity + 1
+        if start < oldest:
+            self.overruns += 1
+            self.dropped += oldest - start
+            start = oldest
+        frames: List[TelemetryFrame] = []
+        for s in range(start, head + 1):
+            entry = RING_OFFSET + (s % self._capacity) * ENTRY_SIZE
+            lock = entry // 8
+            frame, _ = self._read_slot(lock, entry + 16)
+            # the writer lapped us while reading: that frame is gone
+            if frame is None or words[lock + 1] != s:
+                self.dropped += 1
+                continue
+            # the arrival in shared memory is not observable: use the stamp
+            self._stats.packet(frame, frame_seconds(frame.received_time))
+            frames.append(frame)
+        return frames, head
+
+    def head(self) -> int:
+        """Newest published sequence number (0 while detached); does not
+        attach or re-attach."""
+        return self._words[HEAD_OFFSET // 8] if self._shm is not None else 0
+
+    def latest_received_time(self) -> float:
+        if self._shm is not None:
+            self._peek_latest()
+        return frame_seconds(self._latest.received_time)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats.snapshot(),
+            "attached": self._shm is not None,
+            "dropped": self.dropped,
+            "overruns": self.overruns,
+        }
+
+    def stop(self) -> None:
+        self._detach()
+
+    def _detach(self) -> None:
+        if self._shm is None:
+            return
+        self._words.release()
+        self._words = None
+        self._buf = None
+        self._shm.close()
+        self._shm = None
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="instrument_cluster.telemetry.shm")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_demo = sub.add_parser("demo", help="publish demo frames (reference producer)")
+    p_demo.add_argument("--name", default=DEFAULT_NAME)
+    p_demo.add_argument("--hz", type=float, default=60.0)
+    p_demo.add_argument("--capacity", type=int, default=1024)
+    args = parser.parse_args(argv)
+
+    from .demo import DemoReader
+
+    def _interrupt(signum, frame):
+        raise KeyboardInterrupt
+
+    # unlink the segment on service stop as well as on Ctrl-C
+    signal.signal(signal.SIGTERM, _interrupt)
+
+    demo = DemoReader()
+    pub = ShmPublisher(args.name, args.capacity)
+    period = 1.0 / max(1e-3, args.hz)
+    print(f"publishing demo frames to shared memory {args.name!r} at {args.hz} Hz")
+    try:
+        next_t = time.perf_counter()
+        while True:
+            pub.publish(demo.latest())
+            next_t += period
+            time.sleep(max(0.0, next_t - time.perf_counter()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pub.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
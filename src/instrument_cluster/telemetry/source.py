@@ -1,5 +1,17 @@
+import datetime
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
 from .demo import DemoReader
+from .engine import TelemetryEngine
+from .failover import FailoverReader, Staleness
 from .mode import TelemetryMode
+from .replay import ReplayReader, SessionRecorder
+from .shm import DEFAULT_NAME as DEFAULT_SHM_NAME
+from .shm import ShmReader
+from .stats import reader_stats
+from .udp_binary import UdpBinaryReader
 from .udp_jsonl import UdpJsonlReader
 
 
@@ -9,15 +21,43 @@ class TelemetrySource:
         mode: TelemetryMode | str | None = None,
         host: str = "127.0.0.1",
         port: int = 5600,
+        replay_path: Optional[str] = None,
+        replay_speed: float = 1.0,
+        record_path: Optional[str] = None,
+        shm_name: str = DEFAULT_SHM_NAME,
+        fallback_mode: TelemetryMode | str | None = None,
+        stale_after_s: float = 0.5,
+        failover_after_s: float = 2.0,
     ):
         if mode is None:
             mode = TelemetryMode.DEMO
         elif isinstance(mode, str):
             mode = TelemetryMode(mode)
         self._mode = mode
-        self.reader = (
-            UdpJsonlReader(host, port) if mode is TelemetryMode.UDP else DemoReader()
+        self.stale_after_s = stale_after_s
+        options = dict(
+            host=host,
+            port=port,
+            replay_path=replay_path,
+            replay_speed=replay_speed,
+            shm_name=shm_name,
         )
+        self.reader = make_reader(mode, **options)
+        if fallback_mode:
+            self.reader = FailoverReader(
+                self.reader,
+                make_reader(TelemetryMode(fallback_mode), **options),
+                stale_after_s=stale_after_s,
+                failover_after_s=failover_after_s,
+            )
+        if record_path:
+            self.reader = SessionRecorder(self.reader, _session_path(record_path))
+
+    def subscribe(self, fields: Iterable[str]) -> None:
+        """Frame fields the consumer reads; readers that decode field by field
+        validate only these on receipt. Call before :meth:`start`."""
+        if hasattr(self.reader, "subscribe"):
+            self.reader.subscribe(fields)
 
     def start(self) -> None:
         self.reader.start()
@@ -25,6 +65,58 @@ class TelemetrySource:
     def latest(self):
         return self.reader.latest()
 
+    def since(self, seq: int) -> Tuple[List, int]:
+        """Every frame received after sequence number *seq*, oldest first, and
+        the newest sequence number (pass it back on the next call)."""
+        return self.reader.since(seq)
+
+    def staleness(self) -> Staleness:
+        """Whether the frames being served are current (constant time)."""
+        reader = self.reader
+        if isinstance(reader, SessionRecorder):
+            reader = reader.reader
+        if isinstance(reader, FailoverReader):
+            return reader.staleness()
+        age = time.time() - reader.latest_received_time()
+        return Staleness.FRESH if age <= self.stale_after_s else Staleness.STALE
+
+    def stats(self) -> Dict[str, Any]:
+        """Running link statistics of the active reader (see :mod:`.stats`)."""
+        return reader_stats(self.reader)
+
     def stop(self) -> None:
         if hasattr(self.reader, "stop"):
             self.reader.stop()
+
+
+def make_reader(
+    mode: TelemetryMode,
+    host: str = "127.0.0.1",
+    port: int = 5600,
+    replay_path: Optional[str] = None,
+    replay_speed: float = 1.0,
+    shm_name: str = DEFAULT_SHM_NAME,
+):
+    """Build the reader for *mode*."""
+    if mode is TelemetryMode.UDP:
+        return UdpJsonlReader(host, port)
+    if mode is TelemetryMode.UDP_BINARY:
+        return UdpBinaryReader(host, port)
+    if mode is TelemetryMode.UDP_ASYNC:
+        return TelemetryEngine(host, port)
+    if mode is TelemetryMode.REPLAY:
+        if not replay_path:
+            raise ValueError("replay mode needs a session file (replay_path)")
+        return ReplayReader(os.path.expanduser(replay_path), replay_speed)
+    if mode is TelemetryMode.SHM:
+        return ShmReader(shm_name)
+    return DemoReader()
+
+
+def _session_path(record_path: str) -> str:
+    """A directory (existing or ending in a separator) gets a timestamped file."""
+    path = os.path.expanduser(record_path)
+    if path.endswith(os.sep) or os.path.isdir(path):
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(path, f"session_{timestamp}.icsn")
+    return path
@@ -0,0 +1,124 @@
+"""Running link statistics for telemetry readers.
+
+Every reader owns a :class:`ReaderStats` and reports each delivered frame
+(:meth:`ReaderStats.packet`) and each datagram it failed to decode
+(:meth:`ReaderStats.error`). Both are constant time, so they can run on the
+receive path. :meth:`ReaderStats.snapshot` is what ``reader.stats()``
+returns.
+
+Loss and reordering come from ``packet_id`` and are only counted for frames
+that carry one. Jitter is the RFC 3550 interarrival jitter: the smoothed
+change in transit time (local arrival minus the frame's ``received_time``
+stamp), so a constant clock offset between sender and receiver cancels out.
+"""
+
+import bisect
+import time
+from typing import Any, Dict, List, Optional
+
+from ..core.logger import Logger
+from .models import frame_seconds
+
+LOGGER = Logger("telemetry").get()
+
+# Upper bounds (ms) of the inter-arrival histogram; one overflow bucket follows.
+INTERARRIVAL_BOUNDS_MS = (0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0, 128.0)
+# packets_per_s is recomputed once per window.
+RATE_WINDOW_S = 1.0
+# An id jump larger than this is a sender restart, not loss or reordering.
+RESET_SPAN = 10_000
+# Decode errors are logged the first time and then every this many.
+ERROR_LOG_EVERY = 100
+
+
+class ReaderStats:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.packets = 0
+        self.decode_errors = 0
+        self.gaps = 0  # packet ids skipped over
+        self.out_of_order = 0  # ids at or below the newest id seen
+        self.resets = 0
+        self.jitter_ms = 0.0
+        self.packets_per_s = 0.0
+        self._hist: List[int] = [0] * (len(INTERARRIVAL_BOUNDS_MS) + 1)
+        self._last_id: Optional[int] = None
+        self._last_arrival = 0.0
+        self._last_transit: Optional[float] = None
+        self._rate_t0 = 0.0
+        self._rate_n = 0
+
+    def packet(self, frame: Any, arrival: Optional[float] = None) -> None:
+        """Count one delivered *frame* that arrived at *arrival* (epoch
+        seconds, default now). Readers that never see the arrival pass the
+        frame's own stamp; jitter is then zero by construction."""
+        now = time.time() if arrival is None else arrival
+        self.packets += 1
+
+        if self._last_arrival:
+            gap_ms = (now - self._last_arrival) * 1e3
+            self._hist[bisect.bisect_left(INTERARRIVAL_BOUNDS_MS, gap_ms)] += 1
+        self._last_arrival = now
+
+        stamp = getattr(frame, "received_time", 0) or 0
+        if stamp > 0:
+            transit = now - frame_seconds(stamp)
+            if self._last_transit is not None:
+                d_ms = abs(transit - self._last_transit) * 1e3
+                self.jitter_ms += (d_ms - self.jitter_ms) / 16.0
+            self._last_transit = transit
+
+        pid = getattr(frame, "packet_id", None)
+        if pid is not None:
+            last = self._last_id
+            if last is None or abs(pid - last) > RESET_SPAN:
+                if last is not None:
+                    self.resets += 1
+                self._last_id = pid
+            elif pid > last:
+                self.gaps += pid - last - 1
+                self._last_id = pid
+            else:
+                self.out_of_order += 1
+
+        self._rate_n += 1
+        elapsed = now - self._rate_t0
+        if elapsed >= RATE_WINDOW_S:
+            if self._rate_t0:
+                self.packets_per_s = self._rate_n / elapsed
+            self._rate_t0 = now
+            self._rate_n = 0
+
+    def error(self, exc: BaseException) -> None:
+        """Count a datagram that could not be decoded."""
+        self.decode_errors += 1
+        if self.decode_errors % ERROR_LOG_EVERY == 1:
+            LOGGER.warning(
+                f"{self.name}: decode error #{self.decode_errors}: {exc}"
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        rate = self.packets_per_s
+        if self._rate_t0 and time.time() - self._rate_t0 > 2 * RATE_WINDOW_S:
+            rate = 0.0  # went quiet: the last full window no longer applies
+        return {
+            "source": self.name,
+            "packets": self.packets,
+            "packets_per_s": rate,
+            "decode_errors": self.decode_errors,
+            "gaps": self.gaps,
+            "out_of_order": self.out_of_order,
+            # a late packet fills a gap it was counted in
+            "lost": max(0, self.gaps - self.out_of_order),
+            "resets": self.resets,
+            "jitter_ms": self.jitter_ms,
+            "interarrival_ms": dict(
+                zip([*map(str, INTERARRIVAL_BOUNDS_MS), "inf"], self._hist)
+            ),
+        }
+
+
+def reader_stats(reader: Any) -> Dict[str, Any]:
+    """``reader.stats()`` for readers that keep statistics, else ``{}``."""
+    stats = getattr(reader, "stats", None)
+    return stats() if callable(stats) else {}
@@ -0,0 +1,20 @@
+from .udp_jsonl import UdpJsonlReader
+from .wire import decode_frame
+
+
+class UdpBinaryReader(UdpJsonlReader):
+    """UDP reader for the fixed-layout binary frames defined in :mod:`.wire`.
+
+    Shares the socket, batching and shutdown logic of :class:`UdpJsonlReader`;
+    only the per-datagram decode differs. Fields are unpacked straight from
+    the receive buffer; the fixed layout is cheaper to unpack whole than
+    field by field, so :meth:`subscribe` has no effect here.
+    """
+
+    name = "udp_binary"
+
+    def _handle(self, data: memoryview) -> None:
+        try:
+            self._publish(decode_frame(data))
+        except Exception as e:
+            self._stats.error(e)
@@ -1,20 +1,79 @@
 import json
+import selectors
 import socket
 import threading
-import time
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from .models import TelemetryFrame
+from .models import (
+    Frame,
+    LazyFrame,
+    Subscription,
+    TelemetryFrame,
+    frame_seconds,
+    subscription,
+)
+from .ring import FrameRing
+from .stats import ReaderStats
+
+# Upper bound on datagrams handled per wake-up so a flood cannot starve stop().
+MAX_BATCH = 512
+# Safety net for select(); normal shutdown wakes the thread through a socketpair.
+IDLE_TIMEOUT_S = 0.5
+
+
+def decode_json(
+    data: memoryview | bytes, fields: Optional[Subscription] = None
+) -> Frame:
+    """Decode one JSON-lines datagram from the proxy.
+
+    With a *fields* :func:`~.models.subscription` only those fields are
+    validated now and the rest on access (a :class:`~.models.LazyFrame`;
+    :func:`~.models.as_model` turns either result into a model).
+    """
+    payload = json.loads(str(data, "utf-8"))
+    if fields is None:
+        return TelemetryFrame(**payload)
+    if not isinstance(payload, dict):
+        raise ValueError("telemetry payload is not an object")
+    return LazyFrame(payload, fields)
 
 
 class UdpJsonlReader:
-    def __init__(self, host: str = "127.0.0.1", port: int = 5600, bufsize: int = 4096):
+    # source name reported by stats()
+    name = "udp"
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 5600,
+        bufsize: int = 4096,
+        ring_capacity: int = 1024,
+    ):
         self.addr: Tuple[str, int] = (host, port)
         self.bufsize = bufsize
         self._sock: Optional[socket.socket] = None
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wake_r: Optional[socket.socket] = None
+        self._wake_w: Optional[socket.socket] = None
         self._thread: Optional[threading.Thread] = None
         self._running = False
-        self._latest: TelemetryFrame = TelemetryFrame(received_time=0, car_speed=0.0)
+        self._latest: Frame = TelemetryFrame(received_time=0, car_speed=0.0)
+        # every decoded frame, for consumers that want more than the newest one
+        self._ring = FrameRing(ring_capacity)
+        # datagrams are received into one preallocated buffer
+        self._buf = bytearray(bufsize)
+        self._view = memoryview(self._buf)
+        self._stats = ReaderStats(self.name)
+        # fields validated per datagram; None validates every field
+        self._fields: Optional[Subscription] = None
+
+        # batching counters (written by the reader thread only)
+        self.wakeups = 0
+        self.packets = 0
+        self.last_batch = 0
+        self.max_batch = 0
+        # batch size histogram: bucket k counts wake-ups with 2**(k-1) < n <= 2**k
+        self._batch_hist: List[int] = [0] * 10
 
     def start(self) -> None:
         if self._running:
@@ -22,33 +81,125 @@ class UdpJsonlReader:
         self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self._sock.bind(self.addr)  # receive-only on localhost
         self._sock.setblocking(False)
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._sock, selectors.EVENT_READ)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
         self._running = True
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
 
     def _run(self) -> None:
-        assert self._sock is not None
+        assert self._sock is not None and self._selector is not None
+        sock = self._sock
+        selector = self._selector
         while self._running:
             try:
-                data, _ = self._sock.recvfrom(self.bufsize)
-            except BlockingIOError:
-                time.sleep(0.002)
-                continue
+                events = selector.select(timeout=IDLE_TIMEOUT_S)
             except OSError:
                 break
+            if not self._running:
+                break
+            if not events:
+                continue
+            n = self._drain(sock)
+            if n < 0:
+                break
+            if n:
+                self._record_batch(n)
+
+    def _drain(self, sock: socket.socket) -> int:
+        """Receive every queued datagram; returns the count, or -1 on socket loss."""
+        buf = self._buf
+        view = self._view
+        n = 0
+        while n < MAX_BATCH:
             try:
-                obj = json.loads(data.decode("utf-8"))
-                self._latest = TelemetryFrame(**obj)
-            except Exception as e:
-                print(str(e))
+                nbytes = sock.recv_into(buf)
+            except BlockingIOError:
+                break
+            except OSError:
+                return -1
+            n += 1
+            self._handle(view[:nbytes])
+        return n
+
+    def _handle(self, data: memoryview) -> None:
+        """Decode one datagram; *data* is only valid until the next receive."""
+        try:
+            self._publish(decode_json(data, self._fields))
+        except Exception as e:
+            self._stats.error(e)
+
+    def subscribe(self, fields: Iterable[str]) -> None:
+        """Validate only *fields* on receipt; other fields on first access."""
+        self._fields = subscription(fields)
+
+    def _publish(self, frame: Frame) -> None:
+        self._stats.packet(frame)
+        self._ring.push(frame)
+        self._latest = frame
+
+    def _record_batch(self, n: int) -> None:
+        self.wakeups += 1
+        self.packets += n
+        self.last_batch = n
+        if n > self.max_batch:
+            self.max_batch = n
+        self._batch_hist[min(len(self._batch_hist) - 1, (n - 1).bit_length())] += 1
 
-    def latest(self) -> TelemetryFrame:
+    def batch_stats(self) -> Dict[str, object]:
+        """Packets handled per wake-up of the reader thread."""
+        return {
+            "wakeups": self.wakeups,
+            "packets": self.packets,
+            "last_batch": self.last_batch,
+            "max_batch": self.max_batch,
+            "mean_batch": self.packets / self.wakeups if self.wakeups else 0.0,
+            "batch_hist": list(self._batch_hist),
+        }
+
+    def stats(self) -> Dict[str, object]:
+        """Link statistics plus ring and batching counters."""
+        return {
+            **self._stats.snapshot(),
+            "ring": self._ring.stats(),
+            "batch": self.batch_stats(),
+        }
+
+    def latest(self) -> Frame:
         return self._latest
 
+    def since(self, seq: int) -> Tuple[List[Frame], int]:
+        return self._ring.since(seq)
+
+    def head(self) -> int:
+        """Sequence number of the newest frame, without side effects."""
+        return self._ring.seq
+
+    def latest_received_time(self) -> float:
+        """Receive time (s) of the newest frame, 0.0 before the first one."""
+        return frame_seconds(self._latest.received_time)
+
     def stop(self) -> None:
         self._running = False
         try:
-            if self._sock:
-                self._sock.close()
+            if self._wake_w:
+                self._wake_w.send(b"\0")
+        except OSError:
+            pass
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        try:
+            if self._selector:
+                self._selector.close()
+            for s in (self._sock, self._wake_r, self._wake_w):
+                if s:
+                    s.close()
         finally:
+            self._selector = None
             self._sock = None
+            self._wake_r = None
+            self._wake_w = None
@@ -0,0 +1,152 @@
+"""Fixed-layout binary telemetry frames.
+
+One datagram carries one frame. Every frame starts with a 4-byte magic and a
+version byte so the layout can evolve; decoders dispatch on the version.
+
+Version 2 layout (little-endian, 48 bytes)::
+
+    offset  type  field
+    0       4s    magic (b"ICTF")
+    4       B     version (2)
+    5       B     flags (bit 0: lap_count present)
+    6       H     reserved
+    8       I     packet_id
+    12      d     received_time
+    20      f     car_speed
+    24      f     engine_rpm
+    28      f     throttle
+    32      f     brake
+    36      f     steering
+    40      h     current_gear
+    42      h     lap_count
+    44      I     car_id
+
+Version 1 is the same layout with the last word reserved (zero); its frames
+decode as car 0.
+"""
+
+import struct
+from typing import Any, Mapping, Union
+
+from .models import Frame, TelemetryFrame, trusted_frame
+
+MAGIC = b"ICTF"
+VERSION = 2
+
+FLAG_LAP_COUNT = 0x01
+
+HEADER = struct.Struct("<4sB")
+FRAME_V2 = struct.Struct("<4sBBHIdfffffhhI")
+# version 1 only differs in the meaning of the last word
+FRAME_V1 = FRAME_V2
+
+FrameLike = Union[Frame, Mapping[str, Any]]
+
+
+def _get(frame: FrameLike, name: str, default: Any) -> Any:
+    if isinstance(frame, Mapping):
+        value = frame.get(name, default)
+    else:
+        value = getattr(frame, name, default)
+    return default if value is None else value
+
+
+def encode_into(
+    buf: Union[bytearray, memoryview], offset: int, frame: FrameLike, packet_id: int = 0
+) -> int:
+    """Pack *frame* into *buf* at *offset*; returns the number of bytes written."""
+    lap_count = _get(frame, "lap_count", None)
+    flags = 0 if lap_count is None else FLAG_LAP_COUNT
+    FRAME_V2.pack_into(
+        buf,
+        offset,
+        MAGIC,
+        VERSION,
+        flags,
+        0,
+        int(packet_id) & 0xFFFFFFFF,
+        float(_get(frame, "received_time", 0.0)),
+        float(_get(frame, "car_speed", 0.0)),
+        float(_get(frame, "engine_rpm", 0)),
+        float(_get(frame, "throttle", 0.0)),
+        float(_get(frame, "brake", 0.0)),
+        float(_get(frame, "steering", 0.0)),
+        int(_get(frame, "current_gear", 0)),
+        int(lap_count or 0),
+        int(_get(frame, "car_id", 0)) & 0xFFFFFFFF,
+    )
+    return FRAME_V2.size
+
+
+def encode_frame(frame: FrameLike, packet_id: int = 0) -> bytes:
+    """Encode a frame (model or proxy-side dict) as a current-version datagram."""
+    buf = bytearray(FRAME_V2.size)
+    encode_into(buf, 0, frame, packet_id)
+    return bytes(buf)
+
+
+def _decode_v1(buf: Union[bytes, memoryview], offset: int) -> TelemetryFrame:
+    return _decode_fixed(buf, offset, has_car_id=False)
+
+
+def _decode_v2(buf: Union[bytes, memoryview], offset: int) -> TelemetryFrame:
+    return _decode_fixed(buf, offset, has_car_id=True)
+
+
+def _decode_fixed(
+    buf: Union[bytes, memoryview], offset: int, has_car_id: bool
+) -> TelemetryFrame:
+    (
+        _,
+        _,
+        flags,
+        _,
+        packet_id,
+        received_time,
+        car_speed,
+        engine_rpm,
+        throttle,
+        brake,
+        steering,
+        current_gear,
+        lap_count,
+        car_id,
+    ) = FRAME_V2.unpack_from(buf, offset)
+    # Values come from a typed layout, so pydantic validation is skipped.
+    return trusted_frame(
+        {
+            "received_time": received_time,
+            "car_speed": car_speed,
+            "engine_rpm": int(engine_rpm),
+            "current_gear": current_gear,
+            "throttle": throttle,
+            "brake": brake,
+            "steering": steering,
+            "lap_count": lap_count if flags & FLAG_LAP_COUNT else None,
+            "packet_id": packet_id,
+            "car_id": car_id if has_car_id else 0,
+        }
+    )
+
+
+_DECODERS = {1: (FRAME_V1.size, _decode_v1), 2: (FRAME_V2.size, _decode_v2)}
+
+
+def decode_frame(buf: Union[bytes, memoryview], offset: int = 0) -> TelemetryFrame:
+    """Decode one frame straight from *buf* without copying it.
+
+    Raises ``ValueError`` for foreign datagrams, unknown versions and short
+    buffers.
+    """
+    if len(buf) - offset < HEADER.size:
+        raise ValueError("short telemetry frame")
+    magic, version = HEADER.unpack_from(buf, offset)
+    if magic != MAGIC:
+        raise ValueError("not a telemetry frame")
+    try:
+        size, decoder = _DECODERS[version]
+    except KeyError:
+        raise ValueError(f"unsupported telemetry frame version {version}") from None
+    if len(buf) - offset < size:
+        raise ValueError("short telemetry frame")
+    return decoder(buf, offset)
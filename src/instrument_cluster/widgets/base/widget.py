@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Tuple
+from typing import Any, Callable, FrozenSet, Sequence, Tuple
 
 from ...telemetry.models import TelemetryFrame
 
@@ -14,6 +14,9 @@ class Widget(ABC):
     ``Packet``) in :meth:`update` to remain decoupled from higher-level state.
     """
 
+    #: Telemetry fields the widget reads from the model (see :meth:`fields`).
+    FIELDS: FrozenSet[str] = frozenset()
+
     def enter(self) -> None:
         """Called when the widget becomes active/visible.
 
@@ -55,6 +58,35 @@ class Widget(ABC):
         """
         return False
 
+    def fields(self) -> FrozenSet[str]:
+        """Names of the telemetry fields this widget reads.
+
+        Readers validate only the subscribed fields of each frame up front and
+        the rest when first accessed, so an undeclared field still works, it
+        is just decoded later. Defaults to :attr:`FIELDS`.
+
+        Returns
+        -------
+        FrozenSet[str]
+            Attribute names read from the model in :meth:`ingest`/:meth:`update`.
+        """
+        return self.FIELDS
+
+    def ingest(self, frames: Sequence[TelemetryFrame]) -> None:
+        """Consume every frame received since the previous render tick.
+
+        Called once per tick, before :meth:`update`, with the frames in arrival
+        order (the last one is the *model* passed to :meth:`update`). Widgets
+        that learn from or integrate over telemetry override this to see
+        full-rate data; purely visual widgets ignore it.
+
+        Parameters
+        ----------
+        frames : Sequence[TelemetryFrame]
+            New frames, oldest first. Never empty.
+        """
+        pass
+
     @abstractmethod
     def update(self, model: TelemetryFrame, dt: float) -> None:
         """Advance internal state for the current frame.
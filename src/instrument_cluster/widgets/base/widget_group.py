@@ -1,4 +1,4 @@
-from typing import Any, Iterable, List
+from typing import Any, FrozenSet, Iterable, List, Sequence
 
 from ...widgets.base.widget import Widget
 
@@ -63,6 +63,15 @@ class WidgetGroup(Widget):
                 return True
         return False
 
+    def fields(self) -> FrozenSet[str]:
+        """Union of the fields all children read."""
+        return frozenset().union(*(w.fields() for w in self.children))
+
+    def ingest(self, frames: Sequence[Any]) -> None:
+        """Forward the tick's batch of new frames to all children in order."""
+        for w in self.children:
+            w.ingest(frames)
+
     def update(self, model: Any, dt: float) -> None:
         """Advance all children one frame using the shared *model* and *dt*."""
         for w in self.children:
@@ -9,6 +9,8 @@ from ..widgets.base.widget import Anchor, Widget
 class GearLabel(Widget):
     """Gear indicator implemented via composition: owns a Label internally."""
 
+    FIELDS = frozenset({"current_gear"})
+
     def __init__(self, anchor: Anchor) -> None:
         self._label = Label(
             text="0",
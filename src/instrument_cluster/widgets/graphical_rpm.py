@@ -11,6 +11,8 @@ from ..widgets.base.widget import Widget
 
 
 class GraphicalRPM(Widget):
+    FIELDS = frozenset({"engine_rpm", "rpm_alert"})
+
     def __init__(
         self,
         alert_min,
@@ -1,11 +1,11 @@
-from typing import Any, Callable, Optional, Tuple
+from typing import Any, Callable, Optional, Sequence, Tuple
 
 import numpy as np
 import pygame
 from scipy.spatial import cKDTree as KDTree
 
 from ..core.utils import FontFamily, load_font
-from ..telemetry.models import TelemetryFrame
+from ..telemetry.models import MAX_FRAME_DT_S, TelemetryFrame, frame_seconds
 from ..widgets.base.colors import Color
 from ..widgets.base.label import Label
 from ..widgets.base.widget import Widget
@@ -34,6 +34,8 @@ class EstimatedLap(Widget):
       to a grid to keep the KD-tree compact.
     """
 
+    FIELDS = frozenset({"received_time", "lap_count", "flags", "position"})
+
     def __init__(
         self,
         anchor: Anchor,
@@ -106,6 +108,10 @@ class EstimatedLap(Widget):
         self._kdtree = None  # cKDTree
         self._kd_leafsize = int(kd_leafsize)
 
+        # full-rate timing: frames fed via ingest() carry their own timing
+        self._ingested = False
+        self._last_frame_t: float | None = None
+
     def enter(self) -> None:
         if self._fixed_size:
             self._box_size = tuple(map(int, self._fixed_size))
@@ -135,10 +141,57 @@ class EstimatedLap(Widget):
     def handle_event(self, event) -> bool:
         return False
 
+    def ingest(self, frames: Sequence[TelemetryFrame]) -> None:
+        """Advance timing and position sampling with every received frame."""
+        for frame in frames:
+            t = frame_seconds(frame.received_time)
+            dt = 0.0
+            if self._last_frame_t is not None:
+                dt = t - self._last_frame_t
+                if not (0.0 < dt <= MAX_FRAME_DT_S):
+                    dt = 0.0
+            self._last_frame_t = t
+            self._advance(frame, dt)
+        self._ingested = True
+
     def update(self, packet: TelemetryFrame, dt: float | None = None) -> None:
         """Advance timing & display delta/elapsed."""
         dt = float(dt or 0.0)
 
+        # Timing already advanced per frame in ingest(); otherwise use the tick
+        if not self._ingested:
+            self._advance(packet, dt)
+        self._ingested = False
+        if self._lap_index <= 0:
+            return
+
+        # choose display mode
+        if self._has_reference() and self._lap_index >= 2:
+            # delta vs nearest best-lap checkpoint
+            pos = getattr(packet, "position", None)
+            if pos is not None:
+                qx, qz = self._quantize(pos.x, pos.z)
+                delta = self._delta_vs_best((qx, qz))
+            else:
+                delta = None
+
+            if delta is None:
+                # fallback: show elapsed
+                self._label.set_text(_format_mmss_hh(self._lap_time_s))
+                self._label.color = self._color_idle
+            else:
+                shown = self._round_tenths_stable(delta, dt)
+                faster = shown < 0.0
+                text = f"-{abs(shown):.1f}" if faster else f"{shown:.1f}"
+                self._label.set_text(text)
+                self._label.color = self._color_faster if faster else self._color_slower
+        else:
+            # show elapsed time until we have a best reference
+            self._label.set_text(_format_mmss_hh(self._lap_time_s))
+            self._label.color = self._color_idle
+
+    def _advance(self, packet: TelemetryFrame, dt: float) -> None:
+        """Lap bookkeeping, running time and position sampling for one step."""
         flags = getattr(packet, "flags", None)
         paused = bool(getattr(flags, "paused", False))
         loading = bool(getattr(flags, "loading_or_processing", False))
@@ -177,31 +230,6 @@ class EstimatedLap(Widget):
                 # keep the earliest time for a given cell (better for NN matching)
                 self._track_positions.setdefault((qx, qz), self._lap_time_s)
 
-        # choose display mode
-        if self._has_reference() and self._lap_index >= 2:
-            # delta vs nearest best-lap checkpoint
-            pos = getattr(packet, "position", None)
-            if pos is not None:
-                qx, qz = self._quantize(pos.x, pos.z)
-                delta = self._delta_vs_best((qx, qz))
-            else:
-                delta = None
-
-            if delta is None:
-                # fallback: show elapsed
-                self._label.set_text(_format_mmss_hh(self._lap_time_s))
-                self._label.color = self._color_idle
-            else:
-                shown = self._round_tenths_stable(delta, dt)
-                faster = shown < 0.0
-                text = f"-{abs(shown):.1f}" if faster else f"{shown:.1f}"
-                self._label.set_text(text)
-                self._label.color = self._color_faster if faster else self._color_slower
-        else:
-            # show elapsed time until we have a best reference
-            self._label.set_text(_format_mmss_hh(self._lap_time_s))
-            self._label.color = self._color_idle
-
     def get_size(self) -> Tuple[int, int]:
         if self._box_size is None:
             self.enter()
@@ -1,7 +1,10 @@
-import math
-from typing import Any, List, Optional, Protocol, Tuple
+import time
+from typing import Any, List, Optional, Protocol, Sequence, Tuple
 
-from ..core.ecu import ECU
+import numpy as np
+
+from ..core.ecu import READY_COVERAGE, PlotData
+from ..core.ecu_service import ECUService
 from ..core.utils import FontFamily, load_font
 from ..telemetry.models import TelemetryFrame
 from ..widgets.base.colors import Color
@@ -10,6 +13,10 @@ from ..widgets.base.widget import Anchor, Widget
 
 FLASH_PERIOD_S = 0.12
 SHIFT_HYST_RPM = 120.0
+# The ECU readout label is re-rendered at most this often.
+LABEL_REFRESH_S = 0.25
+# Newest scatter samples drawn per gear.
+SCATTER_POINTS = 400
 
 
 class BlinktIface(Protocol):
@@ -103,6 +110,23 @@ def make_blinkt() -> BlinktIface:
 class ShiftLights(Widget):
     """Shift-light widget with ECU learning, target flash, and live per-gear scatter plot."""
 
+    # what the widget and its ECU read from every frame
+    FIELDS = frozenset(
+        {
+            "received_time",
+            "car_id",
+            "car_speed",
+            "engine_rpm",
+            "current_gear",
+            "throttle",
+            "brake",
+            "clutch",
+            "rpm_alert",
+            "gear_ratios",
+            "wheels",
+        }
+    )
+
     def __init__(
         self,
         anchor: Anchor,
@@ -116,9 +140,12 @@ class ShiftLights(Widget):
             pos=(0, 0),
             center=True,
         )
+        self._label_timer = LABEL_REFRESH_S
         self._anchor = anchor
 
-        self._ecu = ECU()
+        # learning runs on the service's worker thread; we read snapshots
+        self._ecu = ECUService()
+        self._ingested = False
 
         # LED device
         self._blinkt: BlinktIface = make_blinkt()
@@ -147,14 +174,22 @@ class ShiftLights(Widget):
 
         # plot data
         self._show_plot = True
-        self._scatter_points: List[Tuple[float, float, float]] = []  # (rpm, proxy, age)
-        self._plot_bounds: Tuple[float, float, float] = (800.0, 12000.0, 1.0)
-        self._curve_series: List[Tuple[float, float]] = []
+        self._plot = PlotData()
+        # projected into the plot box; redone when the data version or box changes
+        self._plot_key: Optional[Tuple[Any, ...]] = None
+        self._curve_px: List[Tuple[int, int]] = []
+        self._scatter_px: Tuple[np.ndarray, np.ndarray, np.ndarray] = (
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0),
+        )
+        self._scatter_layer: Any = None
 
     def enter(self) -> None:
-        pass
+        self._ecu.start()
 
     def exit(self) -> None:
+        self._ecu.stop()
         try:
             self._blinkt.clear()
             self._blinkt.show()
@@ -173,16 +208,23 @@ class ShiftLights(Widget):
             pass
         return False
 
+    def ingest(self, frames: Sequence[TelemetryFrame]) -> None:
+        # Learn from every received frame, timed by its receive stamp
+        self._ecu.submit_frames(frames)
+        self._ingested = True
+
     def update(self, model: TelemetryFrame, dt: float | None = None) -> None:
-        # Update ECU learning/state
-        self._ecu.update(model, dt)
+        # Queue for ECU learning (already queued per frame if ingested)
+        if not self._ingested:
+            self._ecu.submit(model, dt)
+        self._ingested = False
 
         self._rpm = float(getattr(model, "engine_rpm", 0.0))
         self._gear = int(getattr(model, "current_gear", 0))
         up, dn, info = self._ecu.get_shift_targets(model)
         self._up_target = up
         self._down_target = dn
-        self._ready = info.get("coverage", 0.0) >= 0.55
+        self._ready = info.get("coverage", 0.0) >= READY_COVERAGE
 
         # Progress vs upshift target
         frac = self._ecu.progress_fraction(self._rpm, self._up_target)
@@ -211,14 +253,15 @@ class ShiftLights(Widget):
         except Exception:
             pass
 
-        # Screen label
-        label_txt = self._format_label(info)
-        self._label.set_text(label_txt)
+        # Screen label (debug readout; formatting it is not free)
+        self._label_timer += dt or 0.0
+        if self._label_timer >= LABEL_REFRESH_S:
+            self._label_timer = 0.0
+            self._label.set_text(self._format_label(info))
 
         # Fetch live scatter for current gear
-        self._scatter_points, self._plot_bounds, self._curve_series = (
-            self._ecu.get_plot_data(model, self._gear)
-        )
+        if self._show_plot:
+            self._plot = self._ecu.get_plot_data(model, self._gear)
 
     def draw(self, surface: Any) -> None:
         # LED bar visualization (for when no hardware)
@@ -355,46 +398,52 @@ class ShiftLights(Widget):
         inner = box.inflate(-2 * pad, -2 * pad)
         pygame.draw.rect(surface, (30, 30, 38), inner, border_radius=8)
 
-        rpm_min, rpm_max, y_max = self._plot_bounds
-        xr = max(1.0, rpm_max - rpm_min)
+        plot = self._plot
+        key = (plot.version, plot.bounds, inner.size)
+        if key != self._plot_key:
+            self._plot_key = key
+            self._project(plot, inner.width, inner.height)
 
         # Curve (learned)
-        if self._curve_series:
-            pts = []
-            for r, t in self._curve_series:
-                sx = (r - rpm_min) / xr
-                sx = 0.0 if sx < 0 else (1.0 if sx > 1 else sx)
-                sy = 1.0 - min(1.0, t / y_max)
-                px = inner.left + int(sx * inner.width)
-                py = inner.top + int(sy * inner.height)
-                pts.append((px, py))
-            if len(pts) >= 2:
-                import pygame
-
-                pygame.draw.lines(surface, (120, 180, 255), False, pts, 2)
+        if len(self._curve_px) >= 2:
+            pts = [(inner.left + px, inner.top + py) for px, py in self._curve_px]
+            pygame.draw.lines(surface, (120, 180, 255), False, pts, 2)
 
         # Scatter for current gear (fade with age)
-        if self._scatter_points:
-            import pygame
-
-            lay = pygame.Surface((inner.width, inner.height), pygame.SRCALPHA)
-            for r, p, age in self._scatter_points[-400:]:
-                sx = (r - rpm_min) / xr
-                if sx < 0 or sx > 1:
-                    continue
-                sy = 1.0 - min(1.0, p / y_max)
-                px = int(sx * inner.width)
-                py = int(sy * inner.height)
-                fade = max(0.25, min(1.0, math.exp(-age / 8.0)))  # ~8s half-life
-                col = (
-                    int(255 * fade),
-                    int(220 * fade),
-                    int(80 * fade),
-                    int(200 * fade),
-                )
-                pygame.draw.circle(lay, col, (px, py), 2)
+        px, py, stamp = self._scatter_px
+        if len(px):
+            lay = self._scatter_layer
+            if lay is None or lay.get_size() != inner.size:
+                lay = self._scatter_layer = pygame.Surface(inner.size, pygame.SRCALPHA)
+            lay.fill((0, 0, 0, 0))
+            age = np.maximum(0.0, time.time() - stamp)
+            fade = np.clip(np.exp(-age / 8.0), 0.25, 1.0)  # ~8s half-life
+            rgba = (fade[:, None] * (255, 220, 80, 200)).astype(np.int64)
+            for x_, y_, col in zip(px.tolist(), py.tolist(), rgba.tolist()):
+                pygame.draw.circle(lay, col, (x_, y_), 2)
             surface.blit(lay, (inner.left, inner.top))
 
+    def _project(self, plot: PlotData, w: int, h: int) -> None:
+        """Map the plot data to pixel offsets inside a ``w`` x ``h`` box."""
+        rpm_min, rpm_max, y_max = plot.bounds
+        xr = max(1.0, rpm_max - rpm_min)
+
+        sx = np.clip((plot.curve_rpm - rpm_min) / xr, 0.0, 1.0)
+        sy = 1.0 - np.minimum(1.0, plot.curve_torque / y_max)
+        self._curve_px = list(
+            zip((sx * w).astype(np.int64).tolist(), (sy * h).astype(np.int64).tolist())
+        )
+
+        samples = plot.samples
+        sx = (samples.rpm[-SCATTER_POINTS:] - rpm_min) / xr
+        keep = (sx >= 0.0) & (sx <= 1.0)
+        sy = 1.0 - np.minimum(1.0, samples.proxy[-SCATTER_POINTS:][keep] / y_max)
+        self._scatter_px = (
+            (sx[keep] * w).astype(np.int64),
+            (sy * h).astype(np.int64),
+            samples.stamp[-SCATTER_POINTS:][keep],
+        )
+
     def _format_label(self, info: dict) -> str:
         cov = info.get("coverage", 0.0)
         red = int(info.get("redline", 0.0) or 0)
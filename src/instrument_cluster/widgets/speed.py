@@ -10,6 +10,8 @@ from ..widgets.base.widget import Anchor, Widget
 class SpeedLabel(Widget):
     """Speed indicator"""
 
+    FIELDS = frozenset({"car_speed"})
+
     def __init__(self, anchor: Anchor) -> None:
         """Create the speed label
 
@@ -0,0 +1,64 @@
+from typing import Any, Callable, Dict
+
+from ..core.utils import FontFamily, load_font
+from ..telemetry.models import TelemetryFrame
+from ..widgets.base.colors import Color
+from ..widgets.base.label import Label
+from ..widgets.base.widget import Anchor, Widget
+
+# Text is re-rendered at most this often; the counters change every frame.
+REFRESH_S = 0.5
+
+
+class StatsOverlay(Widget):
+    """Telemetry link statistics (rate, loss, reordering, jitter)"""
+
+    def __init__(self, anchor: Anchor, stats: Callable[[], Dict[str, Any]]) -> None:
+        """Create the overlay
+
+        Parameters
+        anchor : Anchor
+            Function mapping ``(width, height)`` -> top-left of the first line.
+        stats : Callable[[], Dict[str, Any]]
+            Returns the current statistics, e.g. ``TelemetrySource.stats``.
+        """
+        self._anchor = anchor
+        self._stats = stats
+        font = load_font(size=26, dir="pixeltype", name=FontFamily.PIXEL_TYPE)
+        self._lines = [
+            Label(text="", font=font, color=Color.LIGHT_GREY.rgb(), center=False)
+            for _ in range(3)
+        ]
+        self._elapsed = REFRESH_S
+
+    def handle_event(self, event: Any) -> bool:
+        """Never consumes events"""
+        return False
+
+    def update(self, model: TelemetryFrame, dt: float | None = None) -> None:
+        self._elapsed += dt or 0.0
+        if self._elapsed < REFRESH_S:
+            return
+        self._elapsed = 0.0
+        s = self._stats()
+        if not s:
+            return
+        self._lines[0].set_text(
+            f"{s.get('source', '?')} {s.get('packets_per_s', 0.0):.0f} pkt/s"
+            f"  err {s.get('decode_errors', 0)}"
+        )
+        self._lines[1].set_text(
+            f"lost {s.get('lost', 0)}  ooo {s.get('out_of_order', 0)}"
+            f"  jitter {s.get('jitter_ms', 0.0):.1f} ms"
+        )
+        hist = s.get("interarrival_ms", {})
+        self._lines[2].set_text(
+            "gap ms " + " ".join(f"{k}:{v}" for k, v in hist.items() if v)
+        )
+
+    def draw(self, surface: Any) -> None:
+        x, y = self._anchor(surface.get_size())
+        for line in self._lines:
+            line.rect.topleft = (x, y)
+            line.draw(surface)
+            y += line.rect.height
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from instrument_cluster.core.ecu import ECU, CarModel
+
+RATIOS = [3.5, 2.4, 1.8, 1.4, 1.1, 0.9]
+N = 6000
+BATCH = 256
+
+
+@pytest.fixture
+def columns():
+    rng = np.random.default_rng(1)
+    throttle = np.where(rng.random(N) < 0.8, 1.0, rng.random(N))
+    # raw 0..255 and out-of-range throttle, as some feeds send
+    throttle[::97] = 100.0
+    throttle[::101] = 300.0 + rng.random(len(throttle[::101])) * 10.0
+    dt = np.full(N, 1 / 60)
+    dt[::500] = np.nan
+    return {
+        "rpm": rng.uniform(900, 12500, N).round(),
+        "gear": rng.integers(0, 8, N),
+        "throttle": throttle,
+        "brake": np.where(rng.random(N) < 0.95, 0.0, 0.5),
+        "speed": np.cumsum(rng.normal(0.02, 0.05, N)) + 10.0,
+        "dt": dt,
+    }
+
+
+def _ecu(tmp_path, name):
+    ecu = ECU(str(tmp_path / name), autosave=False)
+    ecu._install(CarModel(car_id=1, gear_ratios=list(RATIOS)))
+    return ecu
+
+
+def test_update_batch_matches_update(tmp_path, columns):
+    scalar, batch = _ecu(tmp_path, "scalar"), _ecu(tmp_path, "batch")
+    c = columns
+    frame = SimpleNamespace(car_id=1)
+    for i in range(N):
+        frame.car_speed = c["speed"][i]
+        frame.engine_rpm = c["rpm"][i]
+        frame.current_gear = int(c["gear"][i])
+        frame.throttle = c["throttle"][i]
+        frame.brake = c["brake"][i]
+        dt = c["dt"][i]
+        scalar.update(frame, None if np.isnan(dt) else dt)
+    for s in range(0, N, BATCH):
+        sl = slice(s, s + BATCH)
+        batch.update_batch(
+            1, c["rpm"][sl], c["gear"][sl], c["throttle"][sl], c["brake"][sl],
+            c["speed"][sl], c["dt"][sl],
+        )
+
+    assert scalar._dbg == batch._dbg
+    assert scalar._dbg["ok"] > 0
+    a, b = scalar.models[1], batch.models[1]
+    np.testing.assert_array_equal(a.curve.counts, b.curve.counts)
+    np.testing.assert_allclose(a.curve.means, b.curve.means, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(a.curve.m2, b.curve.m2, rtol=1e-6, atol=1e-9)
+    np.testing.assert_array_equal(a.curve.confident, b.curve.confident)
+    assert a.shift_up_rpm == pytest.approx(b.shift_up_rpm)
+    assert a.shift_down_rpm == pytest.approx(b.shift_down_rpm)
+    assert scalar._thr_seen_max == batch._thr_seen_max
+    assert {g: len(r) for g, r in a.recent_by_gear.items()} == {
+        g: len(r) for g, r in b.recent_by_gear.items()
+    }
+    scalar.close()
+    batch.close()
@@ -0,0 +1,36 @@
+import numpy as np
+
+from instrument_cluster.core.ecu import MIN_BIN_SAMPLES, DynoCurve
+
+
+def test_a_close_noisy_pair_is_not_confident():
+    # two samples that happen to agree, from a bin whose samples scatter widely
+    rng = np.random.default_rng(3)
+    scatter = rng.normal(2.0, 1.0, 50)
+    curve = DynoCurve()
+    i = curve.idx(5000.0)
+    curve.add_sample(5000.0, 2.00)
+    curve.add_sample(5000.0, 2.01)
+    assert not curve.confident[i]
+    assert curve.covered == 0
+
+    for x in scatter[: MIN_BIN_SAMPLES - 2]:
+        curve.add_sample(5000.0, float(x))
+    assert curve.counts[i] == MIN_BIN_SAMPLES
+    assert not curve.confident[i]
+
+
+def test_consistent_samples_make_a_bin_confident():
+    curve = DynoCurve()
+    i = curve.idx(5000.0)
+    for k in range(MIN_BIN_SAMPLES):
+        assert not curve.confident[i]
+        curve.add_sample(5000.0, 2.0 + 0.01 * k)
+    assert curve.confident[i]
+    assert curve.covered == 1
+
+    batch = DynoCurve()
+    batch.add_samples(
+        np.full(MIN_BIN_SAMPLES, 5000.0), 2.0 + 0.01 * np.arange(MIN_BIN_SAMPLES)
+    )
+    np.testing.assert_array_equal(batch.confident, curve.confident)
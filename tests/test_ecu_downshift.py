@@ -0,0 +1,53 @@
+import time
+
+import numpy as np
+
+from instrument_cluster.core.ecu import ECU, CarModel
+
+RATIOS = [4.0, 2.9, 2.2, 1.75, 1.42, 1.18, 1.0, 0.86]
+BIN = 100.0
+
+
+def _model(tmp_path, redline=8000.0):
+    ecu = ECU(str(tmp_path), autosave=False)
+    model = ecu._install(
+        CarModel(car_id=1, gear_ratios=list(RATIOS), redline_rpm=redline)
+    )
+    rpm = np.repeat(np.arange(1000.0, 8500.0, BIN) + BIN / 2, 6)
+    model.curve.add_samples(rpm, 1.0 - ((rpm - 5500.0) / 5000.0) ** 2)
+    return ecu, model
+
+
+def test_every_gear_above_first_gets_a_downshift_target(tmp_path):
+    ecu, model = _model(tmp_path)
+    ecu._recompute_targets(model)
+    assert sorted(model.shift_down_rpm) == list(range(2, len(RATIOS) + 1))
+    for gear, rpm in model.shift_down_rpm.items():
+        assert 1000.0 <= rpm <= model.redline_rpm
+        assert rpm < model.shift_up_rpm[gear - 1]
+    ecu.close()
+
+
+def test_downshift_lands_where_the_upshift_left(tmp_path):
+    # on one curve both targets are the crossover of the two gears' wheel
+    # torque, seen from either side: no hunting between them
+    ecu, model = _model(tmp_path)
+    ecu._recompute_targets(model)
+    for g in range(1, len(RATIOS)):
+        k = RATIOS[g] / RATIOS[g - 1]
+        landed = model.shift_down_rpm[g + 1] / k
+        assert abs(landed - model.shift_up_rpm[g]) <= 1.5 * BIN
+    ecu.close()
+
+
+def test_recompute_is_fast_for_eight_speeds(tmp_path):
+    ecu, model = _model(tmp_path)
+    ecu._recompute_targets(model)
+    best = float("inf")
+    for _ in range(20):
+        t = time.perf_counter()
+        ecu._recompute_targets(model)
+        best = min(best, time.perf_counter() - t)
+    # the budget is 1 ms; leave room for slow CI machines
+    assert best < 5e-3
+    ecu.close()
@@ -0,0 +1,148 @@
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import instrument_cluster
+from instrument_cluster.core.ecu import (
+    ECU,
+    JOURNAL_FILE,
+    JOURNAL_SYNC_S,
+    CarModel,
+)
+from instrument_cluster.core.ecu_service import ECUService
+from instrument_cluster.core.ecu_store import BLOCK, BLOCK_MAGIC, SampleJournal
+from instrument_cluster.telemetry.bench import simulate_pulls
+
+WHEEL_RADIUS = 0.33
+
+# Learns two cars, saves car 1 halfway, syncs the journal and dies without
+# closing the ECU (no final save, no journal compaction).
+CRASHING_SESSION = """
+import os, sys
+from instrument_cluster.core.ecu import ECU
+from test_ecu_journal import feed
+
+ecu = ECU(sys.argv[1])
+for car in (1, 2):
+    ecu._install(ecu._load_model(car))
+feed(ecu, 1, 0, 0.5)
+ecu._save_model(ecu.models[1])
+ecu._writer.flush()
+feed(ecu, 1, 0.5, 1.0)
+feed(ecu, 2, 0.0, 1.0)
+ecu._journal.sync()
+os._exit(0)
+"""
+
+
+def feed(ecu, car_id, start, stop):
+    """Feed the fraction *start*..*stop* of the simulated session."""
+    cols = simulate_pulls(30, 0.05, 0.002)
+    n = len(cols["rpm"])
+    for s in range(int(start * n), int(stop * n), 300):
+        sl = slice(s, min(int(stop * n), s + 300))
+        ecu.update_batch(
+            car_id, cols["rpm"][sl], cols["gear"][sl], cols["throttle"][sl],
+            cols["brake"][sl], cols["speed"][sl], cols["dt"][sl],
+            wheel_radius=WHEEL_RADIUS,
+        )
+
+
+def test_journal_replays_samples_after_crash(tmp_path):
+    storage = str(tmp_path / "ecu")
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [
+            os.path.dirname(list(instrument_cluster.__path__)[0]),
+            os.path.dirname(__file__),
+        ]
+    )
+    subprocess.run(
+        [sys.executable, "-c", CRASHING_SESSION, storage], env=env, check=True
+    )
+
+    # the same session, uninterrupted
+    reference = ECU(str(tmp_path / "reference"), autosave=False)
+    for car in (1, 2):
+        reference._install(CarModel(car_id=car))
+    feed(reference, 1, 0.0, 1.0)
+    feed(reference, 2, 0.0, 1.0)
+
+    ecu = ECU(storage)
+    for car in (1, 2):
+        model = ecu._load_model(car)
+        expected = reference.models[car]
+        assert model.curve.counts.sum() > 0
+        np.testing.assert_array_equal(model.curve.counts, expected.curve.counts)
+        np.testing.assert_allclose(
+            model.curve.means, expected.curve.means, rtol=1e-9, atol=1e-12
+        )
+        ecu._install(model)
+    learned = ecu.models[1].curve.counts.copy()
+    ecu.close()
+    reference.close()
+
+    # closing saved the replayed samples and emptied the journal
+    ecu = ECU(storage)
+    np.testing.assert_array_equal(ecu._load_model(1).curve.counts, learned)
+    assert ecu._journal.car_ids() == []
+    ecu.close()
+
+
+def test_sample_journal_truncates_torn_tail(tmp_path):
+    path = str(tmp_path / "samples.ecj")
+    journal = SampleJournal(path)
+    journal.extend(7, *_samples(5))
+    journal.close()
+    good = os.path.getsize(path)
+
+    with open(path, "ab") as f:
+        f.write(BLOCK.pack(BLOCK_MAGIC, 0, 7, 0, 100) + b"\x01" * 24)
+
+    journal = SampleJournal(path)
+    rpm, proxy = journal.replay(7, 0)
+    assert list(rpm) == [1000.0, 1001.0, 1002.0, 1003.0, 1004.0]
+    assert list(proxy) == [0.0, 0.5, 1.0, 1.5, 2.0]
+    assert os.path.getsize(path) == good
+    journal.close()
+
+
+def _samples(n):
+    return np.arange(n) + 1000.0, np.arange(n) * 0.5
+
+
+def test_idle_worker_syncs_the_last_accepted_sample(tmp_path):
+    ecu = ECU(str(tmp_path))
+    service = ECUService(ecu)
+    service.start()
+    try:
+        # accepted just after a sync; no further sample follows
+        ecu._journal.append(3, 4000.0, 1.5)
+        time.sleep(JOURNAL_SYNC_S + 0.3)
+        on_disk = SampleJournal(os.path.join(str(tmp_path), JOURNAL_FILE))
+        rpm, proxy = on_disk.replay(3, 0)
+        on_disk.close()
+        assert list(rpm) == [4000.0] and list(proxy) == [1.5]
+    finally:
+        service.stop()
+
+
+def test_journal_is_kept_when_a_model_write_fails(tmp_path):
+    ecu = ECU(str(tmp_path))
+    model = ecu._install(CarModel(car_id=4))
+    model.curve.add_sample(5000.0, 2.0)
+    ecu._journal.append(4, 5000.0, 2.0)
+    ecu._unsaved.add(4)
+
+    def disk_full(car_id, blob):
+        raise OSError(28, "No space left on device")
+
+    ecu._writer._write_fn = disk_full
+    ecu._compact_journal()
+    assert ecu._journal.car_ids() == [4]
+    ecu._journal.sync()
+    rpm, _ = SampleJournal(os.path.join(str(tmp_path), JOURNAL_FILE)).replay(4, 0)
+    assert list(rpm) == [5000.0]
@@ -0,0 +1,87 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from instrument_cluster.core import ecu as ecu_module
+from instrument_cluster.core.ecu import ECU, CarModel
+
+
+def _frame(car_id):
+    return SimpleNamespace(
+        car_id=car_id, car_speed=20.0, engine_rpm=5000, current_gear=3,
+        throttle=1.0, brake=0.0,
+    )
+
+
+def _wait_resident(ecu, car_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while ecu._resident_model(car_id) is None:
+        assert time.monotonic() < deadline, "model never became resident"
+        time.sleep(0.005)
+    return ecu.models[car_id]
+
+
+def test_prefetch_loads_in_the_background(tmp_path):
+    ecu = ECU(str(tmp_path))
+    model = ecu._install(CarModel(car_id=1, redline_rpm=8100.0))
+    ecu._save_model(model)
+    ecu.close()
+
+    ecu = ECU(str(tmp_path))
+    release = threading.Event()
+    load = ecu._load_model
+
+    def slow_load(car_id):
+        release.wait(2.0)
+        return load(car_id)
+
+    ecu._load_model = slow_load
+    ecu.prefetch(1)
+    # nothing blocks while the load is in flight
+    ecu.update(_frame(1), 1 / 60)
+    assert ecu._dbg["warming"] == 1
+    assert ecu.snapshot(1).table.covered_bins == 0
+    assert ecu.get_shift_targets(_frame(1))[:2] == (None, None)
+    assert ecu.warming(1)
+
+    release.set()
+    assert _wait_resident(ecu, 1).redline_rpm == 8100.0
+    assert ecu.switch_latency()["switches"] == 1
+    ecu.close()
+
+
+def test_failed_load_keeps_warming_and_retries(tmp_path, monkeypatch):
+    monkeypatch.setattr(ecu_module, "LOAD_RETRY_S", 0.05)
+    ecu = ECU(str(tmp_path))
+    model = ecu._install(CarModel(car_id=2, redline_rpm=9000.0))
+    model.curve.add_sample(5000.0, 1.0)
+    ecu._save_model(model)
+    ecu.close()
+
+    ecu = ECU(str(tmp_path))
+    load = ecu._load_model
+    calls = []
+
+    def flaky_load(car_id):
+        calls.append(car_id)
+        if len(calls) == 1:
+            raise OSError(5, "Input/output error")
+        return load(car_id)
+
+    ecu._load_model = flaky_load
+    ecu.prefetch(2)
+    ecu._loading[2][0].exception(5.0)
+    assert ecu._resident_model(2) is None
+    assert ecu.warming(2)
+    # not retried before LOAD_RETRY_S, and no empty model saved meanwhile
+    assert ecu._resident_model(2) is None and len(calls) == 1
+    ecu.save_if_needed()
+    ecu._writer.flush()
+    assert ecu._writer.pending(2) is None
+
+    time.sleep(0.06)
+    model = _wait_resident(ecu, 2)
+    assert len(calls) == 2
+    assert model.redline_rpm == 9000.0
+    assert model.curve.counts.sum() == 1
+    ecu.close()
@@ -0,0 +1,43 @@
+import numpy as np
+
+from instrument_cluster.core.ecu import MIN_BIN_SAMPLES, DynoCurve
+
+
+def _learned():
+    curve = DynoCurve()
+    rpm = np.repeat(np.arange(3000.0, 4000.0, 100.0), MIN_BIN_SAMPLES)
+    curve.add_samples(rpm, np.full(len(rpm), 2.0))
+    return curve
+
+
+def test_seeded_bins_do_not_count_as_covered():
+    curve = _learned()
+    covered, coverage = curve.covered, curve.coverage()
+    assert covered == 10
+
+    assert curve.seed(np.full(len(curve.means), 2.5)) == len(curve.means) - 10
+    assert curve.covered == covered
+    assert curve.coverage() == coverage
+    assert not (curve.confident & curve.seeded).any()
+    i = curve.idx(6000.0)
+    assert curve.seeded[i] and curve.counts[i] == 0
+    assert curve.torque_bins[i] == 2.5
+
+
+def test_own_samples_take_over_a_seeded_bin():
+    curve = _learned()
+    curve.seed(np.full(len(curve.means), 9.0))
+    i = curve.idx(6000.0)
+
+    curve.add_sample(6000.0, 2.0)
+    assert not curve.seeded[i]
+    assert curve.counts[i] == 1
+    # statistics of the bin's own samples only; the torque starts from the seed
+    assert curve.means[i] == 2.0 and curve.m2[i] == 0.0
+    assert curve.torque_bins[i] > 2.0
+    assert not curve.confident[i]
+
+    j = curve.idx(7000.0)
+    curve.add_samples(np.full(MIN_BIN_SAMPLES, 7000.0), np.full(MIN_BIN_SAMPLES, 2.0))
+    assert not curve.seeded[j] and curve.confident[j]
+    assert curve.covered == 11
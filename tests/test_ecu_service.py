@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from instrument_cluster.core.ecu import ECU, JOURNAL_FILE
+from instrument_cluster.core.ecu_service import ECUService
+
+
+def test_journal_is_opened_on_use_and_closed_on_stop(tmp_path):
+    service = ECUService(ECU(str(tmp_path)))
+    # constructing the service (e.g. with its widget) touches no files
+    assert service.ecu._journal_file is None
+    assert not os.path.exists(os.path.join(str(tmp_path), JOURNAL_FILE))
+
+    service.start()
+    service.submit(SimpleNamespace(car_id=7, received_time=1.0), None)
+    deadline = time.time() + 5.0
+    while service.ecu.warming(7) and time.time() < deadline:
+        service.submit(SimpleNamespace(car_id=7, received_time=1.0), None)
+        time.sleep(0.01)
+    assert service.ecu._journal_file is not None
+    service.stop()
+    assert service.ecu._journal_file is None
+
+
+class _SlowECU:
+    models = {}
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.busy = False
+        self.closed_by = None
+
+    def prefetch(self, car_id):
+        pass
+
+    def update(self, frame, dt):
+        self.busy = True
+        time.sleep(self.seconds)
+        self.busy = False
+
+    def warming(self, car_id):
+        return True
+
+    def tick(self):
+        pass
+
+    def close(self):
+        assert not self.busy
+        self.closed_by = threading.current_thread().name
+
+
+def test_stop_leaves_closing_to_a_busy_worker():
+    ecu = _SlowECU(2.5)
+    service = ECUService(ecu)
+    service.start()
+    service.submit(SimpleNamespace(car_id=1, received_time=1.0), None)
+    time.sleep(0.05)
+    service.stop()
+    assert ecu.closed_by is None
+    time.sleep(1.0)
+    assert ecu.closed_by == "ecu"
+
+
+def test_stop_closes_an_idle_worker_s_ecu():
+    ecu = _SlowECU(0.0)
+    service = ECUService(ecu)
+    service.start()
+    service.stop()
+    assert ecu.closed_by == threading.current_thread().name
@@ -0,0 +1,62 @@
+import os
+
+from instrument_cluster.core.ecu import ECU, CarModel
+from instrument_cluster.core.ecu_store import RECORD, RECORD_MAGIC, ModelStore
+
+
+def test_model_store_truncates_torn_tail(tmp_path):
+    path = str(tmp_path / "models.ecm")
+    store = ModelStore(path)
+    store.put(1, b"one" * 10)
+    store.put(2, b"two" * 10)
+    store.put(1, b"uno" * 10)
+    store.close()
+    good = os.path.getsize(path)
+
+    # an append cut short: a full record header, half of its blob
+    with open(path, "ab") as f:
+        f.write(RECORD.pack(RECORD_MAGIC, 0, 3, 64) + b"x" * 32)
+
+    store = ModelStore(path)
+    assert sorted(store.car_ids()) == [1, 2]
+    assert store.get(1) == b"uno" * 10
+    assert store.get(2) == b"two" * 10
+    assert os.path.getsize(path) == good
+
+    store.put(3, b"three")
+    store.close()
+    store = ModelStore(path)
+    assert store.get(3) == b"three"
+    store.close()
+
+
+def test_model_store_stops_at_corrupt_record(tmp_path):
+    path = str(tmp_path / "models.ecm")
+    store = ModelStore(path)
+    store.put(1, b"one" * 10)
+    store.put(2, b"two" * 10)
+    store.close()
+
+    # flip a byte in the last blob: its crc no longer matches
+    with open(path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b"!")
+
+    store = ModelStore(path)
+    assert store.car_ids() == [1]
+    store.close()
+
+
+def test_evicted_model_is_saved_and_reloaded(tmp_path):
+    ecu = ECU(str(tmp_path), max_resident=2)
+    first = ecu._install(CarModel(car_id=1))
+    first.curve.add_sample(5000.0, 1.0)
+    ecu._install(CarModel(car_id=2))
+    ecu._install(CarModel(car_id=3))
+    assert list(ecu.models) == [2, 3]
+    ecu.close()
+
+    ecu = ECU(str(tmp_path))
+    assert 1 in ecu.known_cars()
+    assert ecu._get_or_load_model(1).curve.counts.sum() == 1
+    ecu.close()
@@ -0,0 +1,95 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from instrument_cluster.core.ecu import ECU, CarModel
+from instrument_cluster.core.ecu_store import (
+    RECORD,
+    RECORD_MAGIC,
+    ModelStore,
+    decode_model,
+)
+from instrument_cluster.core.ecu_train import train_car
+from instrument_cluster.telemetry.bench import simulate_pulls
+from instrument_cluster.telemetry.session import SessionWriter
+
+
+def _record(path, car_id):
+    cols = simulate_pulls(20, 0.05, 0.0)
+    writer = SessionWriter(path)
+    t_ns = 1_700_000_000 * 10**9
+    for i in range(len(cols["rpm"])):
+        t_ns += int(1e9 / 60)
+        writer.append(
+            SimpleNamespace(
+                received_time=t_ns,
+                car_id=car_id,
+                car_speed=cols["speed"][i],
+                engine_rpm=int(cols["rpm"][i]),
+                current_gear=int(cols["gear"][i]),
+                throttle=cols["throttle"][i],
+                brake=cols["brake"][i],
+                steering=0.0,
+            )
+        )
+    writer.close()
+
+
+def test_readonly_store_leaves_a_torn_tail_alone(tmp_path):
+    path = str(tmp_path / "models.ecs")
+    store = ModelStore(path)
+    store.put(1, b"one" * 10)
+    store.close()
+    # what a reader sees while the writer is halfway through an append
+    with open(path, "ab") as f:
+        f.write(RECORD.pack(RECORD_MAGIC, 0, 2, 64) + b"x" * 32)
+    size = os.path.getsize(path)
+
+    view = ModelStore(path, readonly=True)
+    assert view.car_ids() == [1]
+    assert view.get(1) == b"one" * 10
+    with pytest.raises(ValueError):
+        view.put(2, b"two")
+    view.close()
+    assert os.path.getsize(path) == size
+
+
+def test_train_car_ignores_other_cars_in_the_store(tmp_path):
+    session = str(tmp_path / "s.icsn")
+    _record(session, car_id=5)
+
+    alone = str(tmp_path / "alone")
+    report, blob = train_car(5, [session], None, alone)
+    assert report.accepted > 0
+
+    # a garage of similar cars would warm-start car 5 in the dashboard
+    garage = str(tmp_path / "garage")
+    ecu = ECU(garage, autosave=False)
+    for car_id in range(10, 20):
+        model = ecu._install(CarModel(car_id=car_id))
+        rpm = np.linspace(1500, 9000, 400)
+        model.curve.add_samples(rpm, np.full(400, 2.0))
+        ecu._save_model(model)
+    ecu.close()
+    size = os.path.getsize(os.path.join(garage, "models.ecs"))
+
+    report2, blob2 = train_car(5, [session], None, garage)
+    assert report2.accepted == report.accepted
+    assert report2.coverage_after == report.coverage_after
+    np.testing.assert_array_equal(
+        decode_model(blob2)["counts"], decode_model(blob)["counts"]
+    )
+    assert os.path.getsize(os.path.join(garage, "models.ecs")) == size
+
+
+def test_no_warm_start_never_looks_up_other_cars(tmp_path):
+    for warm_start in (True, False):
+        ecu = ECU(str(tmp_path), autosave=False, warm_start=warm_start)
+        model = ecu._install(CarModel(car_id=1))
+        model.curve.add_samples(np.linspace(3000, 4000, 200), np.full(200, 2.0))
+        assert not ecu._maybe_seed(model)
+        # the index of stored cars is only built for warm starts
+        assert (ecu._index_build is not None) == warm_start
+        ecu.close()
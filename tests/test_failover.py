@@ -0,0 +1,124 @@
+from types import SimpleNamespace
+
+import pytest
+
+from instrument_cluster.telemetry import failover
+from instrument_cluster.telemetry.failover import FailoverReader, Staleness
+from instrument_cluster.telemetry.models import TelemetryFrame
+from instrument_cluster.telemetry.ring import FrameRing
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+class RingReader:
+    """The reader contract over a FrameRing; frames are stamped in seconds."""
+
+    def __init__(self, clock: Clock, name: str) -> None:
+        self.clock = clock
+        self.name = name
+        self.ring = FrameRing()
+
+    def send(self) -> None:
+        self.ring.push(
+            TelemetryFrame(received_time=self.clock.now, car_speed=len(self.name))
+        )
+
+    def start(self) -> None:
+        pass
+
+    def latest(self):
+        return self.ring.latest()
+
+    def since(self, seq):
+        return self.ring.since(seq)
+
+    def head(self) -> int:
+        return self.ring.seq
+
+    def latest_received_time(self) -> float:
+        frame = self.ring.latest()
+        return frame.received_time if frame is not None else 0.0
+
+    def stop(self) -> None:
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(failover, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+def _run(reader, clock, seconds, *sources, hz=10):
+    """Advance the clock, sending from *sources* and reading every tick."""
+    seen = []
+    for _ in range(int(seconds * hz)):
+        clock.now += 1.0 / hz
+        for source in sources:
+            source.send()
+        frames, _ = reader.since(0)
+        seen.extend(frames)
+    return seen
+
+
+def test_fails_over_when_the_primary_goes_quiet_and_back(clock):
+    primary = RingReader(clock, "p")
+    secondary = RingReader(clock, "second")
+    reader = FailoverReader(primary, secondary, stale_after_s=0.5, failover_after_s=2.0)
+    reader.start()
+
+    seen = _run(reader, clock, 1.0, primary, secondary)
+    assert {f.car_speed for f in seen} == {1.0}
+    assert reader.staleness() is Staleness.FRESH
+
+    # primary silent: stale first, then the secondary takes over
+    _run(reader, clock, 1.0, secondary)
+    assert reader.staleness() is Staleness.STALE
+    assert not reader.failed_over
+    seen = _run(reader, clock, 1.5, secondary)
+    assert reader.staleness() is Staleness.FAILED_OVER
+    assert reader.failovers == 1
+    assert seen and seen[-1].car_speed == 6.0
+    assert reader.stats()["active"] == "secondary"
+
+    # the primary is back: switched back on its first fresh frame
+    seen = _run(reader, clock, 0.5, primary, secondary)
+    assert not reader.failed_over
+    assert seen[-1].car_speed == 1.0
+    assert reader.failovers == 1
+
+
+def test_sequence_numbers_keep_counting_across_switches(clock):
+    primary = RingReader(clock, "p")
+    secondary = RingReader(clock, "second")
+    reader = FailoverReader(primary, secondary, stale_after_s=0.5, failover_after_s=1.0)
+    reader.start()
+    seq, total = 0, 0
+    for step in range(60):
+        clock.now += 0.1
+        if not 20 <= step < 40:
+            primary.send()
+        secondary.send()
+        frames, head = reader.since(seq)
+        assert head == seq + len(frames)
+        seq = head
+        total += len(frames)
+    assert reader.head() == total
+    assert reader.failovers == 1
+
+
+def test_no_secondary_only_reports_staleness(clock):
+    primary = RingReader(clock, "p")
+    reader = FailoverReader(primary, None, stale_after_s=0.5, failover_after_s=1.0)
+    reader.start()
+    _run(reader, clock, 1.0, primary)
+    _run(reader, clock, 5.0)
+    assert reader.staleness() is Staleness.STALE
+    assert not reader.failed_over
@@ -0,0 +1,84 @@
+import math
+
+import numpy as np
+import pytest
+
+from instrument_cluster.core.ecu import ECU, CarModel
+from instrument_cluster.core.gearing import MIN_GEAR_SAMPLES, GearRatioEstimator
+from instrument_cluster.telemetry.bench import (
+    SIM_FINAL_DRIVE,
+    SIM_RATIOS,
+    SIM_WHEEL_RADIUS,
+    simulate_pulls,
+)
+
+OVERALL = [r * SIM_FINAL_DRIVE for r in SIM_RATIOS]
+
+
+def _frames(n, seed=0):
+    rng = np.random.default_rng(seed)
+    gear = rng.integers(1, len(OVERALL) + 1, n)
+    speed = rng.uniform(5.0, 60.0, n)
+    ratio = np.asarray(OVERALL)[gear - 1]
+    rpm = speed * ratio * 60.0 / (2.0 * math.pi * SIM_WHEEL_RADIUS)
+    rpm *= 1.0 + rng.normal(0.0, 0.003, n)
+    # a fifth of the frames spin the wheels or slip the clutch
+    slip = rng.random(n) < 0.2
+    rpm[slip] *= rng.uniform(1.05, 1.6, int(slip.sum()))
+    return rpm, speed, gear
+
+
+def test_median_ignores_wheelspin():
+    est = GearRatioEstimator()
+    rpm, speed, gear = _frames(6000)
+    assert est.add(rpm, speed, gear, SIM_WHEEL_RADIUS)
+    got = est.merged([])
+    assert len(got) == len(OVERALL)
+    np.testing.assert_allclose(got, OVERALL, rtol=0.005)
+
+
+def test_batches_and_single_frames_agree():
+    rpm, speed, gear = _frames(2000)
+    batch, single = GearRatioEstimator(), GearRatioEstimator()
+    batch.add(rpm, speed, gear, SIM_WHEEL_RADIUS)
+    for args in zip(rpm.tolist(), speed.tolist(), gear.tolist()):
+        single.add_one(*args, SIM_WHEEL_RADIUS)
+    np.testing.assert_array_equal(batch.hist, single.hist)
+    batch.refresh()
+    single.refresh()
+    np.testing.assert_array_equal(batch.ratios, single.ratios)
+
+
+def test_gears_without_enough_samples_fall_back_to_known_ratios():
+    est = GearRatioEstimator()
+    rpm, speed, gear = _frames(4000)
+    first = gear == 1
+    est.add(rpm[~first], speed[~first], gear[~first], SIM_WHEEL_RADIUS)
+    few = np.flatnonzero(first)[: MIN_GEAR_SAMPLES - 1]
+    est.add(rpm[few], speed[few], gear[few], SIM_WHEEL_RADIUS)
+    est.refresh()
+    merged = est.merged([12.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 2.5])
+    assert merged[0] == 12.0
+    assert merged[1:6] == pytest.approx(OVERALL[1:], rel=0.005)
+    assert merged[6] == 0.0 and merged[7] == 2.5
+
+
+def test_ecu_learns_from_frames_without_gear_ratios(tmp_path):
+    cols = simulate_pulls(60, 0.05, 0.002)
+    ecu = ECU(str(tmp_path), autosave=False)
+    model = ecu._install(CarModel(car_id=1))
+    for s in range(0, len(cols["rpm"]), 256):
+        sl = slice(s, s + 256)
+        ecu.update_batch(
+            1, cols["rpm"][sl], cols["gear"][sl], cols["throttle"][sl],
+            cols["brake"][sl], cols["speed"][sl], cols["dt"][sl],
+            wheel_radius=SIM_WHEEL_RADIUS,
+        )
+    assert model.ratios_inferred
+    # the gears the pulls reached so far
+    n = len(model.gear_ratios)
+    assert n >= 3
+    assert model.gear_ratios == pytest.approx(OVERALL[:n], rel=0.01)
+    assert ecu._dbg["ok"] > ecu._dbg["bad_gear"]
+    assert model.curve.covered > 0
+    ecu.close()
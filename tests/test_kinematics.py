@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from instrument_cluster.core.kinematics import ESTIMATORS
+from instrument_cluster.telemetry.bench import simulate_pulls
+
+
+@pytest.mark.parametrize("name", sorted(ESTIMATORS))
+def test_run_matches_step(name):
+    cols = simulate_pulls(20, 0.05, 0.002)
+    v, dt = cols["speed"], cols["dt"].copy()
+    dt[500] = np.nan  # a gap mid-stream restarts the filter
+    stepped, batched = ESTIMATORS[name](), ESTIMATORS[name]()
+    expected = np.array(
+        [stepped.step(vk, None, None if dk != dk else dk) for vk, dk in zip(v, dt)]
+    )
+    # in two calls: the state carries over between batches
+    first, second = batched.run(v[:700], dt[:700]), batched.run(v[700:], dt[700:])
+    got = [np.concatenate(c) for c in zip(first, second)]
+    np.testing.assert_allclose(got[0], expected[:, 0], rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(got[1], expected[:, 1], rtol=1e-9, atol=1e-9)
+
+
+def test_kalman_tracks_acceleration_through_noise():
+    hz = 60.0
+    t = np.arange(600) / hz
+    accel = np.where(t < 5.0, 4.0, -2.0)
+    truth = 10.0 + np.cumsum(accel) / hz
+    rng = np.random.default_rng(0)
+    measured = truth + rng.normal(0.0, 0.05, len(t))
+    v, a = ESTIMATORS["kalman"]().run(measured, np.full(len(t), 1 / hz))
+
+    settled = (t > 1.0) & (t < 4.9)
+    assert np.median(np.abs(a[settled] - 4.0)) < 0.5
+    assert np.median(np.abs(v[settled] - truth[settled])) < 0.05
+    assert np.median(a[t > 6.0]) == pytest.approx(-2.0, abs=0.5)
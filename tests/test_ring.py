@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+from instrument_cluster.telemetry.ring import FrameRing
+
+
+def test_since_returns_newer_frames_in_order():
+    ring = FrameRing(capacity=8)
+    assert ring.since(0) == ([], 0)
+    assert ring.latest() is None
+
+    for i in range(5):
+        assert ring.push(i) == i + 1
+    frames, head = ring.since(0)
+    assert frames == [0, 1, 2, 3, 4] and head == 5
+    assert ring.since(head) == ([], 5)
+
+    ring.push(5)
+    assert ring.since(head) == ([5], 6)
+    assert ring.latest() == 5
+
+
+def test_a_consumer_that_falls_behind_loses_the_oldest_frames():
+    ring = FrameRing(capacity=4)
+    for i in range(10):
+        ring.push(i)
+    frames, head = ring.since(2)
+    assert frames == [6, 7, 8, 9] and head == 10
+    assert ring.stats() == {"seq": 10, "capacity": 4, "dropped": 4, "overruns": 1}
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        FrameRing(capacity=0)
+
+
+def test_concurrent_producer_never_reorders_or_duplicates():
+    ring = FrameRing(capacity=64)
+    n = 20_000
+
+    def produce():
+        for i in range(n):
+            ring.push(i)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    seen, seq = [], 0
+    while producer.is_alive() or seq < ring.seq:
+        frames, seq = ring.since(seq)
+        seen.extend(frames)
+    producer.join()
+    assert seen == sorted(set(seen))
+    assert seen[-1] == n - 1
+    assert len(seen) + ring.dropped == n
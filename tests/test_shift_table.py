@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from instrument_cluster.core.ecu import ECU, CarModel, ShiftTable
+
+RATIOS = [3.5, 2.4, 1.8, 1.4, 1.1, 0.9]
+
+
+def _learned(tmp_path):
+    ecu = ECU(str(tmp_path), autosave=False)
+    model = ecu._install(CarModel(car_id=1, gear_ratios=list(RATIOS)))
+    rpm = np.repeat(np.arange(1000.0, 8000.0, 100.0) + 50.0, 6)
+    model.curve.add_samples(rpm, 1.0 - ((rpm - 5000.0) / 5000.0) ** 2)
+    ecu._recompute_targets(model)
+    ecu._rebuild_table(model)
+    return ecu, model
+
+
+def test_table_lookups():
+    table = ShiftTable(
+        up=(None, 6000.0, 6500.0), down=(None, None, 3000.0),
+        progress_scale=(0.0, 1 / 6000.0, 1 / 6500.0),
+    )
+    assert table.targets(1) == (6000.0, None)
+    assert table.targets(2) == (6500.0, 3000.0)
+    assert table.targets(-1) == table.targets(9) == (None, None)
+    assert table.progress(1, 3000.0) == 0.5
+    assert table.progress(1, 9000.0) == 1.2
+    assert table.progress(0, 3000.0) == 0.0
+
+
+def test_table_matches_the_model_and_is_only_replaced_on_change(tmp_path):
+    ecu, model = _learned(tmp_path)
+    frame = SimpleNamespace(car_id=1, current_gear=2, engine_rpm=4000)
+    table = ecu.shift_table(1)
+    up, dn, info = ecu.get_shift_targets(frame)
+    assert (up, dn) == (model.shift_up_rpm[2], model.shift_down_rpm[2])
+    assert info["coverage"] == model.curve.coverage() > 0.0
+    for gear in range(1, len(RATIOS)):
+        assert table.targets(gear)[0] == model.shift_up_rpm[gear]
+
+    # reading does not rebuild
+    for _ in range(3):
+        ecu.get_shift_targets(frame)
+    assert ecu.shift_table(1) is table
+
+    model.redline_rpm = 6000.0
+    ecu._recompute_targets(model)
+    ecu._rebuild_table(model)
+    assert ecu.shift_table(1) is not table
+    assert ecu.shift_table(1).targets(2)[0] <= 6000.0
+    ecu.close()
+
+
+def test_debug_string_is_formatted_only_when_read(tmp_path):
+    ecu, _ = _learned(tmp_path)
+    calls = []
+    debug_counters = ecu.debug_counters
+
+    def counted():
+        calls.append(1)
+        return debug_counters()
+
+    ecu.debug_counters = counted
+    frame = SimpleNamespace(car_id=1, current_gear=3, engine_rpm=5000)
+    _, _, info = ecu.get_shift_targets(frame)
+    assert info["rpm"] == 5000.0 and calls == []
+    assert info["dbg"].startswith("ok:")
+    assert calls == [1]
+    ecu.close()
@@ -0,0 +1,85 @@
+import time
+import uuid
+
+import pytest
+
+from instrument_cluster.telemetry import shm
+from instrument_cluster.telemetry.models import TelemetryFrame
+from instrument_cluster.telemetry.shm import ShmPublisher, ShmReader
+
+
+@pytest.fixture
+def name(monkeypatch):
+    monkeypatch.setattr(shm, "ATTACH_INTERVAL_S", 0.0)
+    return f"ic-test-{uuid.uuid4().hex[:12]}"
+
+
+def _frame(i):
+    return TelemetryFrame(
+        received_time=time.time_ns(), car_speed=float(i), engine_rpm=1000 + i, car_id=7
+    )
+
+
+def test_reader_waits_for_the_producer_and_reads_in_order(name):
+    reader = ShmReader(name)
+    reader.start()
+    assert reader.since(0) == ([], 0)
+    assert not reader.stats()["attached"]
+
+    publisher = ShmPublisher(name, capacity=64)
+    try:
+        for i in range(10):
+            publisher.publish(_frame(i))
+        frames, seq = reader.since(0)
+        assert seq == 10
+        assert [f.engine_rpm for f in frames] == list(range(1000, 1010))
+        assert {f.car_id for f in frames} == {7}
+        assert reader.latest().engine_rpm == 1009
+        assert reader.since(seq) == ([], 10)
+    finally:
+        reader.stop()
+        publisher.close()
+
+
+def test_a_lapped_reader_counts_the_frames_it_lost(name):
+    publisher = ShmPublisher(name, capacity=8)
+    reader = ShmReader(name)
+    reader.start()
+    try:
+        for i in range(20):
+            publisher.publish(_frame(i))
+        frames, seq = reader.since(0)
+        assert [f.car_speed for f in frames] == [float(i) for i in range(12, 20)]
+        assert reader.stats()["dropped"] == 12
+        assert reader.stats()["overruns"] == 1
+    finally:
+        reader.stop()
+        publisher.close()
+
+
+def test_reader_follows_a_restarted_producer(name):
+    first = ShmPublisher(name, capacity=16)
+    reader = ShmReader(name)
+    reader.start()
+    try:
+        for i in range(10):
+            first.publish(_frame(i))
+        _, seq = reader.since(0)
+        assert seq == 10
+
+        # the producer dies and a new one takes its segment over; the
+        # numbering starts again
+        first.close(unlink=False)
+        second = ShmPublisher(name, capacity=16)
+        try:
+            for i in range(3):
+                second.publish(_frame(100 + i))
+            frames, seq = reader.since(seq)
+            assert [f.car_speed for f in frames] == [100.0, 101.0, 102.0]
+            assert seq == 3
+        finally:
+            second.close()
+        assert reader.since(seq) == ([], seq)
+        assert not reader.stats()["attached"]
+    finally:
+        reader.stop()
@@ -0,0 +1,61 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from instrument_cluster.telemetry.stats import RESET_SPAN, ReaderStats
+
+
+def _frame(pid, stamp):
+    return SimpleNamespace(packet_id=pid, received_time=stamp)
+
+
+def test_loss_reordering_and_restarts():
+    stats = ReaderStats("test")
+    t = time.time()
+    for i, pid in enumerate([1, 2, 3, 6, 5, 7, 8]):
+        stats.packet(_frame(pid, t + i / 60), t + i / 60)
+    # the sender restarted its ids
+    stats.packet(_frame(RESET_SPAN * 5, t + 1.0), t + 1.0)
+    stats.packet(_frame(1, t + 1.1), t + 1.1)
+    snap = stats.snapshot()
+    assert snap["packets"] == 9
+    assert snap["gaps"] == 2  # 4 and 5 skipped ...
+    assert snap["out_of_order"] == 1  # ... 5 arrived late
+    assert snap["lost"] == 1
+    assert snap["resets"] == 2
+
+
+def test_jitter_ignores_a_constant_clock_offset():
+    stats = ReaderStats("test")
+    t = time.time()
+    offset = 3.7  # sender clock ahead of ours
+    for i in range(200):
+        stats.packet(_frame(i, t + i / 60 + offset), t + i / 60)
+    assert stats.snapshot()["jitter_ms"] == pytest.approx(0.0, abs=1e-3)
+
+    late = ReaderStats("test")
+    for i in range(200):
+        delay = 0.004 if i % 2 else 0.0
+        late.packet(_frame(i, t + i / 60), t + i / 60 + delay)
+    assert late.snapshot()["jitter_ms"] == pytest.approx(4.0, rel=0.05)
+
+
+def test_rate_and_interarrival_histogram():
+    stats = ReaderStats("test")
+    t = time.time() - 3.0
+    for i in range(181):
+        stats.packet(_frame(None, 0), t + i / 60)
+    snap = stats.snapshot()
+    assert snap["packets_per_s"] == pytest.approx(60.0, rel=0.05)
+    # 16.7 ms apart: every gap in the (16, 32] ms bucket
+    assert snap["interarrival_ms"]["32.0"] == 180
+    assert sum(snap["interarrival_ms"].values()) == 180
+    assert snap["gaps"] == 0 and snap["resets"] == 0
+
+
+def test_decode_errors_are_counted():
+    stats = ReaderStats("test")
+    for _ in range(3):
+        stats.error(ValueError("bad magic"))
+    assert stats.snapshot()["decode_errors"] == 3
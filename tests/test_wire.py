@@ -0,0 +1,47 @@
+import struct
+
+import pytest
+
+from instrument_cluster.telemetry.models import TelemetryFrame
+from instrument_cluster.telemetry.wire import (
+    FRAME_V1,
+    MAGIC,
+    decode_frame,
+    encode_frame,
+)
+
+
+def test_round_trip_keeps_car_id():
+    frame = TelemetryFrame(
+        received_time=1.5e18,
+        car_speed=42.0,
+        engine_rpm=7000,
+        current_gear=3,
+        throttle=1.0,
+        lap_count=2,
+        car_id=3321,
+    )
+    decoded = decode_frame(encode_frame(frame, packet_id=9))
+    assert decoded.car_id == 3321
+    assert decoded.packet_id == 9
+    assert decoded.engine_rpm == 7000
+    assert decoded.lap_count == 2
+
+
+def test_version_1_frames_decode_as_car_0():
+    data = FRAME_V1.pack(
+        MAGIC, 1, 0, 0, 5, 1.0, 10.0, 3000.0, 0.5, 0.0, 0.0, 2, 0, 0xDEAD
+    )
+    decoded = decode_frame(data)
+    assert decoded.car_id == 0
+    assert decoded.lap_count is None
+    assert decoded.engine_rpm == 3000
+
+
+def test_foreign_and_short_datagrams_are_rejected():
+    with pytest.raises(ValueError):
+        decode_frame(b"nope" + bytes(44))
+    with pytest.raises(ValueError):
+        decode_frame(encode_frame({"received_time": 1.0})[:20])
+    with pytest.raises(ValueError):
+        decode_frame(struct.pack("<4sB", MAGIC, 99) + bytes(43))